@@ -0,0 +1,72 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gitclient import GitClient
+from synthetic import git
+
+DEFAULT_FILES = 100000
+LOOP_FILES = 1000
+
+def create_files(path, count):
+	paths = []
+
+	for number in range(count):
+		directory = 'dir%d' %(number % 100)
+		name = '%s/file%d.txt' %(directory, number)
+
+		if not os.path.isdir(os.path.join(path, directory)):
+			os.makedirs(os.path.join(path, directory))
+
+		with open(os.path.join(path, name), 'w') as f:
+			f.write('file %d\n' %(number))
+
+		paths.append(name)
+
+	return paths
+
+def create_repository(path, count):
+	os.makedirs(path)
+	git(path, 'init', '-q')
+
+	return (GitClient.open(path), create_files(path, count))
+
+def measure(name, count, function):
+	start = time.perf_counter()
+	function()
+	elapsed = time.perf_counter() - start
+	print('%-28s %9d paths %9.3fs %12.0f paths/s' %(name, count, elapsed, count / elapsed))
+
+	return elapsed
+
+def main(argv):
+	files = int(argv[1]) if len(argv) > 1 else DEFAULT_FILES
+	root = tempfile.mkdtemp(prefix='gitclient-bench-')
+
+	logging.getLogger('gitclient').setLevel(logging.WARNING)
+
+	try:
+		# every variant gets its own repository so that none of them finds the blobs already written
+		print('creating %d files...' %(files))
+		# looping add() spawns one process per path, so it is timed on a sample and extrapolated
+		client, paths = create_repository(os.path.join(root, 'loop'), min(LOOP_FILES, files))
+		loop = measure('add(path) loop', len(paths), lambda: [client.add(item) for item in paths])
+
+		client, paths = create_repository(os.path.join(root, 'bulk'), files)
+		bulk = measure('add(list)', len(paths), lambda: client.add(paths))
+
+		client, paths = create_repository(os.path.join(root, 'chunked'), files)
+		measure('add(list, chunk_size=1000)', len(paths), lambda: client.add(paths, chunk_size=1000))
+
+		print('speed-up over looping add(): %.0fx' %((loop / min(LOOP_FILES, files)) / (bulk / files)))
+	finally:
+		shutil.rmtree(root)
+
+if __name__ == '__main__':
+	main(sys.argv)
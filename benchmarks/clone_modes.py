@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gitclient import GitClient, GitTransferStats
+from synthetic import git, create_repository
+
+DEFAULT_COMMITS = 20000
+
+def disk_usage(path):
+	result = 0
+
+	for directory, unused, files in os.walk(path):
+		for name in files:
+			result += os.lstat(os.path.join(directory, name)).st_size
+
+	return result
+
+def measure(name, root, **kwargs):
+	stats = GitTransferStats()
+	start = time.perf_counter()
+	client = GitClient.clone(root, stats=stats, directory=name.replace(' ', '-'), **kwargs)
+	elapsed = time.perf_counter() - start
+
+	if client == None:
+		print('%-28s failed' %(name))
+	else:
+		print('%-28s %9.3fs %12d bytes received %12d bytes on disk' %(name, elapsed, stats.bytes, disk_usage(client.git_dir)))
+
+def main(argv):
+	commits = int(argv[1]) if len(argv) > 1 else DEFAULT_COMMITS
+	root = tempfile.mkdtemp(prefix='gitclient-bench-')
+
+	logging.getLogger('gitclient').setLevel(logging.WARNING)
+
+	try:
+		print('creating repository with %d commits...' %(commits))
+		source = create_repository(os.path.join(root, 'source'), commits=commits, files=1000, merge_every=50)
+		upstream = os.path.join(root, 'upstream.git')
+		git(root, 'clone', '-q', '--bare', source, upstream)
+		git(upstream, 'config', 'uploadpack.allowFilter', 'true')
+
+		# local paths take the hardlink fast path and ignore --depth/--filter, so the transport modes use file://
+		url = 'file://' + upstream
+		clones = os.path.join(root, 'clones')
+		os.makedirs(clones)
+
+		measure('full', clones, url=url)
+		measure('local hardlinks', clones, url=upstream)
+		measure('reference', clones, url=url, reference=upstream)
+		measure('reference dissociate', clones, url=url, reference=upstream, dissociate=True)
+		measure('depth 1', clones, url=url, depth=1)
+		measure('filter blob:none', clones, url=url, filter='blob:none')
+		measure('depth 1 single branch', clones, url=url, depth=1, single_branch=True)
+		measure('sparse dir1', clones, url=url, filter='blob:none', sparse=['dir1'])
+	finally:
+		shutil.rmtree(root)
+
+if __name__ == '__main__':
+	main(sys.argv)
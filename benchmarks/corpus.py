@@ -0,0 +1,177 @@
+import os
+import sys
+import random
+import argparse
+
+UNICODE_NAMES = ['café', '日本語', 'реадми', '\U0001f600 smile', 'naïve file', 'tab\there', 'quote"d']
+AUTHORS = [b'Alice Example <alice@example.com>', b'Bob Example <bob@example.com>', 'Élodie Français <elodie@example.com>'.encode()]
+
+def oid(generator):
+	return b'%040x' %(generator.getrandbits(160))
+
+def quote_path(path):
+	# what core.quotePath (the default) does to non-ASCII and special bytes
+	if all(32 < byte < 127 and byte != ord('"') and byte != ord('\\') for byte in path):
+		return path
+
+	result = bytearray(b'"')
+
+	for byte in path:
+		if byte == ord('"') or byte == ord('\\'):
+			result += b'\\' + bytes([byte])
+		elif byte == 9:
+			result += b'\\t'
+		elif 32 <= byte < 127:
+			result.append(byte)
+		else:
+			result += b'\\%03o' %(byte)
+
+	return bytes(result + b'"')
+
+def path(generator, unicode_ratio=0.0, quoted=True):
+	if generator.random() < unicode_ratio:
+		name = ('dir%d/%s %d.txt' %(generator.randrange(100), generator.choice(UNICODE_NAMES), generator.randrange(1000000))).encode()
+
+		if quoted:
+			name = quote_path(name)
+	else:
+		name = b'src/module%d/file%d.c' %(generator.randrange(1000), generator.randrange(1000000))
+
+	return name
+
+def message(generator, huge_ratio=0.0):
+	if generator.random() < huge_ratio:
+		lines = generator.randrange(1000, 20000)
+	else:
+		lines = generator.randrange(1, 6)
+
+	return [b'Line %d of a commit message with some text \xc3\xa9' %(number) for number in range(lines)]
+
+def log_text(records, seed=0, huge_ratio=0.0, merge_ratio=0.1):
+	generator = random.Random(seed)
+	lines = []
+
+	for number in range(records):
+		lines.append(b'commit ' + oid(generator))
+
+		if generator.random() < merge_ratio:
+			lines.append(b'Merge: %s %s' %(oid(generator)[:7], oid(generator)[:7]))
+
+		lines.append(b'Author: ' + generator.choice(AUTHORS))
+		lines.append(b'Date:   Mon Jan %d 10:%02d:00 2024 +0000' %(1 + number % 28, number % 60))
+		lines.append(b'')
+		lines += [b'    ' + line for line in message(generator, huge_ratio)]
+		lines.append(b'')
+
+	return b'\n'.join(lines)
+
+def status_text(records, seed=0, unicode_ratio=0.0):
+	generator = random.Random(seed)
+	staged = []
+	not_staged = []
+	untracked = []
+
+	for number in range(records):
+		name = path(generator, unicode_ratio)
+		kind = generator.randrange(3)
+
+		if kind == 0:
+			staged.append(b'\t' + generator.choice([b'modified:   ', b'new file:   ', b'deleted:    ']) + name)
+		elif kind == 1:
+			not_staged.append(b'\tmodified:   ' + name)
+		else:
+			untracked.append(b'\t' + name)
+
+	lines = [b'On branch master', b"Your branch is up to date with 'origin/master'.", b'', b'Changes to be committed:', b'  (use "git restore --staged <file>..." to unstage)']
+	lines += staged
+	lines += [b'', b'Changes not staged for commit:', b'  (use "git add <file>..." to update what will be committed)']
+	lines += not_staged
+	lines += [b'', b'Untracked files:', b'  (use "git add <file>..." to include in what will be committed)']
+	lines += untracked
+	lines.append(b'')
+
+	return b'\n'.join(lines)
+
+def status_porcelain_v2(records, seed=0, unicode_ratio=0.0):
+	generator = random.Random(seed)
+	entries = [b'# branch.oid ' + oid(generator), b'# branch.head master', b'# branch.upstream origin/master', b'# branch.ab +1 -2']
+
+	for number in range(records):
+		name = path(generator, unicode_ratio, quoted=False)
+		kind = generator.randrange(5)
+
+		if kind == 0:
+			entries.append(b'1 M. N... 100644 100644 100644 ' + oid(generator) + b' ' + oid(generator) + b' ' + name)
+		elif kind == 1:
+			entries.append(b'1 .M N... 100644 100644 100644 ' + oid(generator) + b' ' + oid(generator) + b' ' + name)
+		elif kind == 2:
+			entries.append(b'2 R. N... 100644 100644 100644 ' + oid(generator) + b' ' + oid(generator) + b' R100 ' + name)
+			entries.append(path(generator, unicode_ratio, quoted=False))
+		elif kind == 3:
+			entries.append(b'u UU N... 100644 100644 100644 100644 ' + oid(generator) + b' ' + oid(generator) + b' ' + oid(generator) + b' ' + name)
+		else:
+			entries.append(b'? ' + name)
+
+	entries.append(b'')
+
+	return b'\x00'.join(entries)
+
+def remotes(records, seed=0):
+	generator = random.Random(seed)
+	lines = []
+
+	for number in range(records):
+		url = generator.choice([b'https://github.com/example/repo%d.git' %(number), b'git@github.com:example/repo%d.git' %(number), b'/srv/git/repo%d with space.git' %(number)])
+		lines.append(b'remote%d\t%s (fetch)' %(number, url))
+		lines.append(b'remote%d\t%s (push)' %(number, url))
+
+	return b'\n'.join(lines) + b'\n'
+
+def submodule_status(records, seed=0, describe_ratio=0.5, unicode_ratio=0.0):
+	generator = random.Random(seed)
+	lines = []
+
+	for number in range(records):
+		state = generator.choice([b' ', b' ', b'+', b'-', b'U'])
+		line = state + oid(generator) + b' ' + path(generator, unicode_ratio)
+
+		# uninitialized submodules and commits without any tag or branch have no (describe) suffix
+		if state != b'-' and generator.random() < describe_ratio:
+			line += b' (%s)' %(generator.choice([b'heads/master', b'v1.2.3-4-gabcdef0', b'remotes/origin/HEAD']))
+
+		lines.append(line)
+
+	return b'\n'.join(lines) + b'\n'
+
+CORPORA = {
+	'log': lambda records, seed: log_text(records, seed),
+	'log-huge-messages': lambda records, seed: log_text(max(1, records // 100), seed, huge_ratio=0.5),
+	'status-text': lambda records, seed: status_text(records, seed),
+	'status-text-unicode': lambda records, seed: status_text(records, seed, unicode_ratio=0.5),
+	'status-porcelain-v2': lambda records, seed: status_porcelain_v2(records, seed),
+	'status-porcelain-v2-unicode': lambda records, seed: status_porcelain_v2(records, seed, unicode_ratio=0.5),
+	'remote': lambda records, seed: remotes(records, seed),
+	'submodule-status': lambda records, seed: submodule_status(records, seed),
+	'submodule-status-no-describe': lambda records, seed: submodule_status(records, seed, describe_ratio=0.0, unicode_ratio=0.3)
+}
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='write synthetic git command outputs for the parser benchmarks')
+	parser.add_argument('directory')
+	parser.add_argument('--records', type=int, default=100000)
+	parser.add_argument('--seed', type=int, default=0)
+	args = parser.parse_args(argv[1:])
+
+	if not os.path.isdir(args.directory):
+		os.makedirs(args.directory)
+
+	for name, generate in sorted(CORPORA.items()):
+		data = generate(args.records, args.seed)
+
+		with open(os.path.join(args.directory, name + '.out'), 'wb') as f:
+			f.write(data)
+
+		print('%-32s %12d bytes' %(name, len(data)))
+
+if __name__ == '__main__':
+	main(sys.argv)
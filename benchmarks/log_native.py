@@ -0,0 +1,43 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gitclient import GitClient
+from synthetic import create_repository
+
+DEFAULT_COMMITS = 100000
+
+def measure(name, function):
+	start = time.perf_counter()
+	count = 0
+
+	for item in function():
+		count += 1
+
+	elapsed = time.perf_counter() - start
+	print('%-22s %9d commits %9.3fs %12.0f commits/s' %(name, count, elapsed, count / elapsed))
+
+def main(argv):
+	commits = int(argv[1]) if len(argv) > 1 else DEFAULT_COMMITS
+	root = tempfile.mkdtemp(prefix='gitclient-bench-')
+
+	logging.getLogger('gitclient').setLevel(logging.WARNING)
+
+	try:
+		print('creating repository with %d commits...' %(commits))
+		client = GitClient.open(create_repository(os.path.join(root, 'repo'), commits=commits, files=1000, merge_every=50))
+
+		measure('log() subprocess', lambda: client.log(n=None))
+		measure('log(stream=True)', lambda: client.log(n=None, stream=True))
+		measure('log(native=True)', lambda: client.log(n=None, native=True, stream=True))
+	finally:
+		shutil.rmtree(root)
+
+if __name__ == '__main__':
+	main(sys.argv)
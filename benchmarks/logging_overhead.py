@@ -0,0 +1,84 @@
+import sys
+import os
+import io
+import time
+import shutil
+import tempfile
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gitclient
+from gitclient import GitClient, command
+from synthetic import create_repository
+
+DEFAULT_CALLS = 100000
+ERROR_OUTPUT = b'error: something went wrong\n' * 40000
+
+class CannedGitClient(GitClient):
+	# replaces the git process with a fixed result so that only the library's own overhead is measured
+	canned = None
+
+	def _execute(self, full_cmd, input=None, trace=True):
+		return self.canned
+
+def canned(returncode, output):
+	result = command()
+	result.returncode = returncode
+	result.output = output
+
+	return result
+
+def measure(name, calls, function):
+	start = time.perf_counter()
+
+	for unused in range(calls):
+		function()
+
+	elapsed = time.perf_counter() - start
+	print('%-58s %9d calls %9.3fs %10.2fus/call' %(name, calls, elapsed, elapsed / calls * 1e6))
+
+def configure(verbose):
+	logger = logging.getLogger('gitclient')
+	sink = io.StringIO()
+
+	for handler in list(logger.handlers):
+		if not isinstance(handler, logging.NullHandler):
+			logger.removeHandler(handler)
+
+	if verbose:
+		# what importing gitclient used to do: a DEBUG console handler on the library logger
+		handler = logging.StreamHandler(sink)
+		handler.setLevel(logging.DEBUG)
+		handler.setFormatter(logging.Formatter('%(asctime)s [%(name)s] [%(levelname)s] %(message)s'))
+		logger.addHandler(handler)
+		logger.setLevel(logging.DEBUG)
+	else:
+		logger.setLevel(logging.NOTSET)
+
+def main(argv):
+	calls = int(argv[1]) if len(argv) > 1 else DEFAULT_CALLS
+	root = tempfile.mkdtemp(prefix='gitclient-bench-')
+
+	try:
+		client = GitClient.open(create_repository(os.path.join(root, 'repo'), commits=10, files=10))
+		client.__class__ = CannedGitClient
+
+		for verbose, label in ((True, 'import-time DEBUG handler'), (False, 'NullHandler default')):
+			configure(verbose)
+
+			client.canned = canned(0, b'')
+			measure('add() success, %s' %(label), calls, lambda: client.add('file'))
+
+			client.canned = canned(128, ERROR_OUTPUT)
+			measure('add() 1MB error output, %s' %(label), calls // 100, lambda: client.add('file'))
+
+			gitclient.GitLogOutput.limit = None
+			measure('add() 1MB error output untruncated, %s' %(label), calls // 100, lambda: client.add('file'))
+			gitclient.GitLogOutput.limit = 4096
+	finally:
+		shutil.rmtree(root)
+
+if __name__ == '__main__':
+	main(sys.argv)
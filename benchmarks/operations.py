@@ -0,0 +1,190 @@
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gitclient
+from gitclient import GitClient, command
+from synthetic import git, create_repository
+
+class Operation:
+	def __init__(self, name, call, setup=None, teardown=None):
+		self.name = name
+		self.call = call
+		self.setup = setup
+		self.teardown = teardown
+
+def operations(client, path):
+	target = os.path.join(path, 'dir0', 'file0.txt')
+
+	def modify():
+		with open(target, 'a') as f:
+			f.write('benchmark\n')
+
+	head = []
+
+	def stage():
+		modify()
+		git(path, 'add', target)
+		head[:] = [git(path, 'rev-parse', 'HEAD').strip()]
+
+	def restore():
+		git(path, 'reset', '-q')
+		git(path, 'checkout', '-q', '--', target)
+
+	def uncommit():
+		# go back to the commit seen before the call, which is a no-op if nothing was committed
+		git(path, 'reset', '-q', '--soft', head[0])
+		restore()
+
+	branches = ['benchmark', 'master']
+
+	def checkout():
+		branches.reverse()
+		return client.checkout(branches[0])
+
+	return [
+		Operation('status', lambda: client.status()),
+		Operation('log', lambda: client.log(n=100)),
+		Operation('tag', lambda: client.tag()),
+		Operation('remote', lambda: client.remote()),
+		Operation('submodule', lambda: client.submodule()),
+		Operation('add', lambda: client.add(target), modify, restore),
+		Operation('commit', lambda: client.commit('benchmark'), stage, uncommit),
+		Operation('checkout', checkout)
+	]
+
+def spawn_baseline(repeat):
+	samples = []
+
+	for unused in range(repeat):
+		start = time.perf_counter()
+		command.execute(['git', 'version'])
+		samples.append(time.perf_counter() - start)
+
+	return statistics.median(samples)
+
+def measure(operation, repeat, spawn):
+	runs = []
+
+	for unused in range(repeat):
+		if operation.setup != None:
+			operation.setup()
+
+		with gitclient.instrumentation.capture() as records:
+			start = time.perf_counter()
+			result = operation.call()
+			total = time.perf_counter() - start
+
+		if operation.teardown != None:
+			operation.teardown()
+
+		# timings of failed calls are meaningless, stop instead of reporting them
+		if result is None or result is False:
+			raise RuntimeError('%s failed' %(operation.name))
+
+		wall = sum(record.wall for record in records)
+		processes = sum(1 for record in records if not record.cached)
+
+		runs.append({
+			'total': total,
+			'processes': processes,
+			'spawn': spawn * processes,
+			'io': max(0.0, wall - spawn * processes),
+			'parse': sum(record.parse_time for record in records),
+			'library': max(0.0, total - wall)
+		})
+
+	return dict((key, statistics.median(run[key] for run in runs)) for key in runs[0].keys())
+
+def compare(results, baseline, threshold):
+	regressions = 0
+
+	print('\n%-12s %12s %12s %8s' %('operation', 'baseline', 'current', 'ratio'))
+
+	for name, current in sorted(results['operations'].items()):
+		previous = baseline['operations'].get(name)
+
+		if previous == None:
+			continue
+
+		ratio = current['total'] / previous['total'] if previous['total'] > 0 else 0.0
+		flag = ''
+
+		if ratio > 1.0 + threshold:
+			flag = ' REGRESSION'
+			regressions += 1
+
+		print('%-12s %11.3fms %11.3fms %7.2fx%s' %(name, previous['total'] * 1000, current['total'] * 1000, ratio, flag))
+
+	return regressions
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='time every GitClient operation against a synthetic repository')
+	parser.add_argument('--commits', type=int, default=5000)
+	parser.add_argument('--files', type=int, default=1000)
+	parser.add_argument('--tags', type=int, default=100)
+	parser.add_argument('--submodules', type=int, default=4)
+	parser.add_argument('--loose', action='store_true', help='keep objects loose instead of packed')
+	parser.add_argument('--repeat', type=int, default=20)
+	parser.add_argument('--output', help='write the results as JSON')
+	parser.add_argument('--compare', help='JSON results of a previous run to compare against')
+	parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown reported as a regression')
+	args = parser.parse_args(argv[1:])
+
+	root = tempfile.mkdtemp(prefix='gitclient-bench-')
+	logging.getLogger('gitclient').setLevel(logging.WARNING)
+
+	try:
+		path = create_repository(os.path.join(root, 'repo'), commits=args.commits, files=args.files, merge_every=50, tags=args.tags, submodules=args.submodules, loose=args.loose)
+		git(root, 'clone', '-q', '--bare', path, os.path.join(root, 'upstream.git'))
+		git(path, 'remote', 'add', 'origin', os.path.join(root, 'upstream.git'))
+		git(path, 'branch', 'benchmark', 'HEAD~10')
+
+		client = GitClient.open(path)
+		spawn = spawn_baseline(args.repeat)
+		results = {
+			'metadata': {
+				'time': time.time(),
+				'python': platform.python_version(),
+				'platform': platform.platform(),
+				'git': command.execute(['git', 'version']).output.strip().decode(),
+				'repository': {'commits': args.commits, 'files': args.files, 'tags': args.tags, 'submodules': args.submodules, 'loose': args.loose},
+				'repeat': args.repeat,
+				'spawn': spawn
+			},
+			'operations': {}
+		}
+
+		print('%-12s %10s %10s %10s %10s %10s %6s' %('operation', 'total', 'spawn', 'io', 'parse', 'library', 'procs'))
+
+		for operation in operations(client, path):
+			item = measure(operation, args.repeat, spawn)
+			results['operations'][operation.name] = item
+			print('%-12s %8.3fms %8.3fms %8.3fms %8.3fms %8.3fms %6d' %(operation.name, item['total'] * 1000, item['spawn'] * 1000, item['io'] * 1000, item['parse'] * 1000, item['library'] * 1000, item['processes']))
+
+		if args.output != None:
+			with open(args.output, 'w') as f:
+				json.dump(results, f, indent=2, sort_keys=True)
+
+		regressions = 0
+
+		if args.compare != None:
+			with open(args.compare) as f:
+				regressions = compare(results, json.load(f), args.threshold)
+	finally:
+		shutil.rmtree(root)
+
+	return 1 if regressions > 0 else 0
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv))
@@ -0,0 +1,100 @@
+import sys
+import os
+import time
+import random
+import argparse
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gitclient import command, GitLog, GitStatus, GitRemote, GitSubmoduleStatus
+from corpus import CORPORA
+
+PARSERS = [
+	('GitLog.parse', GitLog.parse, ['log', 'log-huge-messages']),
+	('GitStatus.parse', GitStatus.parse, ['status-text', 'status-text-unicode']),
+	('GitStatus.parse_porcelain_v2', GitStatus.parse_porcelain_v2, ['status-porcelain-v2', 'status-porcelain-v2-unicode']),
+	('GitRemote.parse', GitRemote.parse, ['remote']),
+	('GitSubmoduleStatus.parse', GitSubmoduleStatus.parse, ['submodule-status', 'submodule-status-no-describe'])
+]
+
+def records(result):
+	if isinstance(result, GitStatus):
+		return len(result.staged) + len(result.not_staged) + len(result.untracked) + len(result.unmerged)
+
+	return len(result)
+
+def allocations(parser, cmd):
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	result = parser(cmd)
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+
+	# the result is still referenced here, so its blocks show up in the second snapshot
+	blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+	return (blocks, records(result))
+
+def run(parser, data, rounds):
+	cmd = command()
+	cmd.output = data
+	timings = []
+
+	for unused in range(rounds):
+		start = time.perf_counter()
+		parser(cmd)
+		timings.append(time.perf_counter() - start)
+
+	return timings
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='parser throughput and allocations over synthetic and adversarial corpora')
+	parser.add_argument('--records', type=int, default=100000)
+	parser.add_argument('--rounds', type=int, default=5)
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--fuzz', type=int, default=20, help='extra randomly seeded small corpora per parser, only checked for crashes')
+	args = parser.parse_args(argv[1:])
+
+	crashes = 0
+
+	print('%-30s %-30s %10s %10s %10s %10s %12s' %('parser', 'corpus', 'MB', 'min (s)', 'median (s)', 'MB/s', 'allocs/rec'))
+
+	for name, function, corpora in PARSERS:
+		for corpus in corpora:
+			data = CORPORA[corpus](args.records, args.seed)
+			cmd = command()
+			cmd.output = data
+
+			try:
+				timings = run(function, data, args.rounds)
+				blocks, count = allocations(function, cmd)
+			except Exception as e:
+				crashes += 1
+				print('%-30s %-30s CRASH %s: %s' %(name, corpus, type(e).__name__, e))
+				continue
+
+			median = statistics.median(timings)
+			size = len(data) / 1e6
+			print('%-30s %-30s %10.2f %10.4f %10.4f %10.1f %12.2f' %(name, corpus, size, min(timings), median, size / median, blocks / max(1, count)))
+
+		generator = random.Random(args.seed)
+
+		for unused in range(args.fuzz):
+			seed = generator.randrange(1 << 30)
+			corpus = generator.choice(corpora)
+			cmd = command()
+			cmd.output = CORPORA[corpus](generator.randrange(1, 200), seed)
+
+			try:
+				function(cmd)
+			except Exception as e:
+				crashes += 1
+				print('%-30s %-30s CRASH seed=%d %s: %s' %(name, corpus, seed, type(e).__name__, e))
+
+	return 1 if crashes > 0 else 0
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv))
@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gitclient import command, GitStatus
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+OID = b'0123456789abcdef0123456789abcdef01234567'
+
+def generate_text(entries):
+	staged = []
+	not_staged = []
+	untracked = []
+
+	for i in range(entries):
+		path = b'src/module%d/file%d.c' %(i % 1000, i)
+
+		if i % 3 == 0:
+			staged.append(b'\tmodified:   ' + path)
+		elif i % 3 == 1:
+			not_staged.append(b'\tmodified:   ' + path)
+		else:
+			untracked.append(b'\t' + path)
+
+	lines = [b'On branch master', b'Changes to be committed:', b'  (use "git restore --staged <file>..." to unstage)']
+	lines += staged
+	lines += [b'', b'Changes not staged for commit:', b'  (use "git add <file>..." to update what will be committed)']
+	lines += not_staged
+	lines += [b'', b'Untracked files:', b'  (use "git add <file>..." to include in what will be committed)']
+	lines += untracked
+	lines.append(b'')
+
+	return b'\n'.join(lines)
+
+def generate_porcelain_v2(entries):
+	records = [b'# branch.oid ' + OID, b'# branch.head master', b'# branch.upstream origin/master', b'# branch.ab +1 -2']
+
+	for i in range(entries):
+		path = b'src/module%d/file%d.c' %(i % 1000, i)
+
+		if i % 3 == 0:
+			records.append(b'1 M. N... 100644 100644 100644 ' + OID + b' ' + OID + b' ' + path)
+		elif i % 3 == 1:
+			records.append(b'1 .M N... 100644 100644 100644 ' + OID + b' ' + OID + b' ' + path)
+		else:
+			records.append(b'? ' + path)
+
+	records.append(b'')
+
+	return b'\x00'.join(records)
+
+def measure(parser, output, repeat):
+	cmd = command()
+	cmd.output = output
+	best = None
+
+	for i in range(repeat):
+		start = time.perf_counter()
+		parser(cmd)
+		elapsed = time.perf_counter() - start
+
+		if best == None or elapsed < best:
+			best = elapsed
+
+	return best
+
+def main(argv):
+	sizes = [int(arg) for arg in argv[1:]] or DEFAULT_SIZES
+
+	print('%10s %14s %14s %9s' %('entries', 'text (s)', 'porcelain (s)', 'speed-up'))
+
+	for entries in sizes:
+		repeat = 5 if entries <= 100000 else 1
+		text_time = measure(GitStatus.parse, generate_text(entries), repeat)
+		porcelain_time = measure(GitStatus.parse_porcelain_v2, generate_porcelain_v2(entries), repeat)
+
+		print('%10d %14.4f %14.4f %8.1fx' %(entries, text_time, porcelain_time, text_time / porcelain_time))
+
+if __name__ == '__main__':
+	main(sys.argv)
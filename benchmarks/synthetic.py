@@ -0,0 +1,91 @@
+import os
+import subprocess
+
+AUTHORS = [b'Alice Example <alice@example.com>', b'Bob Example <bob@example.com>', b'Carol Example <carol@example.com>']
+
+def git(path, *args, **kwargs):
+	return subprocess.check_output(['git'] + list(args), cwd=path, **kwargs)
+
+def fast_import_stream(commits, files, merge_every=0, start_time=1500000000, tags=0):
+	lines = []
+
+	for number in range(1, commits + 1):
+		author = AUTHORS[number % len(AUTHORS)]
+		timestamp = start_time + number * 60
+		message = b'commit %d\n\nTouches file%d.txt.\n' %(number, number % files)
+		content = b'revision %d of file %d\n' %(number, number % files) * 8
+
+		lines.append(b'commit refs/heads/master')
+		lines.append(b'mark :%d' %(number))
+		lines.append(b'author %s %d +0000' %(author, timestamp))
+		lines.append(b'committer %s %d +0000' %(author, timestamp))
+		lines.append(b'data %d' %(len(message)))
+		lines.append(message)
+
+		if number > 1:
+			lines.append(b'from :%d' %(number - 1))
+
+			if merge_every > 0 and number % merge_every == 0 and number > 2:
+				lines.append(b'merge :%d' %(number - 2))
+
+		lines.append(b'M 100644 inline dir%d/file%d.txt' %(number % files % 16, number % files))
+		lines.append(b'data %d' %(len(content)))
+		lines.append(content)
+
+	# annotated tags spread evenly over the history
+	for number in range(tags):
+		mark = 1 + number * commits // tags
+		message = b'release %d\n' %(number)
+
+		lines.append(b'tag v%d.%d' %(number // 100, number % 100))
+		lines.append(b'from :%d' %(mark))
+		lines.append(b'tagger %s %d +0000' %(AUTHORS[0], start_time + mark * 60))
+		lines.append(b'data %d' %(len(message)))
+		lines.append(message)
+
+	return b'\n'.join(lines) + b'\n'
+
+def create_repository(path, commits=1000, files=100, merge_every=0, repack=True, tags=0, submodules=0, loose=False, object_format='sha1'):
+	os.makedirs(path)
+	git(path, 'init', '-q', '--object-format=%s' %(object_format))
+	git(path, 'config', 'user.name', 'Alice Example')
+	git(path, 'config', 'user.email', 'alice@example.com')
+	git(path, 'fast-import', '--quiet', input=fast_import_stream(commits, files, merge_every, tags=tags))
+	git(path, 'checkout', '-q', '-f', 'master')
+
+	if submodules > 0:
+		add_submodules(path, submodules)
+
+	if loose:
+		unpack_objects(path)
+	elif repack:
+		git(path, 'repack', '-adq')
+
+	return path
+
+def add_submodules(path, count):
+	parent = os.path.dirname(path)
+	environment = dict(os.environ, GIT_AUTHOR_NAME='Alice Example', GIT_AUTHOR_EMAIL='alice@example.com', GIT_COMMITTER_NAME='Alice Example', GIT_COMMITTER_EMAIL='alice@example.com')
+
+	for number in range(count):
+		upstream = os.path.join(parent, '%s-sub%d.git' %(os.path.basename(path), number))
+		create_repository(upstream + '.src', commits=10, files=5)
+		git(parent, 'clone', '-q', '--bare', upstream + '.src', upstream)
+		git(path, '-c', 'protocol.file.allow=always', 'submodule', 'add', '-q', upstream, 'modules/sub%d' %(number))
+
+	git(path, 'commit', '-q', '-m', 'add %d submodules' %(count), env=environment)
+
+def unpack_objects(path):
+	pack_dir = os.path.join(path, '.git', 'objects', 'pack')
+
+	for name in os.listdir(pack_dir):
+		if name.endswith('.pack'):
+			with open(os.path.join(pack_dir, name), 'rb') as f:
+				data = f.read()
+
+			# unpack-objects skips objects that are already present, so the pack goes first
+			for suffix in ('.pack', '.idx', '.rev'):
+				if os.path.exists(os.path.join(pack_dir, name[:-5] + suffix)):
+					os.remove(os.path.join(pack_dir, name[:-5] + suffix))
+
+			git(path, 'unpack-objects', '-q', input=data)
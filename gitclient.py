@@ -1,31 +1,103 @@
 import subprocess
+import asyncio
+import weakref
+import signal
 import re
 import os
+import shutil
+import tempfile
+import shlex
+import array
+import binascii
+import calendar
+import atexit
+import threading
+import collections
+import itertools
+import mmap
+import heapq
+import struct
+import zlib
+import hashlib
+import concurrent.futures
+import math
+import time
+import contextlib
+import json
+import errno
+import select
 import logging
 
+try:
+	import resource
+except ImportError:
+	resource = None
+
+try:
+	import ctypes
+	import ctypes.util
+except ImportError:
+	ctypes = None
+
 #TODO:
 # add API to set credentials (Ammon Larsen)
 
+# applications decide where log records go, see logging.basicConfig
 logger = logging.getLogger('gitclient')
-logger.setLevel(logging.DEBUG)
-logger_handler_console = logging.StreamHandler()
-logger_handler_console.setLevel(logging.DEBUG)
-logger_formatter = logging.Formatter('%(asctime)s [%(name)s] [%(levelname)s] %(message)s')
-logger_handler_console.setFormatter(logger_formatter)
-logger.addHandler(logger_handler_console)
+logger.addHandler(logging.NullHandler())
+
+class GitLogOutput:
+	__slots__ = ('output',)
+	limit = 4096
+
+	def __init__(self, output):
+		self.output = output
+
+	def __str__(self):
+		output = self.output
+		limit = GitLogOutput.limit
+
+		# the end of git's output usually holds the fatal message, so keep both ends
+		if limit != None and len(output) > limit:
+			output = output[:limit // 2] + (b'... %d bytes truncated ...' if isinstance(output, bytes) else '... %d bytes truncated ...') %(len(output) - limit // 2 * 2) + output[len(output) - limit // 2:]
+
+		return str(output)
 
 class command:
 	output = ''
 	returncode = 0
+	record = None
 
 	def __str__(self):
 		return 'returncode=%d\r\noutput=%s' %(self.returncode, self.output)
 	
 	@staticmethod
-	def execute(cmd):
+	def describe(cmd):
+		if isinstance(cmd, str):
+			result = cmd
+		else:
+			result = ' '.join(cmd)
+
+		return result
+
+	@staticmethod
+	def split(cmd):
+		if isinstance(cmd, str) and os.name != 'nt':
+			cmd = shlex.split(cmd)
+
+		return cmd
+	
+	@staticmethod
+	def environment():
+		# messages and progress lines are parsed, so git must not translate them
+		return dict(os.environ, LC_ALL='C')
+
+	@staticmethod
+	def execute(cmd, input=None, cwd=None):
 		result = command()
+
 		try:
-			result.output = subprocess.check_output(cmd, stderr=subprocess.STDOUT)
+			result.output = subprocess.check_output(command.split(cmd), stderr=subprocess.STDOUT, input=input, cwd=cwd, env=command.environment())
 			result.returncode = 0
 		except subprocess.CalledProcessError as e:
 			result.output = e.output
@@ -33,10 +105,569 @@ class command:
 
 		return result
 
+	@staticmethod
+	def stream(full_cmd, name, separator=b'\x00', chunk_size=65536, cwd=None):
+		record = instrumentation.begin(full_cmd, cwd, name)
+		# stderr goes to a file, a pipe nobody reads while stdout is drained can fill up and stall git
+		errors = tempfile.TemporaryFile()
+		process = subprocess.Popen(full_cmd, stdout=subprocess.PIPE, stderr=errors, cwd=cwd, env=command.environment())
+		buffer = bytearray()
+		size = 0
+
+		try:
+			while True:
+				chunk = process.stdout.read1(chunk_size)
+
+				if chunk == b'':
+					break
+
+				size += len(chunk)
+				buffer += chunk
+				start = 0
+
+				while True:
+					end = buffer.find(separator, start)
+
+					if end == -1:
+						break
+
+					yield bytes(buffer[start:end])
+					start = end + len(separator)
+
+				del buffer[:start]
+
+			if len(buffer) > 0:
+				yield bytes(buffer)
+
+			returncode = process.wait()
+
+			if returncode != 0:
+				errors.seek(0)
+				error = errors.read()
+				logger.error("git %s returned %s, code=%d", name, GitLogOutput(error), returncode)
+
+				# a failed stream must not look like an empty one to the consumer
+				raise subprocess.CalledProcessError(returncode, full_cmd, stderr=error)
+		finally:
+			if process.poll() == None:
+				process.kill()
+				process.wait()
+
+			process.stdout.close()
+			errors.close()
+
+			# a consumer that stops early shows up with the code of the killed process
+			instrumentation.end(record, process.returncode, size)
+			instrumentation.emit(record)
+
+class GitCallRecord:
+	__slots__ = ('name', 'command', 'path', 'start', 'wall', 'cpu_user', 'cpu_system', 'output_bytes', 'parse_time', 'returncode', 'cached', 'counters')
+
+	def __init__(self, name=None, full_cmd=None, path=None):
+		self.name = name
+		self.command = full_cmd
+		self.path = path
+		self.start = time.time()
+		self.wall = 0.0
+		self.cpu_user = None
+		self.cpu_system = None
+		self.output_bytes = 0
+		self.parse_time = 0.0
+		self.returncode = None
+		self.cached = False
+		self.counters = None
+
+	def __str__(self):
+		return '%s: wall=%.6fs parse=%.6fs output=%d bytes code=%s%s' %(self.name, self.wall, self.parse_time, self.output_bytes, self.returncode, ' (cached)' if self.cached else '')
+
+	def to_dict(self):
+		return {
+			'name': self.name,
+			'command': command.describe(self.command) if self.command != None else None,
+			'path': self.path,
+			'start': self.start,
+			'wall': self.wall,
+			'cpu_user': self.cpu_user,
+			'cpu_system': self.cpu_system,
+			'output_bytes': self.output_bytes,
+			'parse_time': self.parse_time,
+			'returncode': self.returncode,
+			'cached': self.cached
+		}
+
+class GitInstrumentation:
+	def __init__(self):
+		self.sinks = []
+		self.lock = threading.Lock()
+
+	def enabled(self):
+		return len(self.sinks) > 0
+
+	def add_sink(self, sink):
+		with self.lock:
+			self.sinks = self.sinks + [sink]
+
+		return sink
+
+	def remove_sink(self, sink):
+		with self.lock:
+			self.sinks = [item for item in self.sinks if item is not sink]
+
+	@contextlib.contextmanager
+	def capture(self):
+		sink = self.add_sink(GitMemorySink())
+
+		try:
+			yield sink.records
+		finally:
+			self.remove_sink(sink)
+
+	def begin(self, full_cmd, path, name=None):
+		result = None
+
+		if len(self.sinks) > 0:
+			if name == None:
+				name = command.split(full_cmd)[1] if len(command.split(full_cmd)) > 1 else command.describe(full_cmd)
+
+			result = GitCallRecord(name, full_cmd, path)
+
+			# child rusage is process wide, concurrent calls from other threads will be attributed here too
+			if resource != None:
+				result.counters = (time.perf_counter(), resource.getrusage(resource.RUSAGE_CHILDREN))
+			else:
+				result.counters = (time.perf_counter(), None)
+
+		return result
+
+	def end(self, record, returncode, output_bytes):
+		if record != None:
+			record.wall = time.perf_counter() - record.counters[0]
+			record.returncode = returncode
+			record.output_bytes = output_bytes
+
+			if record.counters[1] != None:
+				usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+				record.cpu_user = usage.ru_utime - record.counters[1].ru_utime
+				record.cpu_system = usage.ru_stime - record.counters[1].ru_stime
+
+			record.counters = None
+
+	def emit(self, record):
+		if record != None:
+			for sink in self.sinks:
+				try:
+					if callable(sink):
+						sink(record)
+					else:
+						sink.record(record)
+				except Exception as e:
+					logger.error("instrumentation sink %s failed (%s)", sink, e)
+
+	def execute(self, full_cmd, path=None, input=None, trace=True, name=None):
+		record = self.begin(full_cmd, path, name)
+		result = command.execute(full_cmd, input=input, cwd=path)
+
+		if record != None:
+			self.end(record, result.returncode, len(result.output))
+			result.record = record
+
+			if trace:
+				self.emit(record)
+
+		return result
+
+	def cached(self, name, full_cmd, path):
+		if len(self.sinks) > 0:
+			record = GitCallRecord(name, full_cmd, path)
+			record.cached = True
+			record.returncode = 0
+			self.emit(record)
+
+class GitMemorySink:
+	def __init__(self):
+		self.records = []
+
+	def record(self, record):
+		self.records.append(record)
+
+class GitHistogramSink:
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.calls = {}
+
+	def record(self, record):
+		with self.lock:
+			stats = self.calls.get(record.name)
+
+			if stats == None:
+				stats = self.calls[record.name] = GitFleetStats()
+
+			stats.count += 1
+			stats.elapsed += record.wall
+			stats.latencies.append(record.wall)
+
+			if record.returncode != 0 and not record.cached:
+				stats.errors += 1
+
+	def __str__(self):
+		return '\n'.join('%-16s count=%d errors=%d total=%.3fs p50=%.6fs p90=%.6fs p99=%.6fs' %(name, stats.count, stats.errors, stats.elapsed, stats.percentile(50), stats.percentile(90), stats.percentile(99)) for name, stats in self.summary())
+
+	def summary(self):
+		with self.lock:
+			return sorted(self.calls.items(), key=lambda item: item[1].elapsed, reverse=True)
+
+	def histogram(self, name):
+		result = collections.Counter()
+
+		# power of two millisecond buckets
+		for latency in self.calls[name].latencies:
+			result[2 ** max(0, int(math.ceil(math.log(max(latency * 1000, 1), 2))))] += 1
+
+		return sorted(result.items())
+
+class GitJsonLinesSink:
+	def __init__(self, file):
+		self.lock = threading.Lock()
+		self.owned = isinstance(file, str)
+		self.file = open(file, 'a') if self.owned else file
+
+	def record(self, record):
+		line = json.dumps(record.to_dict()) + '\n'
+
+		with self.lock:
+			self.file.write(line)
+			self.file.flush()
+
+	def close(self):
+		if self.owned:
+			self.file.close()
+
+class GitSpanSink:
+	def __init__(self, exporter=None, service='gitclient'):
+		self.exporter = exporter
+		self.service = service
+		self.spans = []
+		self.local = threading.local()
+
+	def export(self, span):
+		if self.exporter != None:
+			self.exporter(span)
+		else:
+			self.spans.append(span)
+
+	def _parent(self):
+		stack = getattr(self.local, 'stack', None)
+
+		return stack[-1] if stack else None
+
+	@contextlib.contextmanager
+	def span(self, name, **attributes):
+		parent = self._parent()
+		span = {
+			'trace_id': parent['trace_id'] if parent != None else binascii.hexlify(os.urandom(16)).decode(),
+			'span_id': binascii.hexlify(os.urandom(8)).decode(),
+			'parent_span_id': parent['span_id'] if parent != None else None,
+			'name': name,
+			'start_time_unix_nano': time.time_ns() if hasattr(time, 'time_ns') else int(time.time() * 1e9),
+			'attributes': dict(attributes, **{'service.name': self.service})
+		}
+
+		self.local.stack = getattr(self.local, 'stack', []) + [span]
+
+		try:
+			yield span
+		finally:
+			self.local.stack = self.local.stack[:-1]
+			span['end_time_unix_nano'] = time.time_ns() if hasattr(time, 'time_ns') else int(time.time() * 1e9)
+			self.export(span)
+
+	def record(self, record):
+		parent = self._parent()
+		start = int(record.start * 1e9)
+
+		self.export({
+			'trace_id': parent['trace_id'] if parent != None else binascii.hexlify(os.urandom(16)).decode(),
+			'span_id': binascii.hexlify(os.urandom(8)).decode(),
+			'parent_span_id': parent['span_id'] if parent != None else None,
+			'name': 'git %s' %(record.name),
+			'start_time_unix_nano': start,
+			'end_time_unix_nano': start + int(record.wall * 1e9),
+			'attributes': dict((('git.%s' %(key), value) for key, value in record.to_dict().items() if value != None), **{'service.name': self.service})
+		})
+
+instrumentation = GitInstrumentation()
+
+class GitExecutionMode:
+	Process = 0
+	Pooled = 1
+
+class GitObjectInfo:
+	__slots__ = ('oid', 'type', 'size', 'data')
+
+	def __init__(self):
+		self.oid = None
+		self.type = None
+		self.size = 0
+		self.data = None
+
+	def __str__(self):
+		return '%s %s %d' %(self.oid.decode(), self.type.decode(), self.size)
+
+	@staticmethod
+	def parse_header(line):
+		result = None
+		tokens = line.rstrip(b'\n').split(b' ')
+
+		if len(tokens) == 3:
+			result = GitObjectInfo()
+			result.oid = tokens[0]
+			result.type = tokens[1]
+			result.size = int(tokens[2])
+
+		return result
+
+	@staticmethod
+	def parse(cmdres):
+		result = None
+
+		if cmdres.returncode == 0:
+			end = cmdres.output.find(b'\n')
+
+			if end != -1:
+				result = GitObjectInfo.parse_header(cmdres.output[:end])
+
+				if result != None and len(cmdres.output) > end + 1:
+					result.data = cmdres.output[end + 1:end + 1 + result.size]
+
+		return result
+
+class GitCatFileProcess:
+	def __init__(self, path, batch_check=False):
+		self.path = path
+		self.batch_check = batch_check
+		self.lock = threading.Lock()
+		self.process = None
+
+	def start(self):
+		if self.batch_check:
+			option = '--batch-check'
+		else:
+			option = '--batch'
+
+		self.process = subprocess.Popen(['git', 'cat-file', option], stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=self.path, env=command.environment())
+
+	def _discard(self):
+		process = self.process
+		self.process = None
+
+		if process != None:
+			process.kill()
+			process.wait()
+
+			for pipe in (process.stdin, process.stdout):
+				try:
+					pipe.close()
+				except OSError:
+					pass
+
+	def close(self):
+		with self.lock:
+			if self.process != None:
+				try:
+					self.process.stdin.close()
+					self.process.wait(timeout=5)
+				except Exception:
+					self.process.kill()
+				self.process = None
+
+	def query(self, name):
+		result = None
+		record = None
+
+		# one record per query, the worker process itself lives on between queries
+		if instrumentation.enabled():
+			record = instrumentation.begin(['git', 'cat-file', '--batch-check' if self.batch_check else '--batch', name.decode(errors='replace')], self.path, 'cat-file')
+
+		if b'\n' in name:
+			logger.error("cannot query object (name contains a newline)")
+		else:
+			with self.lock:
+				for attempt in range(2):
+					try:
+						if self.process == None or self.process.poll() != None:
+							self.start()
+
+						self.process.stdin.write(name + b'\n')
+						self.process.stdin.flush()
+
+						header = self.process.stdout.readline()
+
+						# a worker that exits between poll() and the reply shows up as end of file
+						if not header.endswith(b'\n'):
+							raise EOFError()
+
+						result = GitObjectInfo.parse_header(header)
+
+						if result != None and not self.batch_check:
+							result.data = self.process.stdout.read(result.size)
+
+							if len(result.data) != result.size or self.process.stdout.read(1) != b'\n':
+								raise EOFError()
+						break
+					except (OSError, ValueError, EOFError):
+						logger.error("git cat-file worker for %s died, restarting", self.path)
+						self._discard()
+						result = None
+
+		if record != None:
+			instrumentation.end(record, 0 if result != None else 1, result.size if result != None else 0)
+			instrumentation.emit(record)
+
+		return result
+
+class GitProcessPool:
+	def __init__(self, max_repositories=64):
+		self.max_repositories = max_repositories
+		self.lock = threading.Lock()
+		self.workers = collections.OrderedDict()
+
+	def get(self, path, batch_check=False):
+		key = (os.path.abspath(path), batch_check)
+		evicted = None
+
+		with self.lock:
+			worker = self.workers.pop(key, None)
+
+			if worker == None:
+				worker = GitCatFileProcess(key[0], batch_check)
+
+			self.workers[key] = worker
+
+			if len(self.workers) > self.max_repositories:
+				evicted = self.workers.popitem(last=False)[1]
+
+		if evicted != None:
+			evicted.close()
+
+		return worker
+
+	def close(self, path=None):
+		with self.lock:
+			if path == None:
+				keys = list(self.workers.keys())
+			else:
+				path = os.path.abspath(path)
+				keys = [key for key in self.workers.keys() if key[0] == path]
+
+			workers = [self.workers.pop(key) for key in keys]
+
+		for worker in workers:
+			worker.close()
+
+process_pool = GitProcessPool()
+atexit.register(process_pool.close)
+
+class GitBytesColumn:
+	__slots__ = ('data', 'ends', 'missing')
+
+	def __init__(self):
+		self.data = bytearray()
+		self.ends = array.array('Q')
+		self.missing = bytearray()
+
+	def __len__(self):
+		return len(self.ends)
+
+	def __getitem__(self, index):
+		result = None
+
+		if not self.missing[index]:
+			if index == 0:
+				start = 0
+			else:
+				start = self.ends[index - 1]
+
+			result = bytes(self.data[start:self.ends[index]])
+
+		return result
+
+	def append(self, value):
+		if value == None:
+			self.missing.append(1)
+		else:
+			self.data += value
+			self.missing.append(0)
+
+		self.ends.append(len(self.data))
+
+	def select_prefix(self, prefix, indexes):
+		data = self.data
+		ends = self.ends
+
+		return array.array('L', [index for index in indexes if data.startswith(prefix, ends[index - 1] if index > 0 else 0, ends[index])])
+
+class GitInternedColumn:
+	__slots__ = ('ids', 'values', 'lookup')
+
+	def __init__(self):
+		self.ids = array.array('L')
+		self.values = []
+		self.lookup = {}
+
+	def __len__(self):
+		return len(self.ids)
+
+	def __getitem__(self, index):
+		return self.values[self.ids[index]]
+
+	def append(self, value):
+		value_id = self.lookup.get(value)
+
+		if value_id == None:
+			value_id = len(self.values)
+			self.lookup[value] = value_id
+			self.values.append(value)
+
+		self.ids.append(value_id)
+
+	def matching_ids(self, predicate):
+		return set(value_id for value_id, value in enumerate(self.values) if predicate(value))
+
+	def select(self, ids, indexes=None):
+		column = self.ids
+
+		if indexes == None:
+			result = array.array('L', [index for index, value_id in enumerate(column) if value_id in ids])
+		else:
+			result = array.array('L', [index for index in indexes if column[index] in ids])
+
+		return result
+
+def parse_git_date(date):
+	result = None
+
+	# "Tue Mar 3 10:00:00 2020 +0100", as printed by git log's default date format
+	tokens = date.split()
+
+	if len(tokens) == 6 and tokens[1] in GIT_MONTHS:
+		clock = tokens[3].split(b':')
+		offset = int(tokens[5])
+		offset = (abs(offset) // 100 * 3600 + abs(offset) % 100 * 60) * (-1 if offset < 0 else 1)
+		result = calendar.timegm((int(tokens[4]), GIT_MONTHS[tokens[1]], int(tokens[2]), int(clock[0]), int(clock[1]), int(clock[2]), 0, 0, 0)) - offset
+
+	return result
+
+GIT_WEEKDAYS = b'Mon Tue Wed Thu Fri Sat Sun'.split()
+GIT_MONTH_NAMES = b'Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec'.split()
+GIT_MONTHS = dict((name, number + 1) for number, name in enumerate(GIT_MONTH_NAMES))
+
 class GitRemote:
-	name = None
-	url = None
-	type = None
+	__slots__ = ('name', 'url', 'type')
+
+	def __init__(self):
+		self.name = None
+		self.url = None
+		self.type = None
 	
 	@staticmethod
 	def parse(cmdres):
@@ -68,14 +699,43 @@ class GitRemote:
 		return result
 		
 class GitFileChangeDescription:
-	change_type = None
-	file = ''
+	__slots__ = ('change_type', 'file', 'original_file', 'submodule')
+
+	porcelain_change_types = {
+		ord('M'): b'modified',
+		ord('T'): b'typechange',
+		ord('A'): b'new file',
+		ord('D'): b'deleted',
+		ord('R'): b'renamed',
+		ord('C'): b'copied',
+	}
+
+	porcelain_unmerged_types = {
+		b'DD': b'both deleted',
+		b'AU': b'added by us',
+		b'UD': b'deleted by them',
+		b'UA': b'added by them',
+		b'DU': b'deleted by us',
+		b'AA': b'both added',
+		b'UU': b'both modified',
+	}
+
+	def __init__(self):
+		self.change_type = None
+		self.file = ''
+		self.original_file = None
+		self.submodule = None
 	
 	def __str__(self):
+		if self.original_file != None:
+			file = '%s -> %s' %(self.original_file.decode(), self.file.decode())
+		else:
+			file = self.file.decode()
+
 		if self.change_type != None:
-			string = '%s (%s)' %(self.file.decode(), self.change_type.decode())
+			string = '%s (%s)' %(file, self.change_type.decode())
 		else:
-			string = '%s' %(self.file.decode())
+			string = '%s' %(file)
 			
 		return string
 	
@@ -85,7 +745,7 @@ class GitFileChangeDescription:
 		line = line.replace(b'(new commits)', b'')
 		line = line.strip()
 
-		tokens = line.split(b':')
+		tokens = line.split(b':', 1)
 		
 		if len(tokens) == 1:
 			result.file = tokens[0]
@@ -96,11 +756,17 @@ class GitFileChangeDescription:
 		return result
 
 class GitLog:
-	commit = None
-	author = None
-	date = None
-	description = None
-	merge = None
+	__slots__ = ('commit', 'author', 'date', 'description', 'merge')
+
+	stream_format = '%H%x00%p%x00%an <%ae>%x00%ad%x00%B'
+	stream_fields = 5
+
+	def __init__(self):
+		self.commit = None
+		self.author = None
+		self.date = None
+		self.description = None
+		self.merge = None
 
 	def __str__(self):
 		string = 'commit %s\r\nAuthor: %s\r\nDate: %s' %(self.commit.decode(), self.author.decode(), self.date.decode())
@@ -110,9 +776,13 @@ class GitLog:
 	def parse(cmdres):
 		result = []
 		item = None
+		description = None
 
 		for line in cmdres.output.split(b'\n'):
 			if line.startswith(b'commit'):
+				if description:
+					item.description = b'\n'.join(description)
+				description = []
 				item = GitLog()
 				item.commit = line.split(b' ')[1]
 				result.append(item)
@@ -125,583 +795,4765 @@ class GitLog:
 			elif line == b'':
 				continue
 			else:
-				if item.description == None:
-					item.description = line
-				else:
-					item.description += b'\n' + line
+				description.append(line)
+
+		if description:
+			item.description = b'\n'.join(description)
 		
 		return result
 
-class GitTag:
 	@staticmethod
-	def parse(cmdres):
-		result = cmdres.output.split(b'\n')		
+	def from_fields(fields):
+		result = GitLog()
+		result.commit = fields[0]
+		result.author = fields[2]
+		result.date = fields[3]
+
+		if b' ' in fields[1]:
+			result.merge = fields[1]
+
+		result.description = GitLog.indent_message(fields[4])
+
 		return result
-		
-class GitStatus:
-	branch = ''
-	staged = None
-	not_staged = None
-	untracked = None
-	
-	def __str__(self):
-		string = 'branch: %s' %(str(self.branch))
-		
-		if len(self.staged) > 0:
-			string = string + '\r\nStaged:'
-			for file in self.staged:
-				string = string + '\r\n\t' + str(file)
-		if len(self.not_staged) > 0:
-			string = string + '\r\nNot staged:'
-			for file in self.not_staged:
-				string = string + '\r\n\t' + str(file)
-		if len(self.untracked) > 0:
-			string = string + '\r\nUntracked:'
-			for file in self.untracked:
-				string = string + '\r\n\t' + str(file)
 
-		return string
-	
 	@staticmethod
-	def parse(cmdres):
+	def indent_message(message):
 		result = None
-		
-		if cmdres != None:
-			result = GitStatus()
-			result.staged = []
-			result.not_staged = []
-			result.untracked = []
+		# the message as git log prints it: outer blank lines dropped, trailing spaces trimmed, tabs expanded, indented
+		lines = [line.rstrip().expandtabs(8) for line in message.split(b'\n')]
+
+		while len(lines) > 0 and lines[0] == b'':
+			lines.pop(0)
+
+		while len(lines) > 0 and lines[-1] == b'':
+			lines.pop()
+
+		if len(lines) > 0:
+			result = b'\n'.join(b'    ' + line for line in lines)
 
-			is_reading_staged = False
-			is_reading_not_staged = False
-			is_reading_untracked = False
-			
-			for line in cmdres.output.split(b'\n'):
-				if b'(use' in line or line == b'':
-					continue
-				elif b'Changes to be committed' in line:
-					is_reading_staged = True
-					is_reading_not_staged = False
-					is_reading_untracked = False
-				elif b'Changes not staged for commit' in line:
-					is_reading_staged = False
-					is_reading_not_staged = True
-					is_reading_untracked = False
-				elif b'Untracked files' in line:
-					is_reading_staged = False
-					is_reading_not_staged = False
-					is_reading_untracked = True
-				elif is_reading_staged == True:
-					file = GitFileChangeDescription.parse(line)
-					if file != None:
-						result.staged.append(file)
-				elif is_reading_not_staged == True:
-					file = GitFileChangeDescription.parse(line)
-					if file != None:
-						result.not_staged.append(file)
-				elif is_reading_untracked == True:
-					file = GitFileChangeDescription.parse(line)
-					if file != None:
-						result.untracked.append(file)
-				elif b'On branch' in line:
-					result.branch = line.split(b' ')[2]
-				elif b'HEAD detached at' in line:
-					result.branch = line.split(b' ')[3]
-			
 		return result
 
-class GitResetMode:
-	Mixed = 0
-	Soft = 1
-	Hard = 2
-	Merged = 3
-	Keep = 4
+	@staticmethod
+	def parse_stream(full_cmd, chunk_size=65536, cwd=None):
+		fields = []
+
+		for field in command.stream(full_cmd, 'log', chunk_size=chunk_size, cwd=cwd):
+			fields.append(field)
+
+			if len(fields) == GitLog.stream_fields:
+				yield GitLog.from_fields(fields)
+				fields = []
+
+class GitLogColumns:
+	def __init__(self):
+		self.oid_size = 20
+		self.commits = bytearray()
+		self.authors = GitInternedColumn()
+		self.timestamps = array.array('q')
+		self.dates = GitBytesColumn()
+		self.merges = GitBytesColumn()
+		self.descriptions = GitBytesColumn()
+
+	def __len__(self):
+		return len(self.timestamps)
+
+	def __getitem__(self, index):
+		result = GitLog()
+		result.commit = binascii.hexlify(self.commits[index * self.oid_size:(index + 1) * self.oid_size])
+		result.author = self.authors[index]
+		result.date = self.dates[index]
+		result.merge = self.merges[index]
+		result.description = self.descriptions[index]
+		return result
+
+	def __iter__(self):
+		return self.rows(range(len(self)))
+
+	def rows(self, indexes):
+		for index in indexes:
+			yield self[index]
+
+	def append(self, log):
+		if len(self.timestamps) == 0:
+			self.oid_size = len(log.commit) // 2
+
+		self.commits += binascii.unhexlify(log.commit)
+		self.authors.append(log.author)
+		self.dates.append(log.date)
+		self.merges.append(log.merge)
+		self.descriptions.append(log.description)
+
+		timestamp = None
+
+		if log.date != None:
+			timestamp = parse_git_date(log.date)
+
+		if timestamp == None:
+			timestamp = -1
+
+		self.timestamps.append(timestamp)
+
+	def filter(self, author=None, since=None, until=None):
+		result = None
+
+		if author != None:
+			result = self.authors.select(self.authors.matching_ids(lambda value: author in value))
+
+		if since != None or until != None:
+			if since == None:
+				since = -1
+			if until == None:
+				until = 1 << 62
+			if result == None:
+				result = range(len(self))
+
+			timestamps = self.timestamps
+			result = array.array('L', [index for index in result if since <= timestamps[index] <= until])
+
+		if result == None:
+			result = array.array('L', range(len(self)))
+
+		return result
+
+	@staticmethod
+	def from_records(logs):
+		result = GitLogColumns()
+
+		for log in logs:
+			result.append(log)
+
+		return result
+
+class GitTag:
+	__slots__ = ('name', 'object', 'type', 'commit', 'date', 'subject')
+
+	stream_format = '%(refname:strip=2)%00%(objectname)%00%(objecttype)%00%(*objectname)%00%(*objecttype)%00%(creatordate:unix)%00%(contents:subject)'
+
+	def __init__(self):
+		self.name = None
+		self.object = None
+		self.type = None
+		self.commit = None
+		self.date = None
+		self.subject = None
 
-class GitSubmoduleStatus:
-	is_current_commit_checked_out = True
-	is_initialized = True
-	has_merge_conflicts = False
-	current_commit_id_checked_out = None
-	path = None
-	
 	def __str__(self):
-		attributes = []
-		
-		if not self.is_current_commit_checked_out:
-			attributes.append('+')
-		if self.has_merge_conflicts:
-			attributes.append('U')
-		if not self.is_initialized:
-			attributes.append('-')
+		return '%s %s %s' %(self.name.decode(), (self.commit or self.object).decode(), self.subject.decode(errors='replace'))
+
+	@property
+	def annotated(self):
+		return self.type == b'tag'
+
+	@staticmethod
+	def parse(cmdres):
+		result = [line for line in cmdres.output.split(b'\n') if line != b'']
+		return result
+
+	@staticmethod
+	def from_line(line):
+		result = GitTag()
+		fields = line.split(b'\x00', 6)
+
+		result.name, result.object, result.type = fields[0:3]
+		result.date = int(fields[5]) if fields[5] != b'' else None
+		result.subject = fields[6]
+
+		# for annotated tags the peeled fields name the tagged object, a tag of a tag is left to peel()
+		if fields[3] != b'':
+			if fields[4] == b'commit':
+				result.commit = fields[3]
+		elif result.type == b'commit':
+			result.commit = result.object
+
+		return result
+
+	@staticmethod
+	def peel(tags, cwd=None):
+		# for-each-ref peels a single level, nested tags are followed down to their commit in one batch
+		nested = [tag for tag in tags if tag.annotated and tag.commit == None]
+
+		if len(nested) > 0:
+			cmd = instrumentation.execute(['git', 'cat-file', '--batch-check=%(objectname) %(objecttype)'], cwd, b''.join(tag.object + b'^{}\n' for tag in nested))
+
+			if cmd.returncode == 0:
+				for tag, line in zip(nested, cmd.output.split(b'\n')):
+					fields = line.split(b' ')
+
+					if len(fields) == 2 and fields[1] == b'commit':
+						tag.commit = fields[0]
+
+		return tags
+
+	@staticmethod
+	def parse_records(cmdres, cwd=None):
+		result = GitTag.peel([GitTag.from_line(line) for line in cmdres.output.split(b'\n') if line != b''], cwd)
+		return result
+
+	@staticmethod
+	def parse_stream(full_cmd, chunk_size=65536, cwd=None):
+		for line in command.stream(full_cmd, 'for-each-ref', separator=b'\n', chunk_size=chunk_size, cwd=cwd):
+			if line != b'':
+				yield GitTag.peel([GitTag.from_line(line)], cwd)[0]
 		
-		if len(attributes) > 0:
-			attributes = ",".join(attributes)
-			attributes = '(' + attributes + ')'
-			string = '%s %s %s' %(self.current_commit_id_checked_out.decode(), self.path.decode(), attributes)
+class GitDiffEntry:
+	__slots__ = ('path', 'original_path', 'added', 'deleted')
+
+	def __init__(self, path=None, original_path=None, added=None, deleted=None):
+		self.path = path
+		self.original_path = original_path
+		self.added = added
+		self.deleted = deleted
+
+	def __str__(self):
+		if self.original_path != None:
+			file = '%s -> %s' %(self.original_path.decode(errors='replace'), self.path.decode(errors='replace'))
 		else:
-			string = '%s %s' %(self.current_commit_id_checked_out.decode(), self.path.decode())
-	
+			file = self.path.decode(errors='replace')
+
+		if self.binary:
+			string = '%s (binary)' %(file)
+		else:
+			string = '%s +%d -%d' %(file, self.added, self.deleted)
+
 		return string
-		
+
+	@property
+	def binary(self):
+		return self.added == None
+
+	@staticmethod
+	def parse_fields(fields):
+		entry = None
+
+		for field in fields:
+			if entry != None:
+				# a rename or copy header is followed by the source and destination paths
+				if entry.original_path == None:
+					entry.original_path = field
+				else:
+					entry.path = field
+					yield entry
+					entry = None
+			elif field != b'':
+				added, deleted, path = field.split(b'\t', 2)
+				entry = GitDiffEntry(path, None, int(added) if added != b'-' else None, int(deleted) if deleted != b'-' else None)
+
+				if path != b'':
+					yield entry
+					entry = None
+
 	@staticmethod
 	def parse(cmdres):
-		result = None
-		
-		if cmdres.returncode == 0:
-			result = []
-			for line in cmdres.output.split(b'\n'):
-				if line == b'':
-					continue
-					
-				item = GitSubmoduleStatus()
-				
-				if line[0:1] == b'U':
-					item.has_merge_conflicts = True
-				elif line[0:1] == b'-':
-					item.is_initialized = False
-				elif line[0:1] == b'+':
-					item.is_current_commit_checked_out = False
-		
-				item.current_commit_id_checked_out = line[1:41]
-				item.path = line[42:line.index(b' (')]
-				result.append(item)
-		
+		result = list(GitDiffEntry.parse_fields(cmdres.output.split(b'\x00')))
 		return result
-			
-class GitClient:
+
+class GitPathTrie:
+	__slots__ = ('root', 'count')
+
+	def __init__(self, prefixes=None):
+		self.root = {}
+		self.count = 0
+
+		for prefix in prefixes or []:
+			self.add(prefix)
+
+	def __len__(self):
+		return self.count
+
 	@staticmethod
-	def clone(path='.', url='', recursive=False):
-		result = None
-		
-		if url == '':
-			logger.error("cannot clone repo (invalid url)")
-			result = None
-		else:
-			try:
-				os.chdir(path)
-				full_cmd = "git clone %s" % (url)
-				logger.info(full_cmd)
-				output = subprocess.check_output(full_cmd)
-			except:
-				result = None
-		
-		
+	def components(path):
+		if isinstance(path, str):
+			path = path.encode()
+
+		return [part for part in path.split(b'/') if part != b'']
+
+	def add(self, prefix, owner=None):
+		node = self.root
+
+		for part in GitPathTrie.components(prefix):
+			node = node.setdefault(part, {})
+
+		if None not in node:
+			self.count = self.count + 1
+
+		# the None key holds the owner of the directory ending at this node
+		node[None] = owner if owner != None else prefix
+
+	def owner(self, path):
+		result = self.root.get(None)
+		node = self.root
+
+		for part in GitPathTrie.components(path):
+			node = node.get(part)
+
+			if node == None:
+				break
+
+			result = node.get(None, result)
+
+		return result
+
+	def owners(self, paths):
+		result = {}
+
+		for path in paths:
+			owner = self.owner(path)
+
+			if owner != None:
+				result[owner] = result.get(owner, 0) + 1
+
 		return result
+
+class GitStatus:
+	branch = ''
+	commit = None
+	upstream = None
+	ahead = None
+	behind = None
+	staged = None
+	not_staged = None
+	untracked = None
+	unmerged = None
+	
+	def __str__(self):
+		string = 'branch: %s' %(str(self.branch))
 		
+		if len(self.staged) > 0:
+			string = string + '\r\nStaged:'
+			for file in self.staged:
+				string = string + '\r\n\t' + str(file)
+		if len(self.not_staged) > 0:
+			string = string + '\r\nNot staged:'
+			for file in self.not_staged:
+				string = string + '\r\n\t' + str(file)
+		if len(self.untracked) > 0:
+			string = string + '\r\nUntracked:'
+			for file in self.untracked:
+				string = string + '\r\n\t' + str(file)
+		if self.unmerged:
+			string = string + '\r\nUnmerged:'
+			for file in self.unmerged:
+				string = string + '\r\n\t' + str(file)
+
+		return string
+	
 	@staticmethod
-	def open(path='.'):
+	def parse(cmdres):
 		result = None
 		
-		try:
-			logger.info('Opening git repo %s' %(path))
+		if cmdres != None:
+			result = GitStatus()
+			result.staged = []
+			result.not_staged = []
+			result.untracked = []
+			result.unmerged = []
+
+			is_reading_staged = False
+			is_reading_not_staged = False
+			is_reading_untracked = False
 			
-			if path != '.':
-				os.chdir(path)
-				
-			cmd = command.execute("git status")
+			for line in cmdres.output.split(b'\n'):
+				if b'(use' in line or line == b'':
+					continue
+				elif b'Changes to be committed' in line:
+					is_reading_staged = True
+					is_reading_not_staged = False
+					is_reading_untracked = False
+				elif b'Changes not staged for commit' in line:
+					is_reading_staged = False
+					is_reading_not_staged = True
+					is_reading_untracked = False
+				elif b'Untracked files' in line:
+					is_reading_staged = False
+					is_reading_not_staged = False
+					is_reading_untracked = True
+				elif is_reading_staged == True:
+					file = GitFileChangeDescription.parse(line)
+					if file != None:
+						result.staged.append(file)
+				elif is_reading_not_staged == True:
+					file = GitFileChangeDescription.parse(line)
+					if file != None:
+						result.not_staged.append(file)
+				elif is_reading_untracked == True:
+					file = GitFileChangeDescription.parse(line)
+					if file != None:
+						result.untracked.append(file)
+				elif b'On branch' in line:
+					result.branch = line.split(b' ')[2]
+				elif b'HEAD detached at' in line:
+					result.branch = line.split(b' ')[3]
 			
-			if cmd.output.find(b'Not a git repository') != -1:
-				logger.error('Not a git repository')
-				result = None
-			else:
-				result = GitClient() 
-		except:
-			logger.error("Failed opening repository")
-			result = None
-		
 		return result
 
-	def status(self):
-		result = None;
-		
-		full_cmd = "git status"
-		
-		logger.info(full_cmd)
-		
-		cmd = command.execute(full_cmd)
-		
-		if cmd.returncode != 0:
-			logger.error("git status returned %s, code=%d", cmd.output, cmd.returncode)
-			result = None
+	@staticmethod
+	def parse_porcelain_v2(cmdres):
+		result = None
+
+		if cmdres != None:
+			result = GitStatus()
+			result.staged = []
+			result.not_staged = []
+			result.untracked = []
+			result.unmerged = []
+
+			change_types = GitFileChangeDescription.porcelain_change_types
+			output = cmdres.output
+			length = len(output)
+			hash_length = 0
+			ordinary, renamed, unmerged, untracked, header, submodule_marker, dot = b'12u?#S.'
+			position = 0
+
+			while position < length:
+				end = output.find(b'\x00', position)
+
+				if end == -1:
+					end = length
+
+				kind = output[position]
+
+				if kind == ordinary or kind == renamed:
+					# "1 XY sub mH mI mW hH hI path" and "2 ... Xscore path\0origPath"
+					if hash_length == 0:
+						hash_length = output.find(b' ', position + 31) - position - 31
+
+					x = output[position + 2]
+					y = output[position + 3]
+					submodule = None
+
+					if output[position + 5] == submodule_marker:
+						submodule = output[position + 5:position + 9]
+
+					path_start = position + 33 + 2 * hash_length
+
+					if kind == renamed:
+						path_start = output.find(b' ', path_start) + 1
+
+					item_path = output[path_start:end]
+					original_path = None
+
+					if kind == renamed:
+						position = end + 1
+						end = output.find(b'\x00', position)
+
+						if end == -1:
+							end = length
+
+						original_path = output[position:end]
+
+					if x != dot:
+						item = GitFileChangeDescription()
+						item.change_type = change_types.get(x)
+						item.file = item_path
+						item.original_file = original_path
+						item.submodule = submodule
+						result.staged.append(item)
+
+					if y != dot:
+						item = GitFileChangeDescription()
+						item.change_type = change_types.get(y)
+						item.file = item_path
+						item.submodule = submodule
+						result.not_staged.append(item)
+				elif kind == unmerged:
+					# "u XY sub m1 m2 m3 mW h1 h2 h3 path"
+					if hash_length == 0:
+						hash_length = output.find(b' ', position + 38) - position - 38
+
+					item = GitFileChangeDescription()
+					item.change_type = GitFileChangeDescription.porcelain_unmerged_types.get(output[position + 2:position + 4])
+					item.file = output[position + 41 + 3 * hash_length:end]
+					result.unmerged.append(item)
+				elif kind == untracked:
+					item = GitFileChangeDescription()
+					item.file = output[position + 2:end]
+					result.untracked.append(item)
+				elif kind == header:
+					GitStatus.parse_porcelain_v2_header(result, output[position + 2:end])
+
+				position = end + 1
+
+		return result
+
+	@staticmethod
+	def parse_porcelain_v2_header(status, header):
+		tokens = header.split(b' ', 1)
+
+		if len(tokens) == 2:
+			if tokens[0] == b'branch.oid':
+				if tokens[1] != b'(initial)':
+					status.commit = tokens[1]
+			elif tokens[0] == b'branch.head':
+				if tokens[1] != b'(detached)':
+					status.branch = tokens[1]
+				elif status.commit != None:
+					status.branch = status.commit[:7]
+			elif tokens[0] == b'branch.upstream':
+				status.upstream = tokens[1]
+			elif tokens[0] == b'branch.ab':
+				counts = tokens[1].split(b' ')
+				status.ahead = int(counts[0])
+				status.behind = -int(counts[1])
+
+class GitStatusCategory:
+	Staged = 0
+	NotStaged = 1
+	Untracked = 2
+	Unmerged = 3
+
+class GitStatusColumns:
+	def __init__(self):
+		self.files = GitBytesColumn()
+		self.original_files = GitBytesColumn()
+		self.categories = bytearray()
+		self.change_types = GitInternedColumn()
+
+	def __len__(self):
+		return len(self.categories)
+
+	def __getitem__(self, index):
+		result = GitFileChangeDescription()
+		result.file = self.files[index]
+		result.original_file = self.original_files[index]
+		result.change_type = self.change_types[index]
+		return result
+
+	def rows(self, indexes):
+		for index in indexes:
+			yield self[index]
+
+	def append(self, category, item):
+		self.categories.append(category)
+		self.files.append(item.file)
+		self.original_files.append(item.original_file)
+		self.change_types.append(item.change_type)
+
+	def filter(self, change_type=None, category=None, prefix=None):
+		result = None
+
+		if change_type != None:
+			result = self.change_types.select(self.change_types.matching_ids(lambda value: value == change_type))
+
+		if category != None:
+			categories = self.categories
+
+			if result == None:
+				result = array.array('L', [index for index, value in enumerate(categories) if value == category])
+			else:
+				result = array.array('L', [index for index in result if categories[index] == category])
+
+		if prefix != None:
+			if result == None:
+				result = range(len(self))
+
+			result = self.files.select_prefix(prefix, result)
+
+		if result == None:
+			result = array.array('L', range(len(self)))
+
+		return result
+
+	@staticmethod
+	def from_status(status):
+		result = GitStatusColumns()
+
+		for category, items in ((GitStatusCategory.Staged, status.staged), (GitStatusCategory.NotStaged, status.not_staged), (GitStatusCategory.Untracked, status.untracked), (GitStatusCategory.Unmerged, status.unmerged or [])):
+			for item in items:
+				result.append(category, item)
+
+		return result
+
+class GitPathResult:
+	__slots__ = ('path', 'returncode', 'error')
+
+	def __init__(self, path=None, returncode=0, error=None):
+		self.path = path
+		self.returncode = returncode
+		self.error = error
+
+	def __str__(self):
+		if self.returncode != 0:
+			string = '%s: error %s, code=%d' %(self.path, self.error, self.returncode)
+		else:
+			string = '%s: ok' %(self.path)
+
+		return string
+
+	listings = (b'The following paths are ignored', b'The following paths and/or pathspecs', b'error: the following file')
+
+	@staticmethod
+	def failed_paths(output):
+		# git runs with LC_ALL=C (see command.environment), so these messages are never translated
+		result = []
+		heading = False
+		listing = False
+
+		for line in output.split(b'\n'):
+			if line.startswith(b'fatal: pathspec \'') and line.find(b'\' did not match') != -1:
+				result.append(line[17:line.rfind(b'\' did not match')])
+			elif line.startswith(GitPathResult.listings):
+				# some headings are wrapped over several lines, the paths follow the one ending with a colon
+				listing = line.endswith(b':')
+				heading = not listing
+			elif heading:
+				listing = line.endswith(b':')
+				heading = not listing
+			elif listing and (line.startswith(b'    ') or (not line.startswith(b'hint:') and not line.startswith(b'(') and line.strip() != b'')):
+				result.append(line.strip())
+			else:
+				listing = False
+
+		return result
+
+class GitProgress:
+	__slots__ = ('phase', 'remote', 'current', 'total', 'percent', 'bytes', 'throughput', 'done')
+
+	def __init__(self):
+		self.phase = None
+		self.remote = False
+		self.current = 0
+		self.total = None
+		self.percent = None
+		self.bytes = None
+		self.throughput = None
+		self.done = False
+
+	def __str__(self):
+		string = '%s%s: %d' %('remote: ' if self.remote else '', self.phase, self.current)
+
+		if self.total != None:
+			string = string + ('/%d (%d%%)' %(self.total, self.percent))
+		if self.bytes != None:
+			string = string + (', %d bytes' %(self.bytes))
+		if self.throughput != None:
+			string = string + (' | %d bytes/s' %(self.throughput))
+		if self.done:
+			string = string + ', done'
+
+		return string
+
+class GitTransferStats:
+	__slots__ = ('elapsed', 'objects', 'bytes', 'throughput', 'deltas', 'returncode', 'phases', 'output')
+
+	def __init__(self):
+		self.elapsed = 0.0
+		self.objects = 0
+		self.bytes = 0
+		self.throughput = 0.0
+		self.deltas = 0
+		self.returncode = None
+		self.phases = {}
+		self.output = b''
+
+	def __str__(self):
+		return 'objects=%d bytes=%d deltas=%d elapsed=%.3fs throughput=%.0f bytes/s code=%s' %(self.objects, self.bytes, self.deltas, self.elapsed, self.throughput, self.returncode)
+
+class GitProgressParser:
+	pattern = re.compile(rb'^(remote: )?([A-Za-z][A-Za-z ]*): +(?:(\d+)% \((\d+)/(\d+)\)|(\d+))(?:, ([\d.]+) (bytes|KiB|MiB|GiB))?(?: \| ([\d.]+) (bytes|KiB|MiB|GiB)/s)?(, done\.?)?')
+	total_pattern = re.compile(rb'^(remote: )?Total (\d+) \(delta (\d+)\)')
+	units = {b'bytes': 1, b'KiB': 1024, b'MiB': 1024 ** 2, b'GiB': 1024 ** 3}
+	transfer_phases = ('Receiving objects', 'Unpacking objects', 'Writing objects')
+
+	def __init__(self):
+		self.pending = b''
+		self.lines = []
+		self.last = {}
+		self.total = None
+		self.size = 0
+		self.elapsed = 0.0
+
+	def parse(self, line):
+		result = None
+		match = GitProgressParser.pattern.match(line)
+
+		if match != None:
+			result = GitProgress()
+			result.remote = match.group(1) != None
+			result.phase = match.group(2).decode()
+			result.done = match.group(11) != None
+
+			if match.group(3) != None:
+				result.percent = int(match.group(3))
+				result.current = int(match.group(4))
+				result.total = int(match.group(5))
+			else:
+				result.current = int(match.group(6))
+
+			if match.group(7) != None:
+				result.bytes = int(float(match.group(7)) * GitProgressParser.units[match.group(8)])
+
+			if match.group(9) != None:
+				result.throughput = int(float(match.group(9)) * GitProgressParser.units[match.group(10)])
+
+		return result
+
+	def feed(self, data):
+		result = []
+		start = time.perf_counter()
+		self.size += len(data)
+		segments = re.split(rb'[\r\n]', self.pending + data)
+		# progress lines are rewritten in place with \r, the last segment may not be complete yet
+		self.pending = segments.pop()
+
+		for segment in segments:
+			event = self.parse(segment)
+
+			if event != None:
+				self.last[(event.remote, event.phase)] = event
+				result.append(event)
+			elif segment.strip() != b'':
+				self.lines.append(segment)
+				match = GitProgressParser.total_pattern.match(segment)
+
+				if match != None:
+					self.total = (int(match.group(2)), int(match.group(3)))
+
+		self.elapsed += time.perf_counter() - start
+
+		return result
+
+	def flush(self):
+		result = []
+
+		if self.pending != b'':
+			result = self.feed(b'\n')
+
+		return result
+
+	def stats(self, stats, elapsed, returncode):
+		stats.elapsed = elapsed
+		stats.returncode = returncode
+		stats.output = b'\n'.join(self.lines)
+		stats.phases = dict((('remote: ' if key[0] else '') + key[1], (event.current, event.total)) for key, event in self.last.items())
+
+		for key, event in self.last.items():
+			if not key[0] and key[1] in GitProgressParser.transfer_phases:
+				stats.objects = event.current
+				stats.bytes = event.bytes or 0
+			elif key == (False, 'Resolving deltas'):
+				stats.deltas = event.current
+
+		# small fetches are unpacked without progress, but the sender always reports its totals
+		if self.total != None:
+			if stats.objects == 0:
+				stats.objects = self.total[0]
+
+			if stats.deltas == 0:
+				stats.deltas = self.total[1]
+
+		if elapsed > 0:
+			stats.throughput = stats.bytes / elapsed
+
+		return stats
+
+class GitProgressStream:
+	def __init__(self, client, operation, args, kwargs):
+		self.queue = asyncio.Queue()
+		self.stats = kwargs.setdefault('stats', GitTransferStats())
+		self.result = None
+		kwargs['progress'] = self.queue.put_nowait
+		self.task = asyncio.ensure_future(getattr(client, operation)(*args, **kwargs))
+
+	def __aiter__(self):
+		return self
+
+	async def __anext__(self):
+		while self.queue.empty() and not self.task.done():
+			getter = asyncio.ensure_future(self.queue.get())
+			done, unused = await asyncio.wait([getter, self.task], return_when=asyncio.FIRST_COMPLETED)
+
+			if getter in done:
+				return getter.result()
+
+			getter.cancel()
+
+		if not self.queue.empty():
+			return self.queue.get_nowait()
+
+		self.result = self.task.result()
+
+		raise StopAsyncIteration
+
+class GitAsyncStream:
+	def __init__(self, iterable, chunk_size=256):
+		self.iterator = iter(iterable)
+		self.chunk_size = chunk_size
+		self.pending = collections.deque()
+		self.exhausted = False
+
+	def _fill(self):
+		return list(itertools.islice(self.iterator, self.chunk_size))
+
+	def __aiter__(self):
+		return self
+
+	async def __anext__(self):
+		if len(self.pending) == 0 and not self.exhausted:
+			# the git process is read on an executor thread, a chunk of items at a time
+			items = await asyncio.get_event_loop().run_in_executor(None, self._fill)
+			self.pending.extend(items)
+			self.exhausted = len(items) < self.chunk_size
+
+		if len(self.pending) == 0:
+			raise StopAsyncIteration
+
+		return self.pending.popleft()
+
+	async def aclose(self):
+		if hasattr(self.iterator, 'close'):
+			await asyncio.get_event_loop().run_in_executor(None, self.iterator.close)
+
+class GitResetMode:
+	Mixed = 0
+	Soft = 1
+	Hard = 2
+	Merged = 3
+	Keep = 4
+
+class GitSubmoduleStatus:
+	__slots__ = ('is_current_commit_checked_out', 'is_initialized', 'has_merge_conflicts', 'current_commit_id_checked_out', 'path')
+
+	def __init__(self):
+		self.is_current_commit_checked_out = True
+		self.is_initialized = True
+		self.has_merge_conflicts = False
+		self.current_commit_id_checked_out = None
+		self.path = None
+	
+	def __str__(self):
+		attributes = []
+		
+		if not self.is_current_commit_checked_out:
+			attributes.append('+')
+		if self.has_merge_conflicts:
+			attributes.append('U')
+		if not self.is_initialized:
+			attributes.append('-')
+		
+		if len(attributes) > 0:
+			attributes = ",".join(attributes)
+			attributes = '(' + attributes + ')'
+			string = '%s %s %s' %(self.current_commit_id_checked_out.decode(), self.path.decode(), attributes)
+		else:
+			string = '%s %s' %(self.current_commit_id_checked_out.decode(), self.path.decode())
+	
+		return string
+		
+	@staticmethod
+	def parse(cmdres):
+		result = None
+		
+		if cmdres.returncode == 0:
+			result = []
+			for line in cmdres.output.split(b'\n'):
+				if line == b'':
+					continue
+					
+				item = GitSubmoduleStatus()
+				
+				if line[0:1] == b'U':
+					item.has_merge_conflicts = True
+				elif line[0:1] == b'-':
+					item.is_initialized = False
+				elif line[0:1] == b'+':
+					item.is_current_commit_checked_out = False
+		
+				item.current_commit_id_checked_out = line[1:41]
+				end = line.find(b' (', 42)
+				item.path = line[42:end] if end != -1 else line[42:]
+				result.append(item)
+		
+		return result
+			
+class GitSubmodule:
+	__slots__ = ('name', 'path', 'url', 'branch', 'shallow')
+
+	def __init__(self):
+		self.name = None
+		self.path = None
+		self.url = None
+		self.branch = None
+		self.shallow = False
+
+	def __str__(self):
+		return '%s %s' %(self.path.decode(), self.url.decode() if self.url != None else '')
+
+	@staticmethod
+	def parse(worktree):
+		result = []
+		config = GitConfig.parse(os.path.join(worktree, '.gitmodules'))
+
+		if config != None:
+			for name in config.subsections(b'submodule'):
+				item = GitSubmodule()
+				item.name = name
+				item.path = config.get(b'submodule', name, b'path')
+				item.url = config.get(b'submodule', name, b'url')
+				item.branch = config.get(b'submodule', name, b'branch')
+				item.shallow = config.get(b'submodule', name, b'shallow') == b'true'
+
+				if item.path != None:
+					result.append(item)
+
+		return result
+
+class GitConfig:
+	def __init__(self):
+		self.entries = []
+		self.has_includes = False
+
+	def get(self, section, subsection, key, default=None):
+		result = default
+
+		for entry in self.entries:
+			if entry[0] == section and entry[1] == subsection and entry[2] == key:
+				result = entry[3]
+
+		return result
+
+	def get_all(self, section, subsection, key):
+		return [entry[3] for entry in self.entries if entry[0] == section and entry[1] == subsection and entry[2] == key]
+
+	def subsections(self, section):
+		result = []
+
+		for entry in self.entries:
+			if entry[0] == section and entry[1] != None and entry[1] not in result:
+				result.append(entry[1])
+
+		return result
+
+	@staticmethod
+	def user_paths():
+		result = []
+		nosystem = os.environ.get('GIT_CONFIG_NOSYSTEM', '').strip().lower()
+
+		# same order as git: system, then global, the repository config comes last
+		if not (nosystem in ('true', 'yes', 'on') or (nosystem.isdigit() and int(nosystem) != 0)):
+			result.append(os.environ.get('GIT_CONFIG_SYSTEM', '/etc/gitconfig'))
+
+		if 'GIT_CONFIG_GLOBAL' in os.environ:
+			result.append(os.environ['GIT_CONFIG_GLOBAL'])
+		else:
+			result.append(os.path.join(os.environ.get('XDG_CONFIG_HOME', os.path.expanduser('~/.config')), 'git', 'config'))
+			result.append(os.path.expanduser('~/.gitconfig'))
+
+		return [path for path in result if path != '']
+
+	@staticmethod
+	def parse_value(text):
+		result = bytearray()
+		quoted = False
+		index = 0
+
+		while index < len(text):
+			character = text[index:index + 1]
+
+			if character == b'"':
+				quoted = not quoted
+			elif character == b'\\' and index + 1 < len(text):
+				index += 1
+				escaped = text[index:index + 1]
+				result += {b'n': b'\n', b't': b'\t', b'b': b'\b'}.get(escaped, escaped)
+			elif (character == b'#' or character == b';') and not quoted:
+				break
+			else:
+				result += character
+
+			index += 1
+
+		return bytes(result).strip()
+
+	@staticmethod
+	def parse(path):
+		result = None
+
+		try:
+			with open(path, 'rb') as f:
+				content = f.read()
+		except OSError:
+			content = None
+
+		if content != None:
+			result = GitConfig()
+			section = None
+			subsection = None
+			pending = b''
+
+			for line in content.split(b'\n'):
+				line = pending + line.strip()
+				pending = b''
+
+				if line.endswith(b'\\') and not line.endswith(b'\\\\'):
+					pending = line[:-1]
+					continue
+
+				if line == b'' or line[0:1] == b'#' or line[0:1] == b';':
+					continue
+
+				if line[0:1] == b'[':
+					end = line.find(b']')
+					header = line[1:end].strip()
+					quote = header.find(b'"')
+
+					if quote != -1:
+						section = header[:quote].strip().lower()
+						subsection = header[quote + 1:header.rfind(b'"')].replace(b'\\"', b'"').replace(b'\\\\', b'\\')
+					elif b'.' in header:
+						tokens = header.split(b'.', 1)
+						section = tokens[0].lower()
+						subsection = tokens[1].lower()
+					else:
+						section = header.lower()
+						subsection = None
+
+					if section == b'include' or section == b'includeif':
+						result.has_includes = True
+
+					line = line[end + 1:].strip()
+
+					if line == b'' or line[0:1] == b'#' or line[0:1] == b';':
+						continue
+
+				if section != None:
+					tokens = line.split(b'=', 1)
+					key = tokens[0].strip().lower()
+
+					if len(tokens) == 1:
+						value = b'true'
+					else:
+						value = GitConfig.parse_value(tokens[1])
+
+					result.entries.append((section, subsection, key, value))
+
+		return result
+
+class GitRefs:
+	root_refs = (b'HEAD', b'FETCH_HEAD', b'ORIG_HEAD', b'MERGE_HEAD', b'CHERRY_PICK_HEAD', b'REVERT_HEAD')
+
+	def __init__(self, git_dir):
+		self.git_dir = git_dir
+		self.common_dir = git_dir
+		self.lock = threading.Lock()
+		self.packed = (b'', 0, False)
+		self.packed_stamp = None
+		self.objects = None
+
+		try:
+			with open(os.path.join(git_dir, 'commondir'), 'r') as f:
+				self.common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+		except OSError:
+			pass
+
+	@staticmethod
+	def open(git_dir):
+		result = None
+
+		if git_dir != None:
+			refs = GitRefs(git_dir)
+
+			if refs.is_supported():
+				result = refs
+			else:
+				logger.info("ref storage of %s is not supported natively", git_dir)
+
+		return result
+
+	def is_supported(self):
+		result = False
+
+		if not os.path.isdir(os.path.join(self.common_dir, 'reftable')):
+			config = GitConfig.parse(os.path.join(self.common_dir, 'config'))
+			result = config == None or config.get(b'extensions', None, b'refstorage', b'files').lower() == b'files'
+
+		return result
+
+	def _packed_refs(self):
+		path = os.path.join(self.common_dir, 'packed-refs')
+
+		with self.lock:
+			try:
+				info = os.stat(path)
+				stamp = (info.st_ino, info.st_mtime_ns, info.st_size)
+			except OSError:
+				stamp = None
+
+			if stamp != self.packed_stamp:
+				# the previous map is not closed, iterators still reading it keep it alive until they are done
+				self.packed = (b'', 0, False)
+
+				if stamp != None and stamp[2] > 0:
+					with open(path, 'rb') as f:
+						data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+					if data[0:1] == b'#':
+						end = data.find(b'\n')
+						self.packed = (data, end + 1, b' sorted' in data[0:end])
+					else:
+						self.packed = (data, 0, False)
+
+				self.packed_stamp = stamp
+
+			return self.packed
+
+	def _packed_seek(self, data, start, refname):
+		low = start
+		high = len(data)
+
+		while low < high:
+			middle = (low + high) // 2
+			newline = data.rfind(b'\n', low, middle)
+			line_start = newline + 1 if newline != -1 else low
+			start = line_start
+			end = data.find(b'\n', start)
+
+			if end == -1:
+				end = len(data)
+
+			# peeled lines ("^<oid>") belong to the ref line above them
+			while start < high and data[start:start + 1] == b'^':
+				start = end + 1
+				end = data.find(b'\n', start)
+
+				if end == -1:
+					end = len(data)
+
+			if start >= high:
+				high = line_start
+			elif data[data.find(b' ', start) + 1:end] < refname:
+				low = end + 1
+			else:
+				high = line_start
+
+		return low
+
+	def _packed_lines(self, prefix=b'', packed=None):
+		data, start, is_sorted = packed or self._packed_refs()
+
+		if is_sorted:
+			position = self._packed_seek(data, start, prefix)
+		else:
+			position = start
+
+		while position < len(data):
+			end = data.find(b'\n', position)
+
+			if end == -1:
+				end = len(data)
+
+			if data[position:position + 1] != b'^':
+				separator = data.find(b' ', position, end)
+
+				if separator != -1:
+					name = data[separator + 1:end]
+
+					if name.startswith(prefix):
+						yield (name, data[position:separator])
+					elif is_sorted and name > prefix:
+						break
+
+			position = end + 1
+
+	def _packed_lookup(self, refname):
+		result = None
+		packed = self._packed_refs()
+
+		for name, oid in self._packed_lines(refname, packed):
+			if name == refname:
+				result = oid
+				break
+			elif packed[2]:
+				break
+
+		return result
+
+	def read_loose(self, refname):
+		result = None
+
+		if not (b'..' in refname or refname.startswith(b'/') or b'\\' in refname):
+			if refname in GitRefs.root_refs or refname.startswith(b'refs/bisect/') or refname.startswith(b'refs/worktree/'):
+				directory = self.git_dir
+			else:
+				directory = self.common_dir
+
+			try:
+				with open(os.path.join(directory, refname.decode()), 'rb') as f:
+					result = f.readline().rstrip(b'\n')
+			except (OSError, UnicodeDecodeError):
+				result = None
+
+		return result
+
+	def resolve_ref(self, refname):
+		result = None
+
+		for depth in range(5):
+			content = self.read_loose(refname)
+
+			if content == None:
+				result = self._packed_lookup(refname)
+				break
+			elif content.startswith(b'ref: '):
+				refname = content[5:].strip()
+			else:
+				result = content.split(b'\t', 1)[0].split(b' ', 1)[0]
+				break
+
+		return result
+
+	def resolve(self, name):
+		result = None
+
+		if isinstance(name, str):
+			name = name.encode()
+
+		if (len(name) == 40 or len(name) == 64) and all(c in b'0123456789abcdef' for c in name):
+			if self.objects == None:
+				self.objects = GitObjectDatabase.open(self.git_dir) or False
+
+			# a full object name is only taken as is when the object exists, anything else is left to git
+			if self.objects != False and self.objects.contains(name):
+				result = name
+		else:
+			for pattern in (b'%s', b'refs/%s', b'refs/tags/%s', b'refs/heads/%s', b'refs/remotes/%s', b'refs/remotes/%s/HEAD'):
+				refname = pattern.replace(b'%s', name)
+
+				if pattern == b'%s' and not (refname in GitRefs.root_refs or refname.startswith(b'refs/')):
+					continue
+
+				result = self.resolve_ref(refname)
+
+				if result != None:
+					break
+
+		return result
+
+	def head(self):
+		result = (None, None)
+		content = self.read_loose(b'HEAD')
+
+		if content != None:
+			if content.startswith(b'ref: '):
+				target = content[5:].strip()
+				result = (target, self.resolve_ref(target))
+			else:
+				result = (None, content)
+
+		return result
+
+	def current_branch(self):
+		result = None
+		target = self.head()[0]
+
+		if target != None and target.startswith(b'refs/heads/'):
+			result = target[11:]
+
+		return result
+
+	def list(self, prefix=b'refs/'):
+		refs = dict(self._packed_lines(prefix))
+		pending = [os.path.join(self.common_dir, prefix.decode().rstrip('/'))]
+
+		while len(pending) > 0:
+			directory = pending.pop()
+
+			try:
+				items = list(os.scandir(directory))
+			except OSError:
+				items = []
+
+			for item in items:
+				if item.is_dir(follow_symlinks=False):
+					pending.append(item.path)
+				elif not item.name.endswith('.lock'):
+					refname = os.path.relpath(item.path, self.common_dir).replace(os.sep, '/').encode()
+					oid = self.resolve_ref(refname)
+
+					if oid != None:
+						refs[refname] = oid
+
+		return sorted(refs.items())
+
+	def tags(self):
+		return [name[10:] for name, oid in self.list(b'refs/tags/')]
+
+	def branches(self):
+		return [name[11:] for name, oid in self.list(b'refs/heads/')]
+
+	def remotes(self):
+		result = None
+		config = GitConfig.parse(os.path.join(self.common_dir, 'config'))
+		rewrites = []
+
+		for path in GitConfig.user_paths():
+			user_config = GitConfig.parse(path)
+
+			if user_config != None:
+				if user_config.has_includes:
+					config = None
+
+				rewrites.append(user_config)
+
+		if config != None and not config.has_includes and 'GIT_CONFIG_COUNT' not in os.environ and 'GIT_CONFIG_PARAMETERS' not in os.environ:
+			rewrites.append(config)
+			result = []
+
+			for name in config.subsections(b'remote'):
+				urls = config.get_all(b'remote', name, b'url')
+				push_urls = config.get_all(b'remote', name, b'pushurl')
+
+				if len(urls) > 0:
+					fetch_urls = [GitRefs.rewrite_url(rewrites, urls[0], b'insteadof')]
+				else:
+					fetch_urls = []
+
+				if len(push_urls) == 0:
+					push_urls = [GitRefs.rewrite_url(rewrites, url, b'pushinsteadof', b'insteadof') for url in urls]
+				else:
+					push_urls = [GitRefs.rewrite_url(rewrites, url, b'insteadof') for url in push_urls]
+
+				for url, type in [(url, b'(fetch)') for url in fetch_urls] + [(url, b'(push)') for url in push_urls]:
+					item = GitRemote()
+					item.name = name
+					item.url = url
+					item.type = type
+					result.append(item)
+
+		return result
+
+	@staticmethod
+	def rewrite_url(configs, url, *keys):
+		result = url
+
+		for key in keys:
+			best = b''
+
+			for config in configs:
+				for base in config.subsections(b'url'):
+					for prefix in config.get_all(b'url', base, key):
+						if url.startswith(prefix) and len(prefix) > len(best):
+							best = prefix
+							result = base + url[len(prefix):]
+
+			if best != b'':
+				break
+
+		return result
+
+class GitPack:
+	object_types = {1: b'commit', 2: b'tree', 3: b'blob', 4: b'tag'}
+
+	def __init__(self, idx_path):
+		self.idx_path = idx_path
+		self.pack_path = idx_path[:-4] + '.pack'
+		self.idx_file = open(idx_path, 'rb')
+		self.idx = mmap.mmap(self.idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+		self.pack_file = open(self.pack_path, 'rb')
+		self.pack = mmap.mmap(self.pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		if self.idx[0:4] == b'\xfftOc':
+			self.version = struct.unpack('>I', self.idx[4:8])[0]
+			self.fanout_start = 8
+		else:
+			self.version = 1
+			self.fanout_start = 0
+
+		self.count = struct.unpack('>I', self.idx[self.fanout_start + 1020:self.fanout_start + 1024])[0]
+		self.names_start = self.fanout_start + 1024
+
+		if self.version == 2:
+			self.offsets_start = self.names_start + self.count * 24
+			self.large_offsets_start = self.offsets_start + self.count * 4
+
+	def close(self):
+		self.idx.close()
+		self.idx_file.close()
+		self.pack.close()
+		self.pack_file.close()
+
+	def find(self, oid):
+		result = None
+		idx = self.idx
+		first = oid[0]
+
+		if first == 0:
+			low = 0
+		else:
+			low = struct.unpack_from('>I', idx, self.fanout_start + (first - 1) * 4)[0]
+
+		high = struct.unpack_from('>I', idx, self.fanout_start + first * 4)[0]
+
+		if self.version == 2:
+			start = self.names_start
+			width = 20
+			skip = 0
+		else:
+			start = self.names_start
+			width = 24
+			skip = 4
+
+		while low < high:
+			middle = (low + high) // 2
+			position = start + middle * width + skip
+			name = idx[position:position + 20]
+
+			if name < oid:
+				low = middle + 1
+			elif name > oid:
+				high = middle
+			else:
+				result = self.offset(middle)
+				break
+
+		return result
+
+	def offset(self, index):
+		idx = self.idx
+
+		if self.version == 2:
+			position = self.offsets_start + index * 4
+			result = struct.unpack('>I', idx[position:position + 4])[0]
+
+			if result & 0x80000000:
+				position = self.large_offsets_start + (result & 0x7fffffff) * 8
+				result = struct.unpack('>Q', idx[position:position + 8])[0]
+		else:
+			position = self.names_start + index * 24
+			result = struct.unpack('>I', idx[position:position + 4])[0]
+
+		return result
+
+	def oids(self):
+		width = 20 if self.version == 2 else 24
+		skip = 0 if self.version == 2 else 4
+
+		for index in range(self.count):
+			position = self.names_start + index * width + skip
+			yield self.idx[position:position + 20]
+
+	def header(self, offset):
+		pack = self.pack
+		byte = pack[offset]
+		offset += 1
+		type = (byte >> 4) & 7
+		size = byte & 15
+		shift = 4
+
+		while byte & 0x80:
+			byte = pack[offset]
+			offset += 1
+			size |= (byte & 0x7f) << shift
+			shift += 7
+
+		base = None
+
+		if type == 6:
+			byte = pack[offset]
+			offset += 1
+			distance = byte & 0x7f
+
+			while byte & 0x80:
+				byte = pack[offset]
+				offset += 1
+				distance = ((distance + 1) << 7) | (byte & 0x7f)
+
+			base = distance
+		elif type == 7:
+			base = pack[offset:offset + 20]
+			offset += 20
+
+		return (type, size, base, offset)
+
+	def inflate(self, offset, size):
+		decompressor = zlib.decompressobj()
+		chunks = []
+		chunk_size = max(size + 64, 4096)
+
+		while not decompressor.eof:
+			chunk = self.pack[offset:offset + chunk_size]
+
+			if chunk == b'':
+				break
+
+			chunks.append(decompressor.decompress(chunk))
+			offset += len(chunk)
+
+		return b''.join(chunks)
+
+def apply_git_delta(base, delta):
+	position = 0
+
+	for unused in range(2):
+		byte = 0x80
+
+		while byte & 0x80:
+			byte = delta[position]
+			position += 1
+
+	result = bytearray()
+	length = len(delta)
+
+	while position < length:
+		opcode = delta[position]
+		position += 1
+
+		if opcode & 0x80:
+			copy_offset = 0
+			copy_size = 0
+
+			for bit in range(4):
+				if opcode & (1 << bit):
+					copy_offset |= delta[position] << (8 * bit)
+					position += 1
+
+			for bit in range(3):
+				if opcode & (16 << bit):
+					copy_size |= delta[position] << (8 * bit)
+					position += 1
+
+			if copy_size == 0:
+				copy_size = 0x10000
+
+			result += base[copy_offset:copy_offset + copy_size]
+		elif opcode != 0:
+			result += delta[position:position + opcode]
+			position += opcode
+
+	return bytes(result)
+
+class GitObjectDatabase:
+	def __init__(self, objects_dir, delta_cache_bytes=32 * 1024 * 1024):
+		self.objects_dir = objects_dir
+		self.alternates = []
+		self.packs = []
+		self.packs_stamp = None
+		self.delta_cache_bytes = delta_cache_bytes
+		self.delta_cache = collections.OrderedDict()
+		self.delta_cache_size = 0
+		self.lock = threading.RLock()
+
+		try:
+			with open(os.path.join(objects_dir, 'info', 'alternates'), 'r') as f:
+				for line in f:
+					line = line.strip()
+
+					if line != '' and not line.startswith('#'):
+						self.alternates.append(GitObjectDatabase(os.path.normpath(os.path.join(objects_dir, line)), delta_cache_bytes))
+		except OSError:
+			pass
+
+	@staticmethod
+	def open(git_dir):
+		result = None
+		objects_dir = os.path.join(git_dir, 'objects')
+
+		try:
+			with open(os.path.join(git_dir, 'commondir'), 'r') as f:
+				objects_dir = os.path.normpath(os.path.join(git_dir, f.read().strip(), 'objects'))
+		except OSError:
+			pass
+
+		config = GitConfig.parse(os.path.join(os.path.dirname(objects_dir), 'config'))
+		object_format = config.get(b'extensions', None, b'objectformat') if config != None else None
+
+		# packs, loose objects and commits are read with 20 byte names, other formats are left to git
+		if object_format != None and object_format.lower() != b'sha1':
+			logger.info("%s uses %s object names, native reads are disabled", objects_dir, object_format.decode())
+		elif os.path.isdir(objects_dir):
+			result = GitObjectDatabase(objects_dir)
+
+		return result
+
+	def close(self):
+		with self.lock:
+			for pack in self.packs:
+				pack.close()
+
+			self.packs = []
+			self.packs_stamp = None
+
+	def refresh(self, force=False):
+		pack_dir = os.path.join(self.objects_dir, 'pack')
+
+		try:
+			stamp = os.stat(pack_dir).st_mtime_ns
+		except OSError:
+			stamp = None
+
+		if force or stamp != self.packs_stamp:
+			known = dict((pack.idx_path, pack) for pack in self.packs)
+			packs = []
+
+			if stamp != None:
+				for name in sorted(os.listdir(pack_dir)):
+					path = os.path.join(pack_dir, name)
+
+					if name.endswith('.idx') and os.path.exists(path[:-4] + '.pack'):
+						pack = known.pop(path, None)
+
+						if pack == None:
+							try:
+								pack = GitPack(path)
+							except (OSError, ValueError):
+								pack = None
+
+						if pack != None:
+							packs.append(pack)
+
+			for pack in known.values():
+				pack.close()
+
+			self.packs = packs
+			self.packs_stamp = stamp
+
+	def abbrev_length(self):
+		with self.lock:
+			if self.packs_stamp == None:
+				self.refresh()
+
+			count = sum(pack.count for pack in self.packs)
+
+		for alternate in self.alternates:
+			alternate.refresh()
+			count += sum(pack.count for pack in alternate.packs)
+
+		# same heuristic as git's core.abbrev=auto, based on the packed object count
+		return max(7, (count.bit_length() + 1) // 2)
+
+	def _cache_get(self, key):
+		result = self.delta_cache.get(key)
+
+		if result != None:
+			self.delta_cache.move_to_end(key)
+
+		return result
+
+	def _cache_put(self, key, value):
+		if len(value[1]) <= self.delta_cache_bytes // 4:
+			self.delta_cache[key] = value
+			self.delta_cache_size += len(value[1])
+
+			while self.delta_cache_size > self.delta_cache_bytes:
+				unused, evicted = self.delta_cache.popitem(last=False)
+				self.delta_cache_size -= len(evicted[1])
+
+	def _read_packed(self, pack, offset):
+		chain = []
+		result = None
+
+		while result == None:
+			result = self._cache_get((pack.pack_path, offset))
+
+			if result != None:
+				break
+
+			type, size, base, data_offset = pack.header(offset)
+
+			if type == 6:
+				chain.append((offset, pack.inflate(data_offset, size)))
+				offset = offset - base
+			elif type == 7:
+				chain.append((offset, pack.inflate(data_offset, size)))
+				base_object = self.read(base)
+
+				if base_object == None:
+					break
+
+				result = base_object
+			else:
+				result = (GitPack.object_types.get(type), pack.inflate(data_offset, size))
+
+				if len(chain) > 0:
+					self._cache_put((pack.pack_path, offset), result)
+
+		if result != None:
+			while len(chain) > 0:
+				offset, delta = chain.pop()
+				result = (result[0], apply_git_delta(result[1], delta))
+
+				if len(chain) > 0:
+					self._cache_put((pack.pack_path, offset), result)
+
+		return result
+
+	def _read_loose(self, oid):
+		result = None
+		name = binascii.hexlify(oid).decode()
+
+		try:
+			with open(os.path.join(self.objects_dir, name[:2], name[2:]), 'rb') as f:
+				data = zlib.decompress(f.read())
+
+			end = data.index(b'\x00')
+			result = (data[:end].split(b' ')[0], data[end + 1:])
+		except (OSError, ValueError, zlib.error):
+			result = None
+
+		return result
+
+	def contains(self, oid):
+		result = False
+
+		if len(oid) != 20:
+			oid = binascii.unhexlify(oid)
+
+		if len(oid) == 20:
+			name = binascii.hexlify(oid).decode()
+
+			with self.lock:
+				for attempt in range(2):
+					if attempt > 0 or self.packs_stamp == None:
+						self.refresh(force=attempt > 0)
+
+					result = any(pack.find(oid) != None for pack in self.packs) or os.path.exists(os.path.join(self.objects_dir, name[:2], name[2:]))
+
+					if result:
+						break
+
+			if not result:
+				result = any(alternate.contains(oid) for alternate in self.alternates)
+
+		return result
+
+	def read(self, oid):
+		result = None
+
+		if len(oid) != 20:
+			oid = binascii.unhexlify(oid)
+
+		with self.lock:
+			for attempt in range(2):
+				if attempt > 0 or self.packs_stamp == None:
+					self.refresh(force=attempt > 0)
+
+				for pack in self.packs:
+					offset = pack.find(oid)
+
+					if offset != None:
+						result = self._read_packed(pack, offset)
+						break
+
+				if result == None:
+					result = self._read_loose(oid)
+
+				if result != None:
+					break
+
+		if result == None:
+			for alternate in self.alternates:
+				result = alternate.read(oid)
+
+				if result != None:
+					break
+
+		return result
+
+class GitCommit:
+	__slots__ = ('oid', 'tree', 'parents', 'author', 'author_time', 'author_offset', 'committer', 'commit_time', 'commit_offset', 'message')
+
+	def __init__(self):
+		self.oid = None
+		self.tree = None
+		self.parents = []
+		self.author = None
+		self.author_time = 0
+		self.author_offset = b'+0000'
+		self.committer = None
+		self.commit_time = 0
+		self.commit_offset = b'+0000'
+		self.message = b''
+
+	@staticmethod
+	def parse_identity(line):
+		end = line.rfind(b'>')
+		tokens = line[end + 1:].split()
+		timestamp = 0
+		offset = b'+0000'
+
+		if len(tokens) > 0:
+			timestamp = int(tokens[0])
+		if len(tokens) > 1:
+			offset = tokens[1]
+
+		return (line[:end + 1], timestamp, offset)
+
+	@staticmethod
+	def parse(oid, data):
+		result = GitCommit()
+		result.oid = oid
+		end = data.find(b'\n\n')
+
+		if end == -1:
+			headers = data
+		else:
+			headers = data[:end]
+			result.message = data[end + 2:]
+
+		for line in headers.split(b'\n'):
+			key = line[:line.find(b' ')]
+
+			if key == b'parent':
+				result.parents.append(line[7:])
+			elif key == b'tree':
+				result.tree = line[5:]
+			elif key == b'author':
+				result.author, result.author_time, result.author_offset = GitCommit.parse_identity(line[7:])
+			elif key == b'committer':
+				result.committer, result.commit_time, result.commit_offset = GitCommit.parse_identity(line[10:])
+
+		return result
+
+	def to_log(self, abbrev=7):
+		result = GitLog()
+		result.commit = self.oid
+		result.author = self.author
+		result.date = format_git_date(self.author_time, self.author_offset)
+
+		if len(self.parents) > 1:
+			result.merge = b' '.join(parent[:abbrev] for parent in self.parents)
+
+		result.description = GitLog.indent_message(self.message)
+
+		return result
+
+def format_git_date(timestamp, offset):
+	sign = -1 if offset[0:1] == b'-' else 1
+	seconds = sign * (int(offset[1:3]) * 3600 + int(offset[3:5]) * 60)
+	value = time.gmtime(timestamp + seconds)
+
+	return b'%s %s %d %02d:%02d:%02d %d %s' %(GIT_WEEKDAYS[value.tm_wday], GIT_MONTH_NAMES[value.tm_mon - 1], value.tm_mday, value.tm_hour, value.tm_min, value.tm_sec, value.tm_year, offset)
+
+class GitCommitGraphLayer:
+	def __init__(self, path, base_count):
+		self.path = path
+		self.base_count = base_count
+		self.file = open(path, 'rb')
+		self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		self.chunks = {}
+
+		data = self.data
+
+		if data[0:4] != b'CGPH' or data[4] != 1:
+			raise ValueError('unsupported commit-graph %s' %(path))
+
+		self.hash_length = 20 if data[5] == 1 else 32
+		chunk_count = data[6]
+
+		for index in range(chunk_count):
+			position = 8 + index * 12
+			self.chunks[data[position:position + 4]] = struct.unpack_from('>Q', data, position + 4)[0]
+
+		self.fanout = self.chunks[b'OIDF']
+		self.oids = self.chunks[b'OIDL']
+		self.commit_data = self.chunks[b'CDAT']
+		self.edges = self.chunks.get(b'EDGE')
+		self.count = struct.unpack_from('>I', data, self.fanout + 255 * 4)[0]
+
+	def close(self):
+		self.data.close()
+		self.file.close()
+
+	def find(self, oid):
+		result = None
+		data = self.data
+		first = oid[0]
+		hash_length = self.hash_length
+
+		if first == 0:
+			low = 0
+		else:
+			low = struct.unpack_from('>I', data, self.fanout + (first - 1) * 4)[0]
+
+		high = struct.unpack_from('>I', data, self.fanout + first * 4)[0]
+
+		while low < high:
+			middle = (low + high) // 2
+			position = self.oids + middle * hash_length
+			name = data[position:position + hash_length]
+
+			if name < oid:
+				low = middle + 1
+			elif name > oid:
+				high = middle
+			else:
+				result = middle
+				break
+
+		return result
+
+class GitCommitGraph:
+	no_parent = 0x70000000
+	extra_edges = 0x80000000
+
+	def __init__(self, layers):
+		self.layers = layers
+		self.count = sum(layer.count for layer in layers)
+
+	@staticmethod
+	def open(objects_dir):
+		result = None
+		layers = []
+		info_dir = os.path.join(objects_dir, 'info')
+
+		try:
+			chain = os.path.join(info_dir, 'commit-graphs', 'commit-graph-chain')
+
+			if os.path.exists(chain):
+				with open(chain, 'r') as f:
+					names = [line.strip() for line in f if line.strip() != '']
+
+				for name in names:
+					layers.append(GitCommitGraphLayer(os.path.join(info_dir, 'commit-graphs', 'graph-%s.graph' %(name)), sum(layer.count for layer in layers)))
+			elif os.path.exists(os.path.join(info_dir, 'commit-graph')):
+				layers.append(GitCommitGraphLayer(os.path.join(info_dir, 'commit-graph'), 0))
+		except (OSError, ValueError, KeyError):
+			for layer in layers:
+				layer.close()
+
+			layers = []
+
+		if len(layers) > 0:
+			result = GitCommitGraph(layers)
+
+		return result
+
+	def close(self):
+		for layer in self.layers:
+			layer.close()
+
+	def lookup(self, oid):
+		result = None
+
+		for layer in self.layers:
+			position = layer.find(oid)
+
+			if position != None:
+				result = layer.base_count + position
+				break
+
+		return result
+
+	def _locate(self, position):
+		for layer in self.layers:
+			if position < layer.base_count + layer.count:
+				return (layer, position - layer.base_count)
+
+	def oid(self, position):
+		layer, local = self._locate(position)
+		start = layer.oids + local * layer.hash_length
+
+		return layer.data[start:start + layer.hash_length]
+
+	def parents(self, position):
+		result = []
+		layer, local = self._locate(position)
+		start = layer.commit_data + local * (layer.hash_length + 16) + layer.hash_length
+		first, second = struct.unpack_from('>II', layer.data, start)
+
+		if first != GitCommitGraph.no_parent:
+			result.append(first)
+
+		if second & GitCommitGraph.extra_edges:
+			edge = layer.edges + (second & 0x7fffffff) * 4
+
+			while True:
+				value = struct.unpack_from('>I', layer.data, edge)[0]
+				result.append(value & 0x7fffffff)
+				edge += 4
+
+				if value & GitCommitGraph.extra_edges:
+					break
+		elif second != GitCommitGraph.no_parent:
+			result.append(second)
+
+		return result
+
+	def level_and_time(self, position):
+		layer, local = self._locate(position)
+		start = layer.commit_data + local * (layer.hash_length + 16) + layer.hash_length + 8
+		high, low = struct.unpack_from('>II', layer.data, start)
+
+		return (high >> 2, ((high & 3) << 32) | low)
+
+class GitHistory:
+	def __init__(self, objects, shallow=None, graph=None):
+		self.objects = objects
+		self.shallow = shallow or set()
+		self.graph = graph
+		self.pending = {}
+		self.levels = {}
+
+	@staticmethod
+	def open(git_dir):
+		result = None
+		objects = GitObjectDatabase.open(git_dir)
+
+		if objects != None:
+			shallow = set()
+
+			try:
+				with open(os.path.join(git_dir, 'shallow'), 'rb') as f:
+					shallow = set(line.strip() for line in f if line.strip() != b'')
+			except OSError:
+				pass
+
+			graph = None
+
+			# like git, ignore the commit-graph in shallow repositories
+			if len(shallow) == 0:
+				graph = GitCommitGraph.open(objects.objects_dir)
+
+			result = GitHistory(objects, shallow, graph)
+
+		return result
+
+	def commit(self, oid):
+		result = None
+		item = self.objects.read(oid)
+
+		if item != None and item[0] == b'commit':
+			result = GitCommit.parse(oid, item[1])
+
+			if oid in self.shallow:
+				result.parents = []
+
+		return result
+
+	def peel(self, oid):
+		result = None
+		item = self.objects.read(oid)
+
+		# annotated tags, possibly of other tags, are followed down to what they point at
+		while item != None and item[0] == b'tag':
+			oid = item[1][7:item[1].index(b'\n')]
+			item = self.objects.read(oid)
+
+		if item != None and item[0] == b'commit':
+			result = oid
+
+		return result
+
+	def node(self, oid):
+		result = None
+
+		if self.graph != None:
+			result = self.graph.lookup(binascii.unhexlify(oid))
+
+		if result == None:
+			result = oid
+
+		return result
+
+	def node_oid(self, node):
+		if isinstance(node, int):
+			result = binascii.hexlify(self.graph.oid(node))
+		else:
+			result = node
+
+		return result
+
+	def node_commit(self, node):
+		result = self.pending.get(node)
+
+		if result == None:
+			result = self.commit(node)
+
+			if result != None:
+				if len(self.pending) > 65536:
+					self.pending.clear()
+
+				self.pending[node] = result
+
+		return result
+
+	def node_parents(self, node):
+		if isinstance(node, int):
+			result = self.graph.parents(node)
+		else:
+			result = []
+			item = self.node_commit(node)
+
+			if item != None:
+				result = [self.node(parent) for parent in item.parents]
+
+		return result
+
+	def node_key(self, node):
+		if isinstance(node, int):
+			level, timestamp = self.graph.level_and_time(node)
+		else:
+			level = self.node_level(node)
+			item = self.node_commit(node)
+			timestamp = item.commit_time if item != None else 0
+
+		return (-level, -timestamp)
+
+	def node_level(self, node):
+		if isinstance(node, int):
+			result = self.graph.level_and_time(node)[0]
+		else:
+			result = self.levels.get(node)
+
+			if result == None:
+				# commits missing from the commit-graph are newer than it, walk down until reaching it
+				stack = [node]
+
+				while len(stack) > 0:
+					current = stack[-1]
+					parents = self.node_parents(current)
+					missing = [parent for parent in parents if not isinstance(parent, int) and parent not in self.levels]
+
+					if len(missing) > 0:
+						stack.extend(missing)
+					else:
+						stack.pop()
+						self.levels[current] = 1 + max([self.node_level(parent) for parent in parents] or [0])
+
+				result = self.levels[node]
+
+		return result
+
+	def is_ancestor(self, ancestor, descendant):
+		result = False
+		target = self.node(ancestor)
+		start = self.node(descendant)
+
+		if target == start:
+			result = True
+		else:
+			target_level = self.node_level(target)
+			pending = [start]
+			seen = set(pending)
+
+			while len(pending) > 0 and not result:
+				for parent in self.node_parents(pending.pop()):
+					if parent == target:
+						result = True
+						break
+					elif parent not in seen and self.node_level(parent) > target_level:
+						seen.add(parent)
+						pending.append(parent)
+
+		return result
+
+	def merge_bases(self, first, second):
+		flags = {}
+		queue = []
+		queued = set()
+		candidates = []
+		sequence = 0
+		stale = 4
+		active = 0
+
+		for node, flag in ((self.node(first), 1), (self.node(second), 2)):
+			if node not in queued:
+				heapq.heappush(queue, (self.node_key(node), sequence, node))
+				queued.add(node)
+				sequence += 1
+				active += 1
+
+			flags[node] = flags.get(node, 0) | flag
+
+		while active > 0:
+			unused, unused, node = heapq.heappop(queue)
+			queued.discard(node)
+			flag = flags[node]
+
+			if not flag & stale:
+				active -= 1
+
+				if flag == 3:
+					candidates.append(node)
+					flag |= stale
+
+			for parent in self.node_parents(node):
+				old = flags.get(parent, 0)
+				new = old | flag
+
+				if new != old:
+					flags[parent] = new
+
+					if parent in queued:
+						if new & stale and not old & stale:
+							active -= 1
+					else:
+						heapq.heappush(queue, (self.node_key(parent), sequence, parent))
+						queued.add(parent)
+						sequence += 1
+
+						if not new & stale:
+							active += 1
+
+		oids = [self.node_oid(node) for node in candidates]
+
+		return [oid for oid in oids if not any(other != oid and self.is_ancestor(oid, other) for other in oids)]
+
+	def count_between(self, exclude, include):
+		result = 0
+		flags = {}
+		queue = []
+		queued = set()
+		interesting = 0
+		sequence = 0
+
+		starts = [(self.node(include), 1)]
+
+		if exclude != None:
+			starts.append((self.node(exclude), 2))
+
+		for node, flag in starts:
+			flags[node] = flags.get(node, 0) | flag
+
+			if node not in queued:
+				heapq.heappush(queue, (self.node_key(node), sequence, node))
+				queued.add(node)
+				sequence += 1
+
+		interesting = sum(1 for node in queued if flags[node] == 1)
+
+		while interesting > 0:
+			unused, unused, node = heapq.heappop(queue)
+			queued.discard(node)
+			flag = flags[node]
+
+			if flag == 1:
+				result += 1
+				interesting -= 1
+
+			for parent in self.node_parents(node):
+				old = flags.get(parent, 0)
+				new = old | flag
+
+				if new != old:
+					flags[parent] = new
+
+					if parent in queued:
+						if old == 1:
+							interesting -= 1
+					else:
+						heapq.heappush(queue, (self.node_key(parent), sequence, parent))
+						queued.add(parent)
+						sequence += 1
+
+						if new == 1:
+							interesting += 1
+
+		return result
+
+	def topo_order(self, starts, n=None):
+		queue = []
+		seen = set()
+		sequence = 0
+		count = 0
+
+		for oid in starts:
+			node = self.node(oid)
+
+			if node not in seen:
+				seen.add(node)
+				heapq.heappush(queue, (self.node_key(node), sequence, node))
+				sequence += 1
+
+		while len(queue) > 0 and (n == None or count < n):
+			unused, unused, node = heapq.heappop(queue)
+			count += 1
+
+			for parent in self.node_parents(node):
+				if parent not in seen:
+					seen.add(parent)
+					heapq.heappush(queue, (self.node_key(parent), sequence, parent))
+					sequence += 1
+
+			yield self.node_oid(node)
+
+	def walk(self, starts, n=None, author=None):
+		queue = []
+		seen = set()
+		sequence = 0
+		count = 0
+
+		if author != None:
+			if isinstance(author, str):
+				author = author.encode()
+
+			author = re.compile(author)
+
+		for oid in starts:
+			item = self.commit(oid)
+
+			if item != None and oid not in seen:
+				seen.add(oid)
+				heapq.heappush(queue, (-item.commit_time, sequence, item))
+				sequence += 1
+
+		while len(queue) > 0 and (n == None or count < n):
+			unused, unused, item = heapq.heappop(queue)
+
+			for parent in item.parents:
+				if parent not in seen:
+					seen.add(parent)
+					parent_item = self.commit(parent)
+
+					if parent_item != None:
+						heapq.heappush(queue, (-parent_item.commit_time, sequence, parent_item))
+						sequence += 1
+
+			if author == None or author.search(item.author) != None:
+				count += 1
+				yield item
+
+class GitCacheEntry:
+	__slots__ = ('key', 'stamp', 'value', 'hit', 'created')
+
+	def __init__(self, key, stamp):
+		self.key = key
+		self.stamp = stamp
+		self.value = None
+		self.hit = False
+		self.created = 0.0
+
+class GitRepositoryCache:
+	stamp_files = ('index', 'HEAD', 'packed-refs', 'config', 'MERGE_HEAD', 'FETCH_HEAD')
+
+	def __init__(self, max_entries=1024, ttl=None):
+		self.max_entries = max_entries
+		self.ttl = ttl
+		self.lock = threading.Lock()
+		self.entries = collections.OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.invalidations = 0
+		self.evictions = 0
+
+	def __str__(self):
+		return 'entries=%d hits=%d misses=%d invalidations=%d evictions=%d' %(len(self.entries), self.hits, self.misses, self.invalidations, self.evictions)
+
+	@staticmethod
+	def stamp(git_dir):
+		result = []
+		common_dir = git_dir
+
+		try:
+			with open(os.path.join(git_dir, 'commondir'), 'r') as f:
+				common_dir = os.path.join(git_dir, f.read().strip())
+		except OSError:
+			pass
+
+		for name in GitRepositoryCache.stamp_files:
+			if name == 'index' or name == 'HEAD' or name == 'MERGE_HEAD':
+				file = os.path.join(git_dir, name)
+			else:
+				file = os.path.join(common_dir, name)
+
+			try:
+				info = os.stat(file)
+				result.append((info.st_mtime_ns, info.st_size))
+			except OSError:
+				result.append(None)
+
+		# loose refs are written by renaming a lock file, which touches the directory
+		pending = [os.path.join(common_dir, 'refs')]
+
+		while len(pending) > 0:
+			directory = pending.pop()
+
+			try:
+				result.append((directory, os.stat(directory).st_mtime_ns))
+
+				for item in os.scandir(directory):
+					if item.is_dir(follow_symlinks=False):
+						pending.append(item.path)
+			except OSError:
+				result.append((directory, None))
+
+		return tuple(result)
+
+	def lookup(self, git_dir, key):
+		result = GitCacheEntry((git_dir, key), GitRepositoryCache.stamp(git_dir))
+
+		with self.lock:
+			cached = self.entries.get(result.key)
+
+			if cached != None and cached.stamp == result.stamp and (self.ttl == None or time.time() - cached.created < self.ttl):
+				self.entries.move_to_end(result.key)
+				self.hits += 1
+				result = cached
+			else:
+				self.misses += 1
+
+		return result
+
+	def store(self, entry, value):
+		stored = GitCacheEntry(entry.key, entry.stamp)
+		stored.value = value
+		stored.hit = True
+		stored.created = time.time()
+
+		with self.lock:
+			self.entries[entry.key] = stored
+			self.entries.move_to_end(entry.key)
+
+			while len(self.entries) > self.max_entries:
+				self.entries.popitem(last=False)
+				self.evictions += 1
+
+	def invalidate(self, git_dir=None):
+		with self.lock:
+			if git_dir == None:
+				keys = list(self.entries.keys())
+			else:
+				keys = [key for key in self.entries.keys() if key[0] == git_dir]
+
+			for key in keys:
+				del self.entries[key]
+
+			self.invalidations += 1
+
+class GitClient:
+	execution_mode = GitExecutionMode.Process
+	path = None
+	git_dir = None
+	cache = None
+	native_refs = False
+	native_refs_reader = None
+	native_history = None
+	worktree_path = None
+	watcher = None
+
+	@staticmethod
+	def clone_directory(url, bare=False):
+		result = os.path.basename(url.rstrip('/'))
+
+		if result.endswith('.git'):
+			result = result[:-4]
+
+		if bare:
+			result = result + '.git'
+
+		return result
+
+	@staticmethod
+	def clone(path='.', url='', recursive=False, directory=None, reference=None, dissociate=False, depth=None, filter=None, sparse=None, jobs=None, single_branch=False, branch=None, mirror=False, bare=False, progress=None, stats=None, execution_mode=GitExecutionMode.Process, cache=None, native_refs=False):
+		result = None
+		
+		if url == '':
+			logger.error("cannot clone repo (invalid url)")
+			result = None
+		else:
+			if directory == None:
+				directory = GitClient.clone_directory(url, mirror or bare)
+
+			full_cmd = ['git', 'clone']
+
+			if mirror:
+				full_cmd.append('--mirror')
+			elif bare:
+				full_cmd.append('--bare')
+
+			if recursive:
+				full_cmd.append('--recurse-submodules')
+
+			if jobs != None:
+				full_cmd.append('--jobs=%d' %(jobs))
+
+			if reference != None:
+				full_cmd.append('--reference-if-able=%s' %(reference))
+
+			if dissociate:
+				full_cmd.append('--dissociate')
+
+			if depth != None:
+				full_cmd.append('--depth=%d' %(depth))
+
+			if filter != None:
+				full_cmd.append('--filter=%s' %(filter))
+
+			if sparse != None:
+				full_cmd.append('--sparse')
+
+			if single_branch:
+				full_cmd.append('--single-branch')
+
+			if branch != None:
+				full_cmd.append('--branch=%s' %(branch))
+
+			full_cmd += ['--', url, directory]
+
+			start = time.perf_counter()
+			runner = GitClient()
+			runner.path = os.path.abspath(path)
+
+			try:
+				returncode = runner._transfer('clone', full_cmd, progress, stats)
+			except OSError:
+				logger.error("cannot clone repo (invalid path %s)", path)
+				returncode = None
+
+			if returncode == 0:
+				result = GitClient.open(os.path.join(runner.path, directory), execution_mode, cache, native_refs)
+
+			if result != None and sparse != None and len(sparse) > 0:
+				cmd = result._execute(['git', 'sparse-checkout', 'set', '--cone', '--stdin'], input='\n'.join(sparse).encode())
+
+				if cmd.returncode != 0:
+					logger.error("git sparse-checkout returned %s, code=%d", GitLogOutput(cmd.output), cmd.returncode)
+					result = None
+
+			if result != None:
+				logger.info("cloned %s into %s in %.3fs", url, result.path, time.perf_counter() - start)
+		
+		return result
+		
+	@staticmethod
+	def open(path='.', execution_mode=GitExecutionMode.Process, cache=None, native_refs=False):
+		result = None
+		path = os.path.abspath(path)
+		
+		try:
+			logger.info('Opening git repo %s', path)
+				
+			cmd = instrumentation.execute("git rev-parse --git-dir", path)
+			
+			if cmd.returncode != 0:
+				logger.error('Not a git repository')
+				result = None
+			else:
+				result = GitClient()
+				result.path = path
+				result.git_dir = os.path.join(path, cmd.output.strip().decode())
+				result.execution_mode = execution_mode
+				result.cache = cache
+				result.native_refs = native_refs
+		except:
+			logger.error("Failed opening repository")
+			result = None
+		
+		return result
+
+	def _done(self, result):
+		return result
+
+	def refs(self):
+		result = None
+
+		if self.native_refs:
+			if self.native_refs_reader == None:
+				self.native_refs_reader = GitRefs.open(self.git_dir)
+
+				if self.native_refs_reader == None:
+					self.native_refs = False
+
+			result = self.native_refs_reader
+
+		return result
+
+	def history(self):
+		if self.native_history == None and self.git_dir != None:
+			self.native_history = GitHistory.open(self.git_dir)
+
+		return self.native_history
+
+	def worktree(self):
+		return self._worktree()
+
+	def _worktree(self):
+		if self.worktree_path == None:
+			cmd = self._execute(['git', 'rev-parse', '--show-toplevel'])
+
+			if cmd.returncode == 0:
+				self.worktree_path = cmd.output.strip().decode()
+
+		return self.worktree_path
+
+	def _status_files(self, untracked):
+		result = None
+		cmd = self._execute(['git', 'status', '--porcelain=v2', '-z', '--untracked-files=%s' %('normal' if untracked else 'no')])
+
+		if cmd.returncode != 0:
+			logger.error("git status returned %s, code=%d", GitLogOutput(cmd.output), cmd.returncode)
+		else:
+			result = GitStatus.parse_porcelain_v2(cmd)
+
+		return result
+
+	def changed_files(self):
+		result = None
+		status = self._status_files(False)
+
+		if status != None:
+			result = sorted(set(item.file.decode('utf-8', 'surrogateescape') for item in status.not_staged + status.unmerged))
+
+		return self._done(result)
+
+	def is_dirty(self, untracked=False):
+		result = None
+		status = self._status_files(untracked)
+
+		if status != None:
+			result = len(status.staged) + len(status.not_staged) + len(status.untracked) + len(status.unmerged) > 0
+
+		return self._done(result)
+
+	def _add_files(self, paths, errors):
+		result = []
+		files = []
+		root = os.fsencode(self.path)
+
+		for path in paths:
+			try:
+				mode = os.lstat(os.path.join(root, path)).st_mode & 0o170000
+			except OSError:
+				mode = 0
+
+			if mode == 0o100000 or mode == 0o120000:
+				files.append(path)
+			else:
+				result.append(path)
+
+		if len(files) > 0:
+			# git add matches every pathspec against every file, update-index takes the paths as they are
+			# check-ignore is slow to look up tracked paths itself, tracked files may be added even if ignored
+			cmd = self._execute(['git', 'check-ignore', '--no-index', '-z', '--stdin'], input=b'\0'.join(files))
+
+			if cmd.returncode == 0 or cmd.returncode == 1:
+				ignored = set(cmd.output.split(b'\0')).intersection(files)
+
+				if len(ignored) > 0:
+					# ls-files lists the index relative to the current directory, like the paths we were given
+					listing = self._execute(['git', 'ls-files', '-z'])
+
+					if listing.returncode == 0:
+						tracked = set(listing.output.split(b'\0'))
+						ignored = set(path for path in ignored if os.path.normpath(path) not in tracked)
+
+				for path in ignored:
+					errors[path] = (1, b'The following paths are ignored by one of your .gitignore files:\n' + path)
+
+				files = [path for path in files if path not in ignored]
+				cmd = self._execute(['git', 'update-index', '--add', '-z', '--stdin'], input=b'\0'.join(files) + b'\0')
+
+			if cmd.returncode != 0:
+				result += files
+
+		return result
+
+	def _paths(self, name, paths, chunk_size=10000):
+		result = []
+		full_cmd = ['git', name, '--pathspec-from-file=-', '--pathspec-file-nul']
+		sparse = name == 'add' and self._execute(['git', 'config', '--bool', 'core.sparseCheckout']).output.strip() == b'true'
+
+		for start in range(0, len(paths), chunk_size):
+			pending = [os.fsencode(path) for path in paths[start:start + chunk_size]]
+			errors = {}
+
+			if logger.isEnabledFor(logging.INFO):
+				logger.info('%s (%d paths)', command.describe(full_cmd), len(pending))
+
+			# update-index knows nothing of sparse-checkout rules, only git add enforces them
+			if name == 'add' and not sparse:
+				pending = self._add_files(pending, errors)
+
+			# a pathspec that fails the whole command is reported on its own and the rest is retried
+			while len(pending) > 0:
+				cmd = self._execute(full_cmd, input=b'\0'.join(pending))
+
+				if cmd.returncode == 0:
+					break
+
+				failed = set(GitPathResult.failed_paths(cmd.output)).intersection(pending)
+
+				if len(failed) == 0:
+					logger.error("git %s returned %s, code=%d", name, GitLogOutput(cmd.output), cmd.returncode)
+					failed = pending
+
+				for path in failed:
+					errors[path] = (cmd.returncode, cmd.output.strip())
+
+				pending = [path for path in pending if path not in failed]
+
+			for path in paths[start:start + chunk_size]:
+				item = GitPathResult(path)
+
+				if os.fsencode(path) in errors:
+					item.returncode, item.error = errors[os.fsencode(path)]
+
+				result.append(item)
+
+		if self.cache != None and self.git_dir != None:
+			self.cache.invalidate(self.git_dir)
+
+		return result
+
+	def _transfer(self, name, full_cmd, progress=None, stats=None):
+		result = None
+
+		if progress == None and stats == None:
+			return self._run(name, full_cmd, returncode_on_failure=True, invalidate=True)
+
+		full_cmd = full_cmd[:2] + ['--progress'] + full_cmd[2:]
+		parser = GitProgressParser()
+		start = time.perf_counter()
+		record = instrumentation.begin(full_cmd, self.path, name)
+
+		if logger.isEnabledFor(logging.INFO):
+			logger.info('%s', command.describe(full_cmd))
+
+		try:
+			process = subprocess.Popen(full_cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=self.path, env=command.environment())
+		except OSError as e:
+			logger.error("cannot run git %s (%s)", name, e)
+			return self._done(result)
+
+		try:
+			while True:
+				chunk = process.stdout.read1(65536)
+
+				if chunk == b'':
+					break
+
+				for event in parser.feed(chunk):
+					if progress != None:
+						progress(event)
+
+			for event in parser.flush():
+				if progress != None:
+					progress(event)
+
+			result = process.wait()
+		finally:
+			if process.poll() == None:
+				process.kill()
+				process.wait()
+
+			process.stdout.close()
+
+		self._transfer_done(name, parser, time.perf_counter() - start, result, stats, record)
+
+		return self._done(result)
+
+	def _transfer_done(self, name, parser, elapsed, returncode, stats, record):
+		if stats != None:
+			parser.stats(stats, elapsed, returncode)
+
+		if record != None:
+			instrumentation.end(record, returncode, parser.size)
+			record.parse_time = parser.elapsed
+			instrumentation.emit(record)
+
+		if returncode != 0:
+			logger.error("git %s returned %s, code=%d", name, GitLogOutput(b'\n'.join(parser.lines)), returncode)
+
+		if self.cache != None and self.git_dir != None:
+			self.cache.invalidate(self.git_dir)
+
+	def _execute(self, full_cmd, input=None, trace=True):
+		return instrumentation.execute(full_cmd, self.path, input, trace)
+
+	def _run(self, name, full_cmd, parse=None, returncode_on_failure=False, input=None, cacheable=False, invalidate=False):
+		result = None
+
+		if full_cmd != None:
+			entry = self._cache_lookup(full_cmd, cacheable)
+
+			if entry != None and entry.hit:
+				result = entry.value
+				instrumentation.cached(name, full_cmd, self.path)
+			else:
+				if logger.isEnabledFor(logging.INFO):
+					logger.info('%s', command.describe(full_cmd))
+
+				cmd = self._execute(full_cmd, input=input, trace=False)
+
+				result = self._parse(name, cmd, parse, returncode_on_failure)
+
+				self._cache_update(entry, cmd, result, invalidate)
+
+		return result
+
+	def _cache_lookup(self, full_cmd, cacheable):
+		result = None
+
+		if cacheable and self.cache != None and self.git_dir != None:
+			result = self.cache.lookup(self.git_dir, command.describe(full_cmd))
+
+		return result
+
+	def _worktree_cacheable(self):
+		# the cache stamp only covers the git directory, work tree edits never change it
+		return self.cache != None and self.cache.ttl != None
+
+	def _cache_update(self, entry, cmd, result, invalidate):
+		if self.cache != None:
+			if entry != None and cmd.returncode == 0:
+				self.cache.store(entry, result)
+
+			if invalidate and self.git_dir != None:
+				self.cache.invalidate(self.git_dir)
+
+	def _parse(self, name, cmd, parse, returncode_on_failure):
+		if cmd.record == None:
+			return GitClient._result(name, cmd, parse, returncode_on_failure)
+
+		start = time.perf_counter()
+		result = GitClient._result(name, cmd, parse, returncode_on_failure)
+		cmd.record.name = name
+		cmd.record.parse_time = time.perf_counter() - start
+		instrumentation.emit(cmd.record)
+
+		return result
+
+	@staticmethod
+	def _result(name, cmd, parse=None, returncode_on_failure=False):
+		result = None
+
+		if cmd.returncode != 0:
+			logger.error("git %s returned %s, code=%d", name, GitLogOutput(cmd.output), cmd.returncode)
+
+			if returncode_on_failure:
+				result = cmd.returncode
+		elif parse != None:
+			result = parse(cmd)
+		else:
+			result = cmd.returncode
+
+		return result
+
+	def status(self):
+		full_cmd = "git status --porcelain=v2 -z --branch"
+
+		if self.watcher != None and self.watcher.running:
+			result = self._done(self.watcher.status())
+		else:
+			result = self._run('status', full_cmd, GitStatus.parse_porcelain_v2, cacheable=self._worktree_cacheable())
+
+		return result
+
+	def watch(self, delay=0.05):
+		if self.watcher == None or not self.watcher.running:
+			self.watcher = GitStatusWatcher(self, delay).start()
+
+		return self.watcher
+
+	def unwatch(self):
+		if self.watcher != None:
+			self.watcher.stop()
+			self.watcher = None
+		
+	def submodule(self, subcmd = 'status', recursive=False, init=False, deinit=False):
+		parse = None
+		
+		full_cmd = "git submodule %s" %(subcmd)
+		
+		if recursive:
+			full_cmd = full_cmd + " --recursive"
+		if init:
+			full_cmd = full_cmd + " --init"
+		if deinit:
+			full_cmd = full_cmd + " --deinit"
+
+		if subcmd == 'status':
+			parse = GitSubmoduleStatus.parse
+	
+		return self._run('submodule %s' %(subcmd), full_cmd, parse, cacheable=parse != None and self._worktree_cacheable(), invalidate=parse == None)
+
+	def update_submodules(self, recursive=True, max_workers=8, retries=2, depth=None):
+		result = None
+		worktree = self._worktree()
+
+		if worktree != None:
+			updater = GitSubmoduleUpdater(worktree, max_workers, retries, recursive, depth)
+			result = list(updater.run())
+			logger.info('submodule update: %s', updater.stats)
+
+			if self.cache != None and self.git_dir != None:
+				self.cache.invalidate(self.git_dir)
+
+		return self._done(result)
+
+	def checkout(self, target='', create_branch=False):
+		full_cmd = None
+		
+		if target == b'':
+			logger.error("Cannot checkout, target not provided")
+		else:
+			full_cmd = "git checkout"
+			
+			if create_branch:
+				full_cmd = full_cmd + " -b"
+
+			full_cmd = full_cmd + (" %s" %(target))
+				
+		return self._run('checkout', full_cmd, invalidate=True)
+
+	def add(self, target='', chunk_size=10000):
+		full_cmd = None
+		
+		if target == b'' or (isinstance(target, (list, tuple)) and len(target) == 0):
+			logger.error("Cannot add, target not provided")
+		elif isinstance(target, (list, tuple)):
+			return self._done(self._paths('add', target, chunk_size))
+		else:
+			full_cmd = "git add %s" %(target)
+				
+		return self._run('add', full_cmd, invalidate=True)
+
+	def rm(self, target='', chunk_size=10000):
+		full_cmd = None
+		
+		if target == b'' or (isinstance(target, (list, tuple)) and len(target) == 0):
+			logger.error("Cannot rm, target not provided")
+		elif isinstance(target, (list, tuple)):
+			return self._done(self._paths('rm', target, chunk_size))
+		else:
+			full_cmd = "git rm %s" %(target)
+				
+		return self._run('rm', full_cmd, invalidate=True)
+
+	def commit(self, message='', amend=False):
+		full_cmd = None
+		
+		if message == b'' and amend == False:
+			logger.error("Cannot commit, message not provided")
+		else:
+			full_cmd = "git commit"
+			
+			if amend:
+				full_cmd = full_cmd + " --amend --no-edit"
+			else:
+				full_cmd = full_cmd + (" -m \"%s\"" %(message))
+				
+		return self._run('commit', full_cmd, invalidate=True)
+
+	def log(self, n=1, author=None, branch=None, path=None, stream=False, native=False):
+		result = None
+		full_cmd = None
+		
+		if n != None and n <= 0:
+			logger.error("Cannot query log, n is less or equal zero")
+		elif native and path == None and self.history() != None:
+			start = None
+			refs = self.refs() or GitRefs.open(self.git_dir)
+
+			if refs != None:
+				start = refs.resolve(branch or b'HEAD')
+
+			if start == None:
+				start = self.rev_parse(branch or b'HEAD')
+
+			if start != None:
+				start = self.history().peel(start)
+
+			if start == None:
+				logger.error("Cannot query log, %s not found or not a commit", branch or 'HEAD')
+			else:
+				abbrev = self.history().objects.abbrev_length()
+				result = (commit.to_log(abbrev) for commit in self.history().walk([start], n, author))
+
+				if not stream:
+					result = list(result)
+		elif stream:
+			full_cmd = ['git', 'log', '-z', '--format=%s' %(GitLog.stream_format)]
+
+			if n != None:
+				full_cmd += ['-n', str(n)]
+
+			if author != None:
+				full_cmd += ['--author', author]
+
+			if branch != None:
+				full_cmd.append(branch)
+
+			if path != None:
+				full_cmd += ['--', path]
+
+			if logger.isEnabledFor(logging.INFO):
+				logger.info('%s', command.describe(full_cmd))
+
+			result = GitLog.parse_stream(full_cmd, cwd=self.path)
+		else:
+			full_cmd = "git log"
+
+			if n != None:
+				full_cmd = full_cmd + (" -n %d" %(n))
+			
+			if author != None:
+				full_cmd = full_cmd + (" --author %s" %(author))
+			
+			if branch != None:
+				full_cmd = full_cmd + (" %s" %(branch))
+			
+			if path != None:
+				full_cmd = full_cmd + (" -- %s" %(path))
+
+			result = self._run('log', full_cmd, GitLog.parse)
+				
+		return result
+
+	def fetch(self, repo='origin', refspec=None, depth=None, filter=None, refetch=False, prune=False, tags=False, progress=None, stats=None):
+		full_cmd = ['git', 'fetch']
+
+		if depth != None:
+			full_cmd.append('--depth=%d' %(depth))
+
+		if filter != None:
+			full_cmd.append('--filter=%s' %(filter))
+
+		if refetch:
+			full_cmd.append('--refetch')
+
+		if prune:
+			full_cmd.append('--prune')
+
+		if tags:
+			full_cmd.append('--tags')
+
+		full_cmd.append(repo)
+
+		if refspec != None:
+			full_cmd.append(refspec)
+
+		return self._transfer('fetch', full_cmd, progress, stats)
+
+	def pull(self, repo='origin', refspec=None, depth=None, progress=None, stats=None):
+		full_cmd = "git pull"
+
+		if depth != None:
+			full_cmd = full_cmd + (" --depth=%d" %(depth))
+
+		full_cmd = full_cmd + (" %s" %(repo))
+		
+		if refspec != None:
+			full_cmd = full_cmd + (" %s" %(refspec))
+		
+		return self._transfer('pull', command.split(full_cmd), progress, stats)
+		
+	def push(self, repo='origin', refspec=None, set_upstream=False, force=False, tags=False, progress=None, stats=None):
+		full_cmd = "git push"
+		
+		if set_upstream:
+			full_cmd = full_cmd + " --set-upstream"
+			
+		if force:
+			full_cmd = full_cmd + " --force"
+			
+		if tags:
+			full_cmd = full_cmd + " --tags"
+		
+		full_cmd = full_cmd + (" %s" %(repo))
+		
+		if refspec != None:
+			full_cmd = full_cmd + (" %s" %(refspec))
+
+		
+		return self._transfer('push', command.split(full_cmd), progress, stats)
+
+	def branch(self, branch=None, set_upstream_to=None, set_upstream=False, unset_upstream=False, rename_to=None, delete=False):
+		full_cmd = "git branch"
+		
+		if set_upstream_to != None:
+			if set_upstream_to == b'':
+				full_cmd = None
+				logger.error("git branch failed: set_upstream_to is invalid")
+			else:
+				full_cmd = full_cmd + (" --set-upstream-to=%s" %(set_upstream_to))
+				if branch != None:
+					full_cmd = full_cmd + (" %s" %(branch))
+		elif unset_upstream:
+			full_cmd = full_cmd + " --unset-upstream"
+			if branch != None:
+				full_cmd = full_cmd + (" %s" %(branch))
+		elif rename_to != None:
+			if rename_to == b'':
+				full_cmd = None
+				logger.error("git branch failed: rename_to value is invalid")
+			else:
+				full_cmd = full_cmd + (" -m %s" %(rename_to))
+		elif delete:
+			if branch == None or branch == b'':
+				full_cmd = None
+				logger.error("git branch delete failed: branch value is invalid")
+			else:
+				full_cmd = full_cmd + (" -D %s" %(branch))
+		else:
+			if branch == None:
+				full_cmd = None
+				logger.error("git branch failed: branch value is not provided")
+			elif branch == b'':
+				full_cmd = None
+				logger.error("git branch failed: branch value is invalid")
+			else:
+				full_cmd = full_cmd + (" %s" %(branch))
+		
+		return self._run('branch', full_cmd, returncode_on_failure=True, invalidate=True)
+
+	def reset(self, commit=None, mode=GitResetMode.Mixed):
+		full_cmd = "git reset"
+		
+		if mode == GitResetMode.Mixed:
+			full_cmd = full_cmd + " --mixed"
+		elif mode == GitResetMode.Soft:
+			full_cmd = full_cmd + " --soft"
+		elif mode == GitResetMode.Hard:
+			full_cmd = full_cmd + " --hard"
+		elif mode == GitResetMode.Merged:
+			full_cmd = full_cmd + " --merged"
+		elif mode == GitResetMode.Keep:
+			full_cmd = full_cmd + " --keep"
+		else:
+			full_cmd = None
+			logger.error("git reset failed: mode value is invalid")
+
+		if full_cmd != None:
+			if commit != None:
+				full_cmd = full_cmd + (" %s" %(commit))
+		
+		return self._run('reset', full_cmd, returncode_on_failure=True, invalidate=True)
+
+	def remote(self, name=None, url=None, branch=None, prune=False, add=False, remove=False):
+		parse = None
+		native = None
+		full_cmd = "git remote"
+		
+		if add:
+			if name == None or url == None:
+				logger.error("git remote failed: name and/or url value is invalid")
+				full_cmd = None
+			else:
+				if branch != None:
+					full_cmd += " -t %s" %(branch)
+					
+				full_cmd += " %s %s" %(name, url)
+		elif remove:
+			if name == None:
+				logger.error("git remote failed: name value is invalid")
+				full_cmd = None
+			else:
+				full_cmd += " remove %s" %(name)
+		else:
+			full_cmd += " -v"
+			parse = GitRemote.parse
+
+			refs = self.refs()
+
+			if refs != None:
+				native = refs.remotes()
+
+		if native != None:
+			result = self._done(native)
+		else:
+			result = self._run('remote', full_cmd, parse, returncode_on_failure=True, cacheable=parse != None, invalidate=parse == None)
+
+		return result
+
+	def tag(self, tag=None, message=None, commit=None, annotate=False, add=False, delete=False):
+		parse = GitTag.parse
+		native = None
+
+		full_cmd = "git tag"
+
+		if add == True:
+			if tag == None:
+				full_cmd = None
+				logger.error("git tag failed: tag value is invalid")
+			else:
+				if annotate == True:
+					full_cmd += " -a"
+				
+				full_cmd += (" %s" %(tag))
+				
+				if commit != None:
+					full_cmd += (" %s" %(commit))
+				
+				if message != None:
+					full_cmd += (" -m \"%s\"" %(message))
+					
+				parse = None
+		elif delete == True:
+			if tag == None:
+				full_cmd = None
+				logger.error("git tag failed: tag value is invalid")
+			else:
+				full_cmd += (" -d %s" %(tag))
+				parse = None
+		else:
+			full_cmd += " --list"
+
+			refs = self.refs()
+
+			if refs != None:
+				native = refs.tags()
+
+		if native != None:
+			result = self._done(native)
+		else:
+			result = self._run('tag', full_cmd, parse, cacheable=parse != None, invalidate=parse == None)
+		
+		return result
+		
+	def tags(self, pattern=None, sort=None, contains=None, n=None, stream=False):
+		full_cmd = ['git', 'for-each-ref', '--format=%s' %(GitTag.stream_format)]
+
+		if isinstance(sort, (str, bytes)):
+			sort = [sort]
+
+		for key in sort or []:
+			full_cmd.append('--sort=%s' %(key.decode() if isinstance(key, bytes) else key))
+
+		if contains != None:
+			full_cmd += ['--contains', contains]
+
+		if n != None:
+			full_cmd.append('--count=%d' %(n))
+
+		if isinstance(pattern, (str, bytes)):
+			pattern = [pattern]
+
+		if pattern:
+			full_cmd += ['refs/tags/%s' %(item.decode() if isinstance(item, bytes) else item) for item in pattern]
+		else:
+			full_cmd.append('refs/tags')
+
+		if stream:
+			if logger.isEnabledFor(logging.INFO):
+				logger.info('%s', command.describe(full_cmd))
+
+			result = GitTag.parse_stream(full_cmd, cwd=self.path)
+		else:
+			result = self._run('for-each-ref', full_cmd, lambda cmd: GitTag.parse_records(cmd, self.path), cacheable=True)
+
+		return result
+
+	def _diff_command(self, option, a, b=None, paths=None, renames=False):
+		full_cmd = ['git', 'diff-tree', '-r', '-z', '--no-commit-id', '--root', option]
+
+		if renames:
+			full_cmd.append('-M')
+		else:
+			full_cmd.append('--no-renames')
+
+		full_cmd.append(a)
+
+		if b != None:
+			full_cmd.append(b)
+
+		if isinstance(paths, (str, bytes)):
+			paths = [paths]
+
+		if paths:
+			full_cmd.append('--')
+			full_cmd += [path.decode() if isinstance(path, bytes) else path for path in paths]
+
+		return full_cmd
+
+	def diff(self, a, b=None, paths=None, renames=False, stream=False):
+		full_cmd = self._diff_command('--numstat', a, b, paths, renames)
+
+		if stream:
+			if logger.isEnabledFor(logging.INFO):
+				logger.info('%s', command.describe(full_cmd))
+
+			result = GitDiffEntry.parse_fields(command.stream(full_cmd, 'diff-tree', cwd=self.path))
+		else:
+			result = self._run('diff-tree', full_cmd, GitDiffEntry.parse, cacheable=True)
+
+		return result
+
+	def changed_paths(self, a, b=None, paths=None, owners=None):
+		full_cmd = self._diff_command('--name-only', a, b, paths)
+
+		if logger.isEnabledFor(logging.INFO):
+			logger.info('%s', command.describe(full_cmd))
+
+		result = (path for path in command.stream(full_cmd, 'diff-tree', cwd=self.path) if path != b'')
+
+		if owners != None:
+			try:
+				result = owners.owners(result)
+			except subprocess.CalledProcessError:
+				result = None
+
+		return result
+
+	def cat_file(self, name, data=True):
+		result = None
+
+		if isinstance(name, str):
+			name = name.encode()
+
+		if name == b'':
+			logger.error("git cat-file failed: name value is invalid")
+		elif self.execution_mode == GitExecutionMode.Pooled:
+			result = process_pool.get(self.path or '.', batch_check=not data).query(name)
+		else:
+			if data:
+				full_cmd = ['git', 'cat-file', '--batch']
+			else:
+				full_cmd = ['git', 'cat-file', '--batch-check']
+
+			result = self._run('cat-file', full_cmd, GitObjectInfo.parse, input=name + b'\n')
+
+		return result
+
+	def object_info(self, name):
+		return self.cat_file(name, data=False)
+
+	def rev_parse(self, name):
+		result = None
+		refs = self.refs()
+
+		if refs != None:
+			result = refs.resolve(name)
+
+		if result == None:
+			info = self.cat_file(name, data=False)
+
+			if info != None:
+				result = info.oid
+
+		return result
+
+	def _ancestry(self, *names):
+		result = None
+		history = self.history()
+
+		if history != None and history.graph != None:
+			refs = self.refs() or GitRefs.open(self.git_dir)
+			oids = []
+
+			for name in names:
+				oid = refs.resolve(name) if refs != None else None
+
+				if oid != None and history.graph.lookup(binascii.unhexlify(oid)) == None:
+					oid = history.peel(oid)
+
+				# unknown names are left to git
+				if oid == None:
+					break
+
+				oids.append(oid)
+
+			if len(oids) == len(names):
+				result = oids
+
+		return result
+
+	def is_ancestor(self, ancestor, descendant):
+		result = None
+		oids = self._ancestry(ancestor, descendant)
+
+		if oids != None:
+			result = self._done(self.history().is_ancestor(oids[0], oids[1]))
+		else:
+			result = self._run('merge-base', ['git', 'rev-list', '-n', '1', ancestor, '^%s' %(descendant), '--'], lambda cmd: cmd.output.strip() == b'')
+
+		return result
+
+	def merge_base(self, first, second):
+		result = None
+		oids = self._ancestry(first, second)
+
+		if oids != None:
+			bases = self.history().merge_bases(oids[0], oids[1])
+			result = self._done(bases[0] if len(bases) > 0 else None)
+		else:
+			result = self._run('merge-base', ['git', 'merge-base', first, second], lambda cmd: cmd.output.strip() or None)
+
+		return result
+
+	def count_between(self, exclude, include):
+		result = None
+		oids = self._ancestry(exclude, include)
+
+		if oids != None:
+			result = self._done(self.history().count_between(oids[0], oids[1]))
+		else:
+			result = self._run('rev-list', ['git', 'rev-list', '--count', include, '^%s' %(exclude), '--'], lambda cmd: int(cmd.output.strip()))
+
+		return result
+
+	def topo_order(self, branch='HEAD', n=None):
+		result = None
+		oids = self._ancestry(branch)
+
+		if oids != None:
+			result = self._done(list(self.history().topo_order(oids, n)))
+		else:
+			full_cmd = ['git', 'rev-list', '--topo-order']
+
+			if n != None:
+				full_cmd += ['-n', str(n)]
+
+			result = self._run('rev-list', full_cmd + [branch, '--'], lambda cmd: cmd.output.split())
+
+		return result
+
+	def current_branch(self):
+		result = None
+		refs = self.refs()
+
+		if refs != None:
+			result = refs.current_branch()
+		else:
+			cmd = self._execute(['git', 'symbolic-ref', '--short', '-q', 'HEAD'])
+
+			if cmd.returncode == 0:
+				result = cmd.output.strip()
+
+		return result
+
+	def batch(self, max_workers=4):
+		return GitBatch(self, max_workers)
+
+	def update_ref(self, ref, new, old=None):
+		full_cmd = ['git', 'update-ref', ref, new]
+
+		if old != None:
+			full_cmd.append(old)
+
+		return self._run('update-ref', full_cmd, returncode_on_failure=True, invalidate=True)
+
+	def merge(self):
+		result = None
+		return result
+
+	def mv(self):
+		result = None
+		return result
+
+	def init(self):
+		result = None
+		return result
+		
+	def setCredentials(self):
+		result = None
+		return result
+		
+
+class GitBatch:
+	reads = ('status', 'log', 'cat_file', 'object_info', 'rev_parse', 'current_branch', 'is_ancestor', 'merge_base', 'count_between', 'topo_order', 'changed_files', 'is_dirty')
+	unqueryable = ('remote', 'tag')
+
+	def __init__(self, client, max_workers=4):
+		self.client = client
+		self.max_workers = max_workers
+		self.operations = []
+		self.results = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		if exc_type == None:
+			self.execute()
+
+	def __getattr__(self, name):
+		if name.startswith('_') or not callable(getattr(self.client, name, None)):
+			raise AttributeError(name)
+
+		def queue(*args, **kwargs):
+			self.operations.append((name, args, kwargs))
+			return len(self.operations) - 1
+
+		return queue
+
+	def update_ref(self, ref, new, old=None):
+		self.operations.append(('update_ref', (ref, new, old), {}))
+		return len(self.operations) - 1
+
+	@staticmethod
+	def is_read(operation):
+		name, args, kwargs = operation
+
+		return name in GitBatch.reads or (name in GitBatch.unqueryable and len(args) == 0 and len(kwargs) == 0)
+
+	@staticmethod
+	def pathspecs(operation):
+		result = None
+		name, args, kwargs = operation
+
+		if (name == 'add' or name == 'rm') and len(args) == 1 and len(kwargs) == 0 and isinstance(args[0], str):
+			# not command.split, which leaves the string alone on Windows
+			result = shlex.split(args[0])
+
+			# options such as -A cannot be passed as pathspecs
+			if len(result) == 0 or any(path.startswith('-') for path in result):
+				result = None
+
+		return result
+
+	def _call(self, operation):
+		name, args, kwargs = operation
+
+		return getattr(self.client, name)(*args, **kwargs)
+
+	def _group(self, start):
+		end = start + 1
+		operation = self.operations[start]
+
+		if GitBatch.is_read(operation):
+			while end < len(self.operations) and GitBatch.is_read(self.operations[end]):
+				end += 1
+		elif operation[0] == 'update_ref':
+			while end < len(self.operations) and self.operations[end][0] == 'update_ref':
+				end += 1
+		elif GitBatch.pathspecs(operation) != None:
+			while end < len(self.operations) and self.operations[end][0] == operation[0] and GitBatch.pathspecs(self.operations[end]) != None:
+				end += 1
+
+		return end
+
+	def execute(self):
+		self.results = [None] * len(self.operations)
+		start = 0
+
+		while start < len(self.operations):
+			end = self._group(start)
+			operations = self.operations[start:end]
+			name = operations[0][0]
+
+			if GitBatch.is_read(operations[0]) and len(operations) > 1 and self.max_workers > 1:
+				# reads between two writes do not depend on each other
+				with concurrent.futures.ThreadPoolExecutor(min(self.max_workers, len(operations))) as pool:
+					self.results[start:end] = list(pool.map(self._call, operations))
+			elif name == 'update_ref':
+				lines = []
+
+				for operation in operations:
+					ref, new, old = operation[1]
+					lines.append('update %s %s%s\n' %(ref, new, ' %s' %(old) if old != None else ''))
+
+				result = self.client._run('update-ref', ['git', 'update-ref', '--stdin'], input=''.join(lines).encode(), returncode_on_failure=True, invalidate=True)
+				self.results[start:end] = [result] * len(operations)
+			elif len(operations) > 1:
+				paths = []
+
+				for operation in operations:
+					paths += GitBatch.pathspecs(operation)
+
+				items = self.client._paths(name, paths)
+				position = 0
+
+				for index, operation in enumerate(operations):
+					count = len(GitBatch.pathspecs(operation))
+					failed = [item for item in items[position:position + count] if item.returncode != 0]
+					# same values as a direct add() or rm(): 0 when every path went through, None otherwise
+					self.results[start + index] = None if len(failed) > 0 else 0
+					position += count
+			else:
+				self.results[start:end] = [self._call(operation) for operation in operations]
+
+			start = end
+
+		self.operations = []
+
+		return self.results
+
+class AsyncGitClient(GitClient):
+	max_concurrency = 8
+	semaphores = weakref.WeakKeyDictionary()
+
+	@staticmethod
+	async def open(path='.', max_concurrency=8, execution_mode=GitExecutionMode.Process, cache=None, native_refs=False):
+		result = None
+		cmd = None
+
+		client = AsyncGitClient()
+		client.path = os.path.abspath(path)
+		client.max_concurrency = max_concurrency
+		client.execution_mode = execution_mode
+		client.cache = cache
+		client.native_refs = native_refs
+
+		logger.info('Opening git repo %s', client.path)
+
+		try:
+			cmd = await client._execute_async(['git', 'rev-parse', '--git-dir'])
+		except OSError:
+			logger.error("Failed opening repository")
+
+		if cmd != None:
+			if cmd.returncode != 0:
+				logger.error('Not a git repository')
+			else:
+				client.git_dir = os.path.join(client.path, cmd.output.strip().decode())
+				result = client
+
+		return result
+
+	def _semaphore(self):
+		semaphores = AsyncGitClient.semaphores.setdefault(asyncio.get_event_loop(), {})
+		result = semaphores.get(self.path)
+
+		if result == None:
+			result = asyncio.Semaphore(self.max_concurrency)
+			semaphores[self.path] = result
+
+		return result
+
+	async def _execute_async(self, full_cmd, input=None, trace=True):
+		result = command()
+
+		if input != None:
+			stdin = subprocess.PIPE
+		else:
+			stdin = subprocess.DEVNULL
+
+		async with self._semaphore():
+			record = instrumentation.begin(full_cmd, self.path)
+
+			if isinstance(full_cmd, str) and os.name == 'nt':
+				process = await asyncio.create_subprocess_shell(full_cmd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=self.path, env=command.environment())
+			else:
+				process = await asyncio.create_subprocess_exec(*command.split(full_cmd), stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=self.path, env=command.environment(), start_new_session=True)
+
+			try:
+				result.output, unused = await process.communicate(input)
+			except asyncio.CancelledError:
+				if process.returncode == None:
+					if os.name == 'nt':
+						process.kill()
+					else:
+						# git forks helpers (remote-https, pack-objects...) that hold our pipes open
+						os.killpg(process.pid, signal.SIGKILL)
+
+				await process.wait()
+				raise
+
+		result.returncode = process.returncode
+
+		if record != None:
+			instrumentation.end(record, result.returncode, len(result.output))
+			result.record = record
+
+			if trace:
+				instrumentation.emit(record)
+
+		return result
+
+	async def _run(self, name, full_cmd, parse=None, returncode_on_failure=False, input=None, cacheable=False, invalidate=False):
+		result = None
+
+		if full_cmd != None:
+			entry = self._cache_lookup(full_cmd, cacheable)
+
+			if entry != None and entry.hit:
+				result = entry.value
+				instrumentation.cached(name, full_cmd, self.path)
+			else:
+				if logger.isEnabledFor(logging.INFO):
+					logger.info('%s', command.describe(full_cmd))
+
+				cmd = await self._execute_async(full_cmd, input=input, trace=False)
+
+				result = self._parse(name, cmd, parse, returncode_on_failure)
+
+				self._cache_update(entry, cmd, result, invalidate)
+
+		return result
+
+	async def _transfer(self, name, full_cmd, progress=None, stats=None):
+		result = None
+
+		if progress == None and stats == None:
+			return await self._run(name, full_cmd, returncode_on_failure=True, invalidate=True)
+
+		full_cmd = full_cmd[:2] + ['--progress'] + full_cmd[2:]
+		parser = GitProgressParser()
+		start = time.perf_counter()
+		record = instrumentation.begin(full_cmd, self.path, name)
+
+		if logger.isEnabledFor(logging.INFO):
+			logger.info('%s', command.describe(full_cmd))
+
+		async with self._semaphore():
+			process = await asyncio.create_subprocess_exec(*full_cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=self.path, env=command.environment(), start_new_session=True)
+
+			try:
+				while True:
+					chunk = await process.stdout.read(65536)
+
+					if chunk == b'':
+						break
+
+					for event in parser.feed(chunk):
+						if progress != None:
+							progress(event)
+
+				for event in parser.flush():
+					if progress != None:
+						progress(event)
+
+				result = await process.wait()
+			except asyncio.CancelledError:
+				if process.returncode == None:
+					os.killpg(process.pid, signal.SIGKILL)
+
+				await process.wait()
+				raise
+
+		self._transfer_done(name, parser, time.perf_counter() - start, result, stats, record)
+
+		return result
+
+	def progress(self, operation, *args, **kwargs):
+		return GitProgressStream(self, operation, args, kwargs)
+
+	async def _blocking(self, method, *args):
+		# the sync implementation runs on an executor thread, its _done coroutine is awaited here
+		result = await asyncio.get_event_loop().run_in_executor(None, method, self, *args)
+
+		if asyncio.iscoroutine(result):
+			result = await result
+
+		return result
+
+	async def worktree(self):
+		result = self.worktree_path
+
+		if result == None:
+			result = await asyncio.get_event_loop().run_in_executor(None, self._worktree)
+
+		return result
+
+	async def changed_files(self):
+		return await self._blocking(GitClient.changed_files)
+
+	async def is_dirty(self, untracked=False):
+		return await self._blocking(GitClient.is_dirty, untracked)
+
+	async def add(self, target='', chunk_size=10000):
+		if isinstance(target, (list, tuple)):
+			result = await self._blocking(GitClient.add, target, chunk_size)
+		else:
+			result = await GitClient.add(self, target, chunk_size)
+
+		return result
+
+	async def rm(self, target='', chunk_size=10000):
+		if isinstance(target, (list, tuple)):
+			result = await self._blocking(GitClient.rm, target, chunk_size)
+		else:
+			result = await GitClient.rm(self, target, chunk_size)
+
+		return result
+
+	async def update_submodules(self, recursive=True, max_workers=8, retries=2, depth=None):
+		return await self._blocking(GitClient.update_submodules, recursive, max_workers, retries, depth)
+
+	async def watch(self, delay=0.05):
+		return await asyncio.get_event_loop().run_in_executor(None, GitClient.watch, self, delay)
+
+	async def unwatch(self):
+		await asyncio.get_event_loop().run_in_executor(None, GitClient.unwatch, self)
+
+	async def log(self, n=1, author=None, branch=None, path=None, stream=False):
+		result = GitClient.log(self, n, author, branch, path, stream)
+
+		if result != None:
+			if stream:
+				result = GitAsyncStream(result)
+			else:
+				result = await result
+
+		return result
+
+	async def tags(self, pattern=None, sort=None, contains=None, n=None, stream=False):
+		result = GitClient.tags(self, pattern, sort, contains, n, stream)
+
+		if stream:
+			result = GitAsyncStream(result)
+		else:
+			result = await result
+
+		return result
+
+	async def diff(self, a, b=None, paths=None, renames=False, stream=False):
+		result = GitClient.diff(self, a, b, paths, renames, stream)
+
+		if stream:
+			result = GitAsyncStream(result)
+		else:
+			result = await result
+
+		return result
+
+	async def changed_paths(self, a, b=None, paths=None, owners=None):
+		if owners != None:
+			result = await self._blocking(GitClient.changed_paths, a, b, paths, owners)
 		else:
-			result = GitStatus.parse(cmd)
-		
+			result = GitAsyncStream(GitClient.changed_paths(self, a, b, paths))
+
 		return result
-		
-	def submodule(self, subcmd = 'status', recursive=False, init=False, deinit=False):
-		result = None;
-		
-		full_cmd = "git submodule %s" %(subcmd)
-		
-		if recursive:
-			full_cmd = full_cmd + " --recursive"
-		if init:
-			full_cmd = full_cmd + " --init"
-		if deinit:
-			full_cmd = full_cmd + " --deinit"
-	
-		logger.info(full_cmd)
-		
-		cmd = command.execute(full_cmd)
-		
-		if cmd.returncode != 0:
-			logger.error("git %s returned %s, code=%d", subcmd, cmd.output, cmd.returncode)
-			result = None
+
+	async def cat_file(self, name, data=True):
+		if self.execution_mode == GitExecutionMode.Pooled:
+			result = await asyncio.get_event_loop().run_in_executor(None, GitClient.cat_file, self, name, data)
 		else:
-			if subcmd == 'status':
-				result = GitSubmoduleStatus.parse(cmd)
-			else:
-				result = cmd.returncode
+			result = GitClient.cat_file(self, name, data)
+
+			if result != None:
+				result = await result
 
 		return result
 
-	def checkout(self, target='', create_branch=False):
+	async def _done(self, result):
+		return result
+
+	async def rev_parse(self, name):
 		result = None
-		
-		if target == b'':
-			logger.error("Cannot checkout, target not provided")
-		else:
-			full_cmd = "git checkout"
-			
-			if create_branch:
-				full_cmd = full_cmd + " -b"
+		refs = self.refs()
 
-			full_cmd = full_cmd + (" %s" %(target))
+		if refs != None:
+			result = refs.resolve(name)
+
+		if result == None:
+			info = await self.cat_file(name, data=False)
+
+			if info != None:
+				result = info.oid
 
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
-			if cmd.returncode != 0:
-				logger.error("git checkout returned %s, code=%d", cmd.output, cmd.returncode)
-			else:
-				result = cmd.returncode
-				
 		return result
 
-	def add(self, target=''):
+	async def current_branch(self):
 		result = None
-		
-		if target == b'':
-			logger.error("Cannot add, target not provided")
+		refs = self.refs()
+
+		if refs != None:
+			result = refs.current_branch()
 		else:
-			full_cmd = "git add %s" %(target)
-			
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
-			if cmd.returncode != 0:
-				logger.error("git add returned %s, code=%d", cmd.output, cmd.returncode)
-			else:
-				result = cmd.returncode
-				
+			cmd = await self._execute_async(['git', 'symbolic-ref', '--short', '-q', 'HEAD'])
+
+			if cmd.returncode == 0:
+				result = cmd.output.strip()
+
 		return result
 
-	def rm(self, target=''):
-		result = None
-		
-		if target == b'':
-			logger.error("Cannot rm, target not provided")
+class GitFleetResult:
+	__slots__ = ('path', 'result', 'error', 'elapsed')
+
+	def __init__(self, path=None, result=None, error=None, elapsed=0.0):
+		self.path = path
+		self.result = result
+		self.error = error
+		self.elapsed = elapsed
+
+	def __str__(self):
+		if self.error != None:
+			string = '%s: error %s (%.3fs)' %(self.path, self.error, self.elapsed)
 		else:
-			full_cmd = "git rm %s" %(target)
-			
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
-			if cmd.returncode != 0:
-				logger.error("git rm returned %s, code=%d", cmd.output, cmd.returncode)
-			else:
-				result = cmd.returncode
-				
+			string = '%s: %s (%.3fs)' %(self.path, self.result, self.elapsed)
+
+		return string
+
+class GitFleetStats:
+	def __init__(self):
+		self.count = 0
+		self.errors = 0
+		self.elapsed = 0.0
+		self.latencies = []
+
+	def __str__(self):
+		return 'count=%d errors=%d elapsed=%.3fs throughput=%.1f/s p50=%.3fs p90=%.3fs p99=%.3fs' %(self.count, self.errors, self.elapsed, self.throughput(), self.percentile(50), self.percentile(90), self.percentile(99))
+
+	def add(self, item):
+		self.count += 1
+		self.latencies.append(item.elapsed)
+
+		if item.error != None:
+			self.errors += 1
+
+	def throughput(self):
+		result = 0.0
+
+		if self.elapsed > 0:
+			result = self.count / self.elapsed
+
 		return result
 
-	def commit(self, message='', amend=False):
-		result = None
-		
-		if message == b'' and amend == False:
-			logger.error("Cannot commit, message not provided")
+	def percentile(self, percent):
+		result = 0.0
+
+		if len(self.latencies) > 0:
+			latencies = sorted(self.latencies)
+			index = max(0, min(len(latencies) - 1, int(math.ceil(percent / 100.0 * len(latencies))) - 1))
+			result = latencies[index]
+
+		return result
+
+class GitSubmoduleResult:
+	__slots__ = ('path', 'parent', 'depth', 'commit', 'attempts', 'result', 'error', 'elapsed')
+
+	def __init__(self, path=None, parent=None, depth=0):
+		self.path = path
+		self.parent = parent
+		self.depth = depth
+		self.commit = None
+		self.attempts = 0
+		self.result = None
+		self.error = None
+		self.elapsed = 0.0
+
+	def __str__(self):
+		if self.error != None:
+			string = '%s: error %s (%d attempts, %.3fs)' %(self.path, self.error, self.attempts, self.elapsed)
+		elif self.attempts == 0:
+			string = '%s: up to date' %(self.path)
 		else:
-			full_cmd = "git commit"
-			
-			if amend:
-				full_cmd = full_cmd + " --amend --no-edit"
-			else:
-				full_cmd = full_cmd + (" -m \"%s\"" %(message))
-			
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
+			string = '%s: %s (%d attempts, %.3fs)' %(self.path, self.commit.decode() if self.commit != None else '', self.attempts, self.elapsed)
+
+		return string
+
+class GitSubmoduleUpdater:
+	def __init__(self, path, max_workers=8, retries=2, recursive=True, depth=None, backoff=1.0):
+		self.path = os.path.abspath(path)
+		self.max_workers = max_workers
+		self.retries = retries
+		self.recursive = recursive
+		self.depth = depth
+		self.backoff = backoff
+		self.stats = None
+
+	def _pending(self, parent, level):
+		result = []
+		submodules = GitSubmodule.parse(parent)
+
+		if len(submodules) > 0:
+			# init writes the parent's config, so it runs once per repository before its submodules start
+			cmd = instrumentation.execute(['git', 'submodule', 'init'], parent)
+
 			if cmd.returncode != 0:
-				logger.error("git commit returned %s, code=%d", cmd.output, cmd.returncode)
-			else:
-				result = cmd.returncode
-				
+				logger.error("git submodule init returned %s, code=%d", GitLogOutput(cmd.output), cmd.returncode)
+
+			statuses = GitSubmoduleStatus.parse(instrumentation.execute(['git', 'submodule', 'status'], parent)) or []
+			statuses = dict((item.path, item) for item in statuses)
+
+			for submodule in submodules:
+				item = GitSubmoduleResult(os.path.join(parent, submodule.path.decode()), parent, level)
+				status = statuses.get(submodule.path)
+
+				if status != None:
+					item.commit = status.current_commit_id_checked_out
+
+					if status.is_initialized and status.is_current_commit_checked_out and not status.has_merge_conflicts:
+						item.result = 0
+
+				result.append((submodule, item))
+
 		return result
 
-	def log(self, n=1, author=None, branch=None, path=None):
-		result = None
-		
-		if n <= 0:
-			logger.error("Cannot query log, n is less or equal zero")
+	def _update(self, submodule, item):
+		start = time.perf_counter()
+
+		if item.result == None:
+			full_cmd = ['git', 'submodule', 'update', '--init']
+
+			if self.depth != None:
+				full_cmd += ['--depth', str(self.depth)]
+			elif submodule.shallow:
+				full_cmd.append('--recommend-shallow')
+
+			full_cmd += ['--', submodule.path.decode()]
+
+			while item.attempts <= self.retries:
+				if item.attempts > 0:
+					time.sleep(self.backoff * 2 ** (item.attempts - 1))
+
+				item.attempts += 1
+				cmd = instrumentation.execute(full_cmd, item.parent)
+				item.result = cmd.returncode
+
+				if cmd.returncode == 0:
+					item.error = None
+					break
+
+				item.error = 'git submodule update returned %s, code=%d' %(cmd.output.strip().decode('utf-8', 'replace'), cmd.returncode)
+				logger.error("%s (attempt %d)", item.error, item.attempts)
+
+		item.elapsed = time.perf_counter() - start
+
+		return item
+
+	def run(self):
+		self.stats = GitFleetStats()
+		start = time.perf_counter()
+		executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+		pending = set(executor.submit(self._update, submodule, item) for submodule, item in self._pending(self.path, 0))
+
+		try:
+			while len(pending) > 0:
+				done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+				for future in done:
+					item = future.result()
+					self.stats.add(item)
+					self.stats.elapsed = time.perf_counter() - start
+
+					# children are only scheduled once their parent is checked out
+					if item.error == None and self.recursive:
+						for submodule, child in self._pending(item.path, item.depth + 1):
+							pending.add(executor.submit(self._update, submodule, child))
+
+					yield item
+		finally:
+			for future in pending:
+				future.cancel()
+
+			executor.shutdown(wait=True)
+
+def _fleet_call(path, operation, args, kwargs):
+	result = GitFleetResult(path)
+	start = time.perf_counter()
+
+	try:
+		if isinstance(operation, (list, tuple)):
+			result.result = instrumentation.execute(list(operation), path)
+
+			if result.result.returncode != 0:
+				result.error = 'git returned code %d' %(result.result.returncode)
 		else:
-			full_cmd = "git log -n %d" %(n)
-			
-			if author != None:
-				full_cmd = full_cmd + (" --author %s" %(author))
-			
-			if branch != None:
-				full_cmd = full_cmd + (" -b %s" %(branch))
-			
-			if path != None:
-				full_cmd = full_cmd + (" -- %s" %(path))
-			
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
-			if cmd.returncode != 0:
-				logger.error("git log returned %s, code=%d", cmd.output, cmd.returncode)
+			client = GitClient.open(path)
+
+			if client == None:
+				result.error = 'not a git repository'
+			elif callable(operation):
+				result.result = operation(client, *args, **kwargs)
 			else:
-				result = GitLog.parse(cmd)
-				
-		return result
+				result.result = getattr(client, operation)(*args, **kwargs)
+
+				if result.result == None:
+					result.error = 'git %s failed' %(operation)
+				elif operation in GitFleet.returncode_operations and type(result.result) == int and result.result != 0:
+					# these report git's exit code rather than None when they fail
+					result.error = 'git %s returned code %d' %(operation, result.result)
+	except Exception as e:
+		result.error = e
+
+	result.elapsed = time.perf_counter() - start
+
+	return result
+
+class GitFleet:
+	returncode_operations = ('fetch', 'pull', 'push', 'branch', 'reset', 'remote', 'update_ref')
+
+	def __init__(self, paths, max_workers=8, processes=False):
+		self.paths = [os.path.abspath(path) for path in paths]
+		self.max_workers = max_workers
+		self.processes = processes
+		self.stats = None
+
+	def run(self, operation, *args, **kwargs):
+		self.stats = GitFleetStats()
+
+		if self.processes:
+			executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+		else:
+			executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+
+		start = time.perf_counter()
+		futures = [executor.submit(_fleet_call, path, operation, args, kwargs) for path in self.paths]
+
+		try:
+			for future in concurrent.futures.as_completed(futures):
+				try:
+					item = future.result()
+				except Exception as e:
+					item = GitFleetResult(self.paths[futures.index(future)], error=e)
+
+				self.stats.add(item)
+				self.stats.elapsed = time.perf_counter() - start
+
+				yield item
+		finally:
+			for future in futures:
+				future.cancel()
+
+			executor.shutdown(wait=True)
+
+	def status(self):
+		return self.run('status')
 
 	def pull(self, repo='origin', refspec=None):
-		result = None
-	
-		full_cmd = "git pull %s" %(repo)
-		
-		if refspec != None:
-			full_cmd = full_cmd + (" %s" %(refspec))
-		
-		logger.info(full_cmd)
-		
-		cmd = command.execute(full_cmd)
-		
-		if cmd.returncode != 0:
-			logger.error("git pull returned %s, code=%d", cmd.output, cmd.returncode)
-		
-		result = cmd.returncode
-		
+		return self.run('pull', repo, refspec)
+
+	def log(self, n=1, author=None, branch=None, path=None):
+		return self.run('log', n, author, branch, path)
+
+	def execute(self, cmd):
+		return self.run(command.split(cmd))
+
+class GitMirrorCache:
+	used_stamp = 'gitclient-used'
+	fetched_stamp = 'gitclient-fetched'
+
+	def __init__(self, root, max_bytes=None, refresh_interval=0):
+		self.root = os.path.abspath(root)
+		self.max_bytes = max_bytes
+		self.refresh_interval = refresh_interval
+		self.lock = threading.Lock()
+		self.pending = {}
+		self.in_use = collections.Counter()
+		self.hits = 0
+		self.misses = 0
+		self.fetches = 0
+		self.coalesced = 0
+		self.evictions = 0
+		self.failures = 0
+		self.bytes_saved = 0
+
+		if not os.path.isdir(self.root):
+			os.makedirs(self.root)
+
+	def __str__(self):
+		return 'hits=%d misses=%d fetches=%d coalesced=%d evictions=%d failures=%d bytes_saved=%d' %(self.hits, self.misses, self.fetches, self.coalesced, self.evictions, self.failures, self.bytes_saved)
+
+	def mirror_path(self, url):
+		return os.path.join(self.root, '%s-%s.git' %(GitClient.clone_directory(url), hashlib.sha1(url.encode()).hexdigest()[:16]))
+
+	@staticmethod
+	def disk_usage(path):
+		result = 0
+
+		for directory, unused, files in os.walk(path):
+			for name in files:
+				try:
+					result += os.lstat(os.path.join(directory, name)).st_size
+				except OSError:
+					pass
+
 		return result
-		
-	def push(self, repo='origin', refspec=None, set_upstream=False, force=False, tags=False):
-		result = None
-		
-		full_cmd = "git push"
-		
-		if set_upstream:
-			full_cmd = full_cmd + " --set-upstream"
-			
-		if force:
-			full_cmd = full_cmd + " --force"
-			
-		if tags:
-			full_cmd = full_cmd + " --tags"
-		
-		full_cmd = full_cmd + (" %s" %(repo))
-		
-		if refspec != None:
-			full_cmd = full_cmd + (" %s" %(refspec))
-		
-		logger.info(full_cmd)
-		
-		cmd = command.execute(full_cmd)
-		
-		if cmd.returncode != 0:
-			logger.error("git push returned: %s", str(cmd))
-		
-		result = cmd.returncode
-		
+
+	@staticmethod
+	def touch(path, name):
+		with open(os.path.join(path, name), 'w'):
+			pass
+
+	@staticmethod
+	def stamp_time(path, name):
+		result = 0
+
+		try:
+			result = os.stat(os.path.join(path, name)).st_mtime
+		except OSError:
+			pass
+
 		return result
 
-	def branch(self, branch=None, set_upstream_to=None, set_upstream=False, unset_upstream=False, rename_to=None, delete=False):
+	def _refresh(self, url, path):
 		result = None
-		
-		full_cmd = "git branch"
-		
-		if set_upstream_to != None:
-			if set_upstream_to == b'':
-				full_cmd = None
-				logger.error("git branch failed: set_upstream_to is invalid")
-			else:
-				full_cmd = full_cmd + (" --set-upstream-to=%s" %(set_upstream_to))
-				if branch != None:
-					full_cmd = full_cmd + (" %s" %(branch))
-		elif unset_upstream:
-			full_cmd = full_cmd + " --unset-upstream"
-			if branch != None:
-				full_cmd = full_cmd + (" %s" %(branch))
-		elif rename_to != None:
-			if rename_to == b'':
-				full_cmd = None
-				logger.error("git branch failed: rename_to value is invalid")
-			else:
-				full_cmd = full_cmd + (" -m %s" %(rename_to))
-		elif delete:
-			if branch == None or branch == b'':
-				full_cmd = None
-				logger.error("git branch delete failed: branch value is invalid")
-			else:
-				full_cmd = full_cmd + (" -D" %(branch))
+
+		if os.path.isdir(path):
+			result = GitClient.open(path)
+
+			if result != None and time.time() - GitMirrorCache.stamp_time(path, GitMirrorCache.fetched_stamp) >= self.refresh_interval:
+				if result.fetch(prune=True) != 0:
+					result = None
+				else:
+					GitMirrorCache.touch(path, GitMirrorCache.fetched_stamp)
+
+				with self.lock:
+					self.fetches += 1
+
+			with self.lock:
+				self.hits += 1
 		else:
-			if branch == None:
-				full_cmd = None
-				logger.error("git branch failed: branch value is not provided")
-			elif branch == b'':
-				full_cmd = None
-				logger.error("git branch failed: branch value is invalid")
+			result = GitClient.clone(self.root, url, mirror=True, directory=os.path.basename(path))
+
+			if result != None:
+				GitMirrorCache.touch(path, GitMirrorCache.fetched_stamp)
+
+			with self.lock:
+				self.misses += 1
+
+		return result
+
+	def _acquire(self, url):
+		path = self.mirror_path(url)
+
+		# concurrent callers for the same upstream wait for a single clone or fetch
+		with self.lock:
+			# taken before the lock is released so that no concurrent evict() can remove the mirror under us
+			self.in_use[path] += 1
+			future = self.pending.get(path)
+			leader = future == None
+
+			if leader:
+				future = concurrent.futures.Future()
+				self.pending[path] = future
 			else:
-				full_cmd = full_cmd + (" %s" %(branch))
-		
-		if full_cmd != None:
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
-			if cmd.returncode != 0:
-				logger.error("git branch returned: %s", str(cmd))
-			
-			result = cmd.returncode
-		
+				self.coalesced += 1
+
+		try:
+			if leader:
+				try:
+					future.set_result(self._refresh(url, path))
+				except Exception as e:
+					future.set_exception(e)
+				finally:
+					with self.lock:
+						del self.pending[path]
+
+			result = future.result()
+		except Exception:
+			self._release(path)
+			raise
+
+		if result == None:
+			self._release(path)
+
+			with self.lock:
+				self.failures += 1
+		else:
+			GitMirrorCache.touch(path, GitMirrorCache.used_stamp)
+
+			if leader:
+				self.evict()
+
 		return result
 
-	def reset(self, commit=None, mode=GitResetMode.Mixed):
+	def _release(self, path):
+		with self.lock:
+			self.in_use[path] -= 1
+
+	def mirror(self, url):
+		result = self._acquire(url)
+
+		if result != None:
+			self._release(result.path)
+
+		return result
+
+	def clone(self, url, path='.', directory=None, hardlinks=False, dissociate=True, **kwargs):
 		result = None
-		
-		full_cmd = "git reset"
-		
-		if mode == GitResetMode.Mixed:
-			full_cmd = full_cmd + " --mixed"
-		elif mode == GitResetMode.Soft:
-			full_cmd = full_cmd + " --soft"
-		elif mode == GitResetMode.Hard:
-			full_cmd = full_cmd + " --hard"
-		elif mode == GitResetMode.Merged:
-			full_cmd = full_cmd + " --merged"
-		elif mode == GitResetMode.Keep:
-			full_cmd = full_cmd + " --keep"
+		mirror = self._acquire(url)
+
+		if mirror == None:
+			logger.error("cannot clone %s (no mirror)", url)
 		else:
-			full_cmd = None
-			logger.error("git reset failed: mode value is invalid")
+			try:
+				stats = kwargs.pop('stats', None) or GitTransferStats()
+				available = GitMirrorCache.disk_usage(os.path.join(mirror.path, 'objects'))
+				received = 0
+
+				if hardlinks:
+					# a local clone hardlinks the mirror's objects, the remote is pointed back at the upstream afterwards
+					result = GitClient.clone(path, mirror.path, directory=directory or GitClient.clone_directory(url), stats=stats, **kwargs)
+
+					if result != None and result._run('remote', ['git', 'remote', 'set-url', 'origin', url], returncode_on_failure=True, invalidate=True) != 0:
+						result = None
+				else:
+					# git does not always report the received bytes, so the clone borrows first and what it
+					# fetched on top of the mirror is measured before dissociating the way --dissociate does
+					result = GitClient.clone(path, url, directory=directory, reference=mirror.path, stats=stats, **kwargs)
+
+					if result != None:
+						objects = os.path.join(result.git_dir, 'objects')
+						received = GitMirrorCache.disk_usage(objects)
+
+						if stats.bytes == 0:
+							stats.bytes = received
+
+						if dissociate:
+							if result._run('repack', ['git', 'repack', '-a', '-d', '-q'], returncode_on_failure=True, invalidate=True) != 0:
+								result = None
+							elif os.path.exists(os.path.join(objects, 'info', 'alternates')):
+								os.remove(os.path.join(objects, 'info', 'alternates'))
+
+				if result != None:
+					with self.lock:
+						self.bytes_saved += max(0, available - received)
+			finally:
+				self._release(mirror.path)
 
-		if full_cmd != None:
-			if commit != None:
-				full_cmd = full_cmd + (" %s" %(commit))
-		
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
-			if cmd.returncode != 0:
-				logger.error("git reset returned: %s", str(cmd))
-			
-			result = cmd.returncode
-		
 		return result
 
-	def remote(self, name=None, url=None, branch=None, prune=False, add=False, remove=False):
+	def evict(self):
+		result = []
+
+		if self.max_bytes != None:
+			mirrors = []
+
+			for name in os.listdir(self.root):
+				path = os.path.join(self.root, name)
+
+				if name.endswith('.git') and os.path.isdir(path):
+					mirrors.append((GitMirrorCache.stamp_time(path, GitMirrorCache.used_stamp), path, GitMirrorCache.disk_usage(path)))
+
+			mirrors.sort()
+			total = sum(item[2] for item in mirrors)
+
+			for unused, path, size in mirrors:
+				if total <= self.max_bytes:
+					break
+
+				with self.lock:
+					busy = self.in_use[path] > 0 or path in self.pending
+
+					# renamed while locked, callers arriving later clone a fresh mirror instead of using a half deleted one
+					if not busy:
+						trash = '%s.evicted-%d' %(path, threading.get_ident())
+						os.rename(path, trash)
+						self.evictions += 1
+
+				if not busy:
+					logger.info("evicting mirror %s (%d bytes)", path, size)
+					shutil.rmtree(trash, ignore_errors=True)
+					total -= size
+					result.append(path)
+
+		return result
+
+class GitStatusWatcher:
+	in_modify = 0x2
+	in_attrib = 0x4
+	in_close_write = 0x8
+	in_moved_from = 0x40
+	in_moved_to = 0x80
+	in_create = 0x100
+	in_delete = 0x200
+	in_delete_self = 0x400
+	in_move_self = 0x800
+	in_q_overflow = 0x4000
+	in_ignored = 0x8000
+	in_onlydir = 0x1000000
+	in_dont_follow = 0x2000000
+	in_excl_unlink = 0x4000000
+	in_isdir = 0x40000000
+	in_nonblock = 0x800
+	in_cloexec = 0x80000
+
+	worktree_mask = in_modify | in_attrib | in_close_write | in_moved_from | in_moved_to | in_create | in_delete | in_delete_self | in_move_self | in_onlydir | in_dont_follow | in_excl_unlink
+	trigger_mask = in_close_write | in_moved_to | in_moved_from | in_create | in_delete | in_onlydir
+	git_dir_names = (b'HEAD', b'index', b'packed-refs', b'FETCH_HEAD', b'ORIG_HEAD', b'MERGE_HEAD')
+	event = struct.Struct('iIII')
+	chunk_size = 1000
+	libc = None
+
+	def __init__(self, client, delay=0.05):
+		self.client = client
+		self.delay = delay
+		self.running = False
+		self.fd = -1
+		self.wakeup = None
+		self.thread = None
+		self.lock = threading.Lock()
+		self.root = None
+		self.watches = {}
+		self.triggers = {}
+		self.ignored = set()
+		self.tracked = set()
+		self.entries = {}
+		self.header = GitStatus()
+		self.snapshot = None
+		self.subscribers = []
+		self.resyncs = 0
+		self.updates = 0
+
+	@staticmethod
+	def inotify():
+		if GitStatusWatcher.libc == None and ctypes != None and os.uname().sysname == 'Linux':
+			libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+			if hasattr(libc, 'inotify_init1'):
+				libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+				GitStatusWatcher.libc = libc
+
+		return GitStatusWatcher.libc
+
+	def subscribe(self, callback):
+		self.subscribers.append(callback)
+		return callback
+
+	def unsubscribe(self, callback):
+		self.subscribers.remove(callback)
+
+	def start(self):
 		result = None
-		needs_parsing = False
-		full_cmd = "git remote"
-		
-		if add:
-			if name == None or url == None:
-				logger.error("git remote failed: name and/or url value is invalid")
-				full_cmd = None
-			else:
-				if branch != None:
-					full_cmd += " -t %s" %(branch)
-					
-				full_cmd += " %s %s" %(name, url)
-		elif remove:
-			if name == None:
-				logger.error("git remote failed: name value is invalid")
-				full_cmd = None
-			else:
-				full_cmd += " remove %s" %(name)
+		libc = GitStatusWatcher.inotify()
+		worktree = self.client._worktree()
+
+		if libc == None:
+			logger.error("Cannot watch repository, inotify is not available")
+		elif worktree == None:
+			logger.error("Cannot watch repository, it has no work tree")
 		else:
-			full_cmd += " -v"
-			needs_parsing = True
+			self.root = os.fsencode(worktree)
+			self.fd = libc.inotify_init1(GitStatusWatcher.in_nonblock | GitStatusWatcher.in_cloexec)
 
-		if full_cmd != None:
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
-			if cmd.returncode != 0:
-				logger.error("git remote returned: %s", str(cmd))
-				result = cmd.returncode
-			elif needs_parsing:
-				result = GitRemote.parse(cmd)
+			if self.fd < 0:
+				logger.error("inotify_init1 failed: %s", os.strerror(ctypes.get_errno()))
+			elif self._watch_git_files() and self._resync():
+				self.wakeup = os.pipe()
+				self.running = True
+				self.thread = threading.Thread(target=self._loop, name='gitclient-watcher', daemon=True)
+				self.thread.start()
+				result = self
+				logger.info('Watching %s with %d watches', worktree, len(self.watches) + len(self.triggers))
 			else:
-				result = cmd.returncode
+				os.close(self.fd)
+				self.fd = -1
 
 		return result
 
-	def tag(self, tag=None, message=None, commit=None, annotate=False, add=False, delete=False):
+	def stop(self):
+		if self.running:
+			self.running = False
+			os.write(self.wakeup[1], b'x')
+			self.thread.join()
+			os.close(self.wakeup[0])
+			os.close(self.wakeup[1])
+			os.close(self.fd)
+			self.fd = -1
+
+	def _add_watch(self, path, mask):
 		result = None
-		parse_result = True
+		wd = GitStatusWatcher.libc.inotify_add_watch(self.fd, path, mask)
 
-		full_cmd = "git tag"
+		if wd < 0:
+			error = ctypes.get_errno()
 
-		if add == True:
-			if tag == None:
-				full_cmd = None
-				logger.error("git tag failed: tag value is invalid")
-			else:
-				if annotate == True:
-					full_cmd += " -a"
-				
-				full_cmd += (" %s" %(tag))
-				
-				if commit != None:
-					full_cmd += (" %s" %(commit))
-				
-				if message != None:
-					full_cmd += (" -m \"%s\"" %(message))
-					
-				parse_result = False
-		elif delete == True:
-			if tag == None:
-				full_cmd = None
-				logger.error("git tag failed: tag value is invalid")
-			else:
-				full_cmd += (" -d %s" %(tag))
-				parse_result = False
+			# directories can disappear between listing and watching
+			if error != errno.ENOENT:
+				logger.error("inotify_add_watch %s failed: %s", path, os.strerror(error))
 		else:
-			full_cmd += " --list"
-		
-		if full_cmd != None:
-			logger.info(full_cmd)
-			
-			cmd = command.execute(full_cmd)
-			
-			if cmd.returncode != 0:
-				logger.error("git tag returned: %s", str(cmd))
-			elif parse_result:
-				result = GitTag.parse(cmd)
-			else:
-				result = cmd.returncode
-		
+			result = wd
+
 		return result
-		
-	def merge(self):
-		result = None
+
+	def _add_trigger(self, path, names, recursive=False):
+		result = True
+		pending = [path]
+
+		while result and len(pending) > 0:
+			directory = pending.pop()
+
+			if os.path.isdir(directory):
+				wd = self._add_watch(directory, GitStatusWatcher.trigger_mask)
+				result = wd != None
+
+				if result:
+					self.triggers[wd] = (directory, names, recursive)
+
+				try:
+					if recursive:
+						pending += [item.path for item in os.scandir(directory) if item.is_dir(follow_symlinks=False)]
+				except OSError:
+					pass
+
 		return result
 
-	def mv(self):
+	def _watch_git_files(self):
+		# changes here are not tied to work tree paths, any of them can change the whole status
+		git_dir = os.fsencode(os.path.abspath(self.client.git_dir))
+		common_dir = git_dir
+
+		try:
+			with open(os.path.join(git_dir, b'commondir'), 'rb') as f:
+				common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+		except OSError:
+			pass
+
+		cmd = self.client._execute(['git', 'config', '--path', 'core.excludesFile'], trace=False)
+
+		if cmd.returncode == 0:
+			excludes = os.fsencode(os.path.expanduser(cmd.output.strip().decode()))
+		else:
+			excludes = os.path.join(os.fsencode(os.environ.get('XDG_CONFIG_HOME', os.path.expanduser('~/.config'))), b'git', b'ignore')
+
+		# a second watch on the same directory would replace the first one
+		return (self._add_trigger(git_dir, GitStatusWatcher.git_dir_names)
+			and (common_dir == git_dir or self._add_trigger(common_dir, (b'packed-refs',)))
+			and self._add_trigger(os.path.join(common_dir, b'info'), (b'exclude',))
+			and self._add_trigger(os.path.join(common_dir, b'refs'), None, recursive=True)
+			and self._add_trigger(os.path.dirname(excludes), (os.path.basename(excludes),)))
+
+	def _lines(self, full_cmd, input=None):
 		result = None
+		cmd = self.client._execute(full_cmd, input=input, trace=False)
+
+		if cmd.returncode == 0:
+			result = [line for line in cmd.output.split(b'\x00') if line != b'']
+
 		return result
 
-	def init(self):
-		result = None
+	def _watch_tree(self, relative):
+		result = True
+		pending = [relative]
+
+		while result and len(pending) > 0:
+			directory = pending.pop()
+			path = os.path.join(self.root, directory) if directory != b'' else self.root
+			wd = self._add_watch(path, GitStatusWatcher.worktree_mask)
+			result = wd != None or not os.path.isdir(path)
+
+			if wd != None:
+				self.watches[wd] = directory
+
+			try:
+				items = list(os.scandir(path))
+			except OSError:
+				items = []
+
+			for item in items:
+				if item.is_dir(follow_symlinks=False):
+					child = directory + b'/' + item.name if directory != b'' else item.name
+
+					if child != b'.git' and child not in self.ignored:
+						pending.append(child)
+
 		return result
-		
-	def setCredentials(self):
+
+	def _watch_new(self, directories):
+		found = []
+		pending = list(directories)
+
+		while len(pending) > 0:
+			directory = pending.pop()
+			found.append(directory)
+
+			try:
+				pending += [directory + b'/' + item.name for item in os.scandir(os.path.join(self.root, directory)) if item.is_dir(follow_symlinks=False)]
+			except OSError:
+				pass
+
+		# one check-ignore for the whole batch of new directories instead of one per directory
+		ignored = self._lines(['git', '-C', os.fsdecode(self.root), 'check-ignore', '--no-index', '-z', '--stdin'], b'\x00'.join(found)) or []
+		self.ignored.update(ignored)
+		ignored = tuple(path + b'/' for path in ignored)
+
+		for directory in found:
+			if directory not in self.ignored and not directory.startswith(ignored):
+				wd = self._add_watch(os.path.join(self.root, directory), GitStatusWatcher.worktree_mask)
+
+				if wd != None:
+					self.watches[wd] = directory
+
+	def _query(self, full_cmd):
 		result = None
+		cmd = self.client._execute(full_cmd, trace=False)
+
+		if cmd.returncode != 0:
+			logger.error("git status returned %s, code=%d", GitLogOutput(cmd.output), cmd.returncode)
+		else:
+			result = GitStatus.parse_porcelain_v2(cmd)
+
 		return result
-		
+
+	def _store(self, status):
+		for category, items in enumerate((status.staged, status.not_staged, status.untracked, status.unmerged)):
+			for item in items:
+				self.entries.setdefault(item.file, []).append((category, item))
+
+	def _resync(self):
+		result = False
+		root = os.fsdecode(self.root)
+		ignored = self._lines(['git', '-C', root, 'ls-files', '-z', '--others', '--ignored', '--exclude-standard', '--directory'])
+		tracked = self._lines(['git', '-C', root, 'ls-files', '-z'])
+
+		if ignored != None and tracked != None:
+			self.ignored = set(path.rstrip(b'/') for path in ignored if path.endswith(b'/'))
+			directories = set()
+
+			for path in tracked:
+				slash = path.rfind(b'/')
+
+				while slash != -1 and path[:slash] not in directories:
+					path = path[:slash]
+					directories.add(path)
+					slash = path.rfind(b'/')
+
+			self.tracked = directories
+
+			# optional locks would make our own status calls rewrite the index and wake the watcher
+			status = None
+
+			if self._watch_tree(b''):
+				status = self._query(['git', '--no-optional-locks', 'status', '--porcelain=v2', '-z', '--branch'])
+
+			if status != None:
+				with self.lock:
+					self.entries = {}
+					self.header = status
+					self._store(status)
+					self.snapshot = None
+					self.resyncs += 1
+
+				result = True
+
+		return result
+
+	def _target(self, path):
+		result = (path, False)
+		slash = path.find(b'/')
+
+		# git shows an untracked directory as a single entry, a change below it is rechecked through its top
+		while slash != -1:
+			if path[:slash] not in self.tracked:
+				result = (path[:slash], True)
+				break
+
+			slash = path.find(b'/', slash + 1)
+
+		return result
+
+	def _recheck(self, paths, directories):
+		result = True
+		targets = set()
+		prefixes = set(path + b'/' for path in directories)
+		statuses = []
+
+		for path in paths:
+			target, directory = self._target(path)
+			targets.add(target)
+
+			if directory:
+				prefixes.add(target + b'/')
+
+		targets = sorted(targets)
+		prefixes = tuple(prefixes)
+
+		for start in range(0, len(targets), GitStatusWatcher.chunk_size):
+			full_cmd = ['git', '--no-optional-locks', 'status', '--porcelain=v2', '-z', '--']
+			full_cmd += [':(top,literal)' + os.fsdecode(path) for path in targets[start:start + GitStatusWatcher.chunk_size]]
+			status = self._query(full_cmd)
+
+			if status == None:
+				result = False
+				break
+
+			statuses.append(status)
+
+		if result:
+			with self.lock:
+				for path in targets:
+					self.entries.pop(path, None)
+
+				if prefixes:
+					for path in [path for path in self.entries if path.startswith(prefixes)]:
+						del self.entries[path]
+
+				for status in statuses:
+					self._store(status)
+
+				self.snapshot = None
+				self.updates += 1
+
+		return result
+
+	def status(self):
+		with self.lock:
+			if self.snapshot == None:
+				result = GitStatus()
+				result.branch = self.header.branch
+				result.commit = self.header.commit
+				result.upstream = self.header.upstream
+				result.ahead = self.header.ahead
+				result.behind = self.header.behind
+				result.staged = []
+				result.not_staged = []
+				result.untracked = []
+				result.unmerged = []
+				sections = (result.staged, result.not_staged, result.untracked, result.unmerged)
+
+				for path in sorted(self.entries):
+					for category, item in self.entries[path]:
+						sections[category].append(item)
+
+				self.snapshot = result
+
+			result = self.snapshot
+
+		return result
+
+	def _events(self, data):
+		dirty = set()
+		directories = set()
+		created = []
+		resync = False
+		position = 0
+
+		while position < len(data):
+			wd, mask, cookie, length = GitStatusWatcher.event.unpack_from(data, position)
+			name = data[position + 16:position + 16 + length].rstrip(b'\x00')
+			position += 16 + length
+			directory = self.watches.get(wd)
+			trigger = self.triggers.get(wd)
+
+			if mask & GitStatusWatcher.in_q_overflow:
+				resync = True
+			elif mask & GitStatusWatcher.in_ignored:
+				self.watches.pop(wd, None)
+				self.triggers.pop(wd, None)
+			elif trigger != None:
+				path, names, recursive = trigger
+
+				if recursive and mask & GitStatusWatcher.in_isdir and mask & (GitStatusWatcher.in_create | GitStatusWatcher.in_moved_to):
+					self._add_trigger(os.path.join(path, name), names, recursive)
+
+				if (names == None and not name.endswith(b'.lock')) or name in (names or ()):
+					resync = True
+			elif directory != None:
+				path = directory + b'/' + name if directory != b'' and name != b'' else directory or name
+
+				if name == b'.gitignore':
+					# what is ignored may change anywhere below, including directories that were never watched
+					resync = True
+				elif mask & GitStatusWatcher.in_isdir and mask & GitStatusWatcher.in_moved_from:
+					# watches below a moved directory still report their old paths
+					resync = True
+				elif mask & GitStatusWatcher.in_isdir:
+					if mask & (GitStatusWatcher.in_create | GitStatusWatcher.in_moved_to):
+						created.append(path)
+
+					dirty.add(path)
+					directories.add(path)
+				elif mask & (GitStatusWatcher.in_delete_self | GitStatusWatcher.in_move_self):
+					if directory == b'':
+						resync = True
+					else:
+						dirty.add(directory)
+						directories.add(directory)
+				elif path != b'':
+					dirty.add(path)
+
+		if created and not resync:
+			self._watch_new(created)
+
+		return (dirty, directories, resync)
+
+	def _loop(self):
+		while self.running:
+			select.select([self.fd, self.wakeup[0]], [], [])
+
+			if not self.running:
+				break
+
+			# let a burst of writes settle into a single recheck
+			time.sleep(self.delay)
+			data = b''
+
+			while True:
+				try:
+					chunk = os.read(self.fd, 65536)
+				except BlockingIOError:
+					break
+
+				data += chunk
+
+			dirty, directories, resync = self._events(data)
+
+			if resync:
+				dirty = None
+				ok = self._resync()
+			elif dirty:
+				ok = self._recheck(dirty, directories)
+			else:
+				ok = False
+
+			if ok:
+				status = self.status()
+
+				for subscriber in list(self.subscribers):
+					try:
+						subscriber(status, dirty)
+					except Exception:
+						logger.exception("Status watcher subscriber failed")
@@ -0,0 +1,35 @@
+import os
+import sys
+import logging
+import subprocess
+
+import pytest
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'benchmarks'))
+
+import gitclient
+import synthetic
+
+gitclient.logger.setLevel(logging.CRITICAL)
+
+def git(path, *args, **kwargs):
+	return subprocess.check_output(['git'] + list(args), cwd=path, **kwargs)
+
+@pytest.fixture(autouse=True)
+def environment(monkeypatch, tmp_path):
+	# tests never depend on the identity or config of the machine running them
+	monkeypatch.setenv('HOME', str(tmp_path / 'home'))
+	monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / 'home' / '.config'))
+	monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+	monkeypatch.setenv('GIT_AUTHOR_NAME', 'Alice Example')
+	monkeypatch.setenv('GIT_AUTHOR_EMAIL', 'alice@example.com')
+	monkeypatch.setenv('GIT_COMMITTER_NAME', 'Alice Example')
+	monkeypatch.setenv('GIT_COMMITTER_EMAIL', 'alice@example.com')
+	monkeypatch.setenv('GIT_ALLOW_PROTOCOL', 'file')
+	os.makedirs(str(tmp_path / 'home'))
+
+@pytest.fixture
+def repository(tmp_path):
+	return synthetic.create_repository(str(tmp_path / 'repo'), commits=60, files=12, merge_every=7, tags=5)
@@ -0,0 +1,62 @@
+import os
+
+import gitclient
+from conftest import git
+
+def write(path, name, content='content\n'):
+	target = os.path.join(path, name)
+
+	if not os.path.isdir(os.path.dirname(target)):
+		os.makedirs(os.path.dirname(target))
+
+	with open(target, 'w') as f:
+		f.write(content)
+
+def results(items):
+	return dict((item.path, item.returncode) for item in items)
+
+def test_add_reports_each_path(repository, monkeypatch):
+	# a translated git must not turn every path of the chunk into a failure
+	monkeypatch.setenv('LANG', 'de_DE.UTF-8')
+	monkeypatch.setenv('LANGUAGE', 'de')
+	write(repository, '.gitignore', '*.log\n')
+	write(repository, 'dir0/new.txt')
+	write(repository, 'dir1/file1.txt', 'changed\n')
+	write(repository, 'ignored.log')
+	client = gitclient.GitClient.open(repository)
+
+	outcome = results(client.add(['dir0/new.txt', 'missing.txt', 'ignored.log', 'dir1/file1.txt']))
+
+	assert outcome == {'dir0/new.txt': 0, 'missing.txt': 128, 'ignored.log': 1, 'dir1/file1.txt': 0}
+	assert git(repository, 'diff', '--cached', '--name-only').split() == [b'dir0/new.txt', b'dir1/file1.txt']
+
+def test_add_updates_tracked_files_that_are_ignored(repository):
+	write(repository, '.gitignore', 'dir0/\n')
+	write(repository, 'dir0/file0.txt', 'changed\n')
+	write(repository, 'dir0/new.txt')
+	client = gitclient.GitClient.open(os.path.join(repository, 'dir0'))
+
+	outcome = results(client.add(['file0.txt', 'new.txt']))
+
+	assert outcome == {'file0.txt': 0, 'new.txt': 1}
+	assert git(repository, 'diff', '--cached', '--name-only').split() == [b'dir0/file0.txt']
+
+def test_add_respects_sparse_checkout(repository):
+	git(repository, 'sparse-checkout', 'set', 'dir0')
+	write(repository, 'dir0/new.txt')
+	write(repository, 'dir1/outside.txt')
+	client = gitclient.GitClient.open(repository)
+
+	outcome = results(client.add(['dir0/new.txt', 'dir1/outside.txt']))
+
+	assert outcome['dir0/new.txt'] == 0
+	assert outcome['dir1/outside.txt'] != 0
+	assert git(repository, 'diff', '--cached', '--name-only').split() == [b'dir0/new.txt']
+
+def test_rm_reports_each_path(repository):
+	client = gitclient.GitClient.open(repository)
+
+	outcome = results(client.rm(['dir0/file0.txt', 'missing.txt']))
+
+	assert outcome == {'dir0/file0.txt': 0, 'missing.txt': 128}
+	assert not os.path.exists(os.path.join(repository, 'dir0', 'file0.txt'))
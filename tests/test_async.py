@@ -0,0 +1,85 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+import gitclient
+
+@pytest.fixture
+def off_loop(monkeypatch):
+	# every synchronous git call must happen away from the thread running the event loop
+	execute = gitclient.command.execute
+	stream = gitclient.command.stream
+	calls = []
+
+	def check():
+		calls.append(threading.current_thread())
+		assert threading.current_thread() is not threading.main_thread()
+
+	def checked_execute(*args, **kwargs):
+		check()
+		return execute(*args, **kwargs)
+
+	def checked_stream(*args, **kwargs):
+		check()
+		yield from stream(*args, **kwargs)
+
+	monkeypatch.setattr(gitclient.command, 'execute', staticmethod(checked_execute))
+	monkeypatch.setattr(gitclient.command, 'stream', staticmethod(checked_stream))
+
+	return calls
+
+def run(coroutine):
+	loop = asyncio.new_event_loop()
+
+	try:
+		return loop.run_until_complete(coroutine)
+	finally:
+		loop.close()
+
+async def collect(stream):
+	result = []
+
+	async for item in stream:
+		result.append(item)
+
+	return result
+
+def test_blocking_helpers_run_off_the_loop(repository, off_loop):
+	with open(os.path.join(repository, 'dir0', 'file0.txt'), 'a') as f:
+		f.write('changed\n')
+
+	async def scenario():
+		client = await gitclient.AsyncGitClient.open(repository)
+
+		assert await client.worktree() == repository
+		assert await client.is_dirty() == True
+		assert await client.changed_files() == ['dir0/file0.txt']
+		assert [item.returncode for item in await client.add(['dir0/file0.txt'])] == [0]
+
+		assert len(await collect(await client.log(n=5, stream=True))) == 5
+		assert len(await collect(await client.tags(stream=True))) == 5
+		assert len(await collect(await client.diff('HEAD~1', 'HEAD', stream=True))) > 0
+		assert len(await collect(await client.changed_paths('HEAD~3', 'HEAD'))) > 0
+
+		if gitclient.GitStatusWatcher.inotify() != None:
+			assert await client.watch() != None
+			assert [str(item) for item in (await client.status()).staged] == ['dir0/file0.txt (modified)']
+			await client.unwatch()
+
+	run(scenario())
+
+	assert len(off_loop) > 0
+
+def test_stream_close_stops_git(repository):
+	async def scenario():
+		client = await gitclient.AsyncGitClient.open(repository)
+		stream = await client.log(n=None, stream=True)
+
+		first = await stream.__anext__()
+		await stream.aclose()
+
+		return first
+
+	assert run(scenario()).commit != None
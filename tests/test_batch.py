@@ -0,0 +1,53 @@
+import os
+
+import gitclient
+from conftest import git
+
+def test_pathspecs_are_always_a_list(monkeypatch):
+	monkeypatch.setattr(os, 'name', 'nt')
+
+	assert gitclient.GitBatch.pathspecs(('add', ('a.txt "b c.txt"',), {})) == ['a.txt', 'b c.txt']
+	assert gitclient.GitBatch.pathspecs(('add', ('-A',), {})) == None
+	assert gitclient.GitBatch.pathspecs(('status', (), {})) == None
+
+def test_batched_adds_and_reads(repository):
+	client = gitclient.GitClient.open(repository)
+
+	for name in ('dir0/file0.txt', 'dir1/file1.txt'):
+		with open(os.path.join(repository, name), 'a') as f:
+			f.write('changed\n')
+
+	with client.batch() as batch:
+		batch.add('dir0/file0.txt')
+		batch.add('dir1/file1.txt missing.txt')
+		batch.status()
+		batch.update_ref('refs/heads/batched', git(repository, 'rev-parse', 'HEAD').strip().decode())
+
+	assert batch.results[0] == 0
+	assert batch.results[1] == None
+	assert [str(item) for item in batch.results[2].staged] == ['dir0/file0.txt (modified)', 'dir1/file1.txt (modified)']
+	assert git(repository, 'rev-parse', 'batched') == git(repository, 'rev-parse', 'HEAD')
+
+def test_batched_results_match_direct_calls(repository):
+	client = gitclient.GitClient.open(repository)
+
+	for name in ('dir0/file0.txt', 'dir1/file1.txt'):
+		with open(os.path.join(repository, name), 'a') as f:
+			f.write('changed\n')
+
+	direct = [client.add('dir0/file0.txt'), client.add('missing.txt'), client.rm('dir2/file2.txt'), client.rm('missing.txt')]
+	git(repository, 'reset', '-q', '--hard')
+
+	for name in ('dir0/file0.txt', 'dir1/file1.txt'):
+		with open(os.path.join(repository, name), 'a') as f:
+			f.write('changed\n')
+
+	with client.batch() as batch:
+		batch.add('dir0/file0.txt')
+		batch.add('missing.txt')
+		batch.add('dir1/file1.txt')
+		batch.rm('dir2/file2.txt')
+		batch.rm('missing.txt')
+
+	assert direct == [0, None, 0, None]
+	assert batch.results == [0, None, 0, 0, None]
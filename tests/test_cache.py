@@ -0,0 +1,75 @@
+import os
+
+import gitclient
+from conftest import git
+
+def append(path, name):
+	with open(os.path.join(path, name), 'a') as f:
+		f.write('changed\n')
+
+def test_cached_reads_hit_until_the_repository_changes(repository):
+	cache = gitclient.GitRepositoryCache()
+	client = gitclient.GitClient.open(repository, cache=cache)
+
+	first = client.tags()
+	assert client.tags() is first
+	assert cache.hits == 1
+
+	git(repository, 'tag', 'added')
+
+	assert len(client.tags()) == len(first) + 1
+	assert cache.misses == 2
+
+def test_status_follows_work_tree_edits(repository):
+	cache = gitclient.GitRepositoryCache()
+	client = gitclient.GitClient.open(repository, cache=cache)
+
+	assert client.status().not_staged == []
+
+	append(repository, 'dir0/file0.txt')
+	append(repository, 'new.txt')
+	status = client.status()
+
+	assert [item.file for item in status.not_staged] == [b'dir0/file0.txt']
+	assert [item.file for item in status.untracked] == [b'new.txt']
+	assert cache.hits == 0
+
+def test_status_is_cached_with_a_ttl(repository):
+	cache = gitclient.GitRepositoryCache(ttl=60)
+	client = gitclient.GitClient.open(repository, cache=cache)
+
+	# files as new as the index are racily clean, git status would rewrite the index every time
+	for directory, names, files in os.walk(repository):
+		if '.git' in names:
+			names.remove('.git')
+
+		for name in files:
+			os.utime(os.path.join(directory, name), (1, 1))
+
+	git(repository, 'update-index', '-q', '--refresh')
+	first = client.status()
+
+	assert client.status() is first
+	assert cache.hits == 1
+
+	client.add('dir0/file0.txt')
+
+	assert client.status() is not first
+
+def test_least_recently_used_entries_are_evicted(repository):
+	cache = gitclient.GitRepositoryCache(max_entries=2)
+	client = gitclient.GitClient.open(repository, cache=cache)
+
+	client.diff('HEAD~1', 'HEAD')
+	client.diff('HEAD~2', 'HEAD')
+	client.diff('HEAD~1', 'HEAD')
+	client.diff('HEAD~3', 'HEAD')
+
+	assert cache.evictions == 1
+	assert len(cache.entries) == 2
+
+	client.diff('HEAD~1', 'HEAD')
+	assert cache.hits == 2
+
+	client.diff('HEAD~2', 'HEAD')
+	assert cache.hits == 2
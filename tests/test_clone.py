@@ -0,0 +1,62 @@
+import os
+import subprocess
+
+import pytest
+
+import gitclient
+from conftest import git
+
+@pytest.fixture
+def url(tmp_path, repository):
+	bare = str(tmp_path / 'upstream.git')
+	git(repository, 'branch', 'other', 'HEAD~3')
+	git(str(tmp_path), 'clone', '-q', '--bare', repository, bare)
+	git(bare, 'config', 'uploadpack.allowFilter', 'true')
+	return 'file://' + bare
+
+def clone(tmp_path, url, **kwargs):
+	client = gitclient.GitClient.clone(str(tmp_path), url, directory='clone', **kwargs)
+
+	assert client != None
+	return client.path
+
+def alternates(path):
+	return os.path.join(path, '.git', 'objects', 'info', 'alternates')
+
+def test_shallow_clone(tmp_path, url):
+	path = clone(tmp_path, url, depth=1)
+
+	assert os.path.exists(os.path.join(path, '.git', 'shallow'))
+	assert git(path, 'rev-list', '--count', 'HEAD').strip() == b'1'
+
+def test_partial_clone(tmp_path, url):
+	path = clone(tmp_path, url, filter='blob:none')
+	missing = [line for line in git(path, 'rev-list', '--objects', '--missing=print', '--all').split(b'\n') if line.startswith(b'?')]
+
+	assert git(path, 'config', 'remote.origin.promisor').strip() == b'true'
+	assert len(missing) > 0
+
+def test_sparse_clone(tmp_path, url):
+	path = clone(tmp_path, url, sparse=['dir0', 'dir3'])
+
+	assert git(path, 'sparse-checkout', 'list').split() == [b'dir0', b'dir3']
+	assert sorted(name for name in os.listdir(path) if name != '.git') == ['dir0', 'dir3']
+
+def test_single_branch_clone(tmp_path, url):
+	path = clone(tmp_path, url, single_branch=True, branch='other')
+
+	assert git(path, 'branch', '-r', '--format=%(refname)').split() == [b'refs/remotes/origin/other']
+	assert git(path, 'rev-parse', 'HEAD') == git(path, 'rev-parse', 'origin/other')
+
+def test_reference_clone(tmp_path, url, repository):
+	path = clone(tmp_path, url, reference=repository)
+
+	with open(alternates(path)) as f:
+		assert f.read().strip() == os.path.join(repository, '.git', 'objects')
+
+def test_dissociated_clone(tmp_path, url, repository):
+	path = clone(tmp_path, url, reference=repository, dissociate=True)
+
+	assert not os.path.exists(alternates(path))
+	git(path, 'fsck', '--connectivity-only', stderr=subprocess.DEVNULL)
+	assert git(path, 'rev-parse', 'HEAD') == git(repository, 'rev-parse', 'master')
@@ -0,0 +1,54 @@
+import subprocess
+import threading
+
+import pytest
+
+import gitclient
+from conftest import git
+
+def test_diff_matches_numstat(repository):
+	client = gitclient.GitClient.open(repository)
+	expected = git(repository, 'diff-tree', '-r', '--numstat', '--no-renames', 'HEAD~5', 'HEAD').decode().splitlines()
+	entries = client.diff('HEAD~5', 'HEAD')
+
+	assert ['%d\t%d\t%s' %(entry.added, entry.deleted, entry.path.decode()) for entry in entries] == expected
+	assert [entry.path for entry in client.diff('HEAD~5', 'HEAD', stream=True)] == [entry.path for entry in entries]
+
+def test_changed_paths_owners(repository):
+	client = gitclient.GitClient.open(repository)
+	owners = gitclient.GitPathTrie(['dir%d' %(number) for number in range(16)])
+	paths = list(client.changed_paths('HEAD~5', 'HEAD'))
+
+	assert len(paths) > 0
+	assert sum(client.changed_paths('HEAD~5', 'HEAD', owners=owners).values()) == len(paths)
+
+def test_bad_revision_is_not_an_empty_diff(repository):
+	client = gitclient.GitClient.open(repository)
+	owners = gitclient.GitPathTrie(['dir0'])
+
+	assert client.diff('deadbeef', 'HEAD') == None
+	assert client.changed_paths('deadbeef', 'HEAD', owners=owners) == None
+
+	with pytest.raises(subprocess.CalledProcessError):
+		list(client.changed_paths('deadbeef', 'HEAD'))
+
+	with pytest.raises(subprocess.CalledProcessError):
+		list(client.diff('deadbeef', 'HEAD', stream=True))
+
+def test_stream_survives_a_noisy_stderr():
+	# more than a pipe buffer on stderr before any stdout
+	full_cmd = ['sh', '-c', 'head -c 300000 /dev/zero | tr "\\0" x >&2; printf "a\\0b"; exit 3']
+	result = []
+
+	def consume():
+		try:
+			result.extend(gitclient.command.stream(full_cmd, 'noisy'))
+		except subprocess.CalledProcessError as e:
+			result.append(len(e.stderr))
+
+	thread = threading.Thread(target=consume, daemon=True)
+	thread.start()
+	thread.join(10)
+
+	assert not thread.is_alive()
+	assert result == [b'a', b'b', 300000]
@@ -0,0 +1,39 @@
+import os
+
+import gitclient
+from conftest import git
+
+def append(path, name, content='changed\n'):
+	with open(os.path.join(path, name), 'a') as f:
+		f.write(content)
+
+def cli_changed(path):
+	return sorted(git(path, 'diff-files', '--name-only', '-z').decode().split('\0')[:-1])
+
+def test_changed_files_match_git(repository):
+	client = gitclient.GitClient.open(repository)
+
+	assert client.is_dirty() == False
+	assert client.changed_files() == []
+
+	append(repository, 'dir1/file1.txt')
+	os.remove(os.path.join(repository, 'dir2/file2.txt'))
+	os.chmod(os.path.join(repository, 'dir3/file3.txt'), 0o755)
+
+	assert client.changed_files() == cli_changed(repository) == ['dir1/file1.txt', 'dir2/file2.txt', 'dir3/file3.txt']
+	assert client.is_dirty() == True
+
+def test_staged_changes(repository):
+	client = gitclient.GitClient.open(repository)
+	append(repository, 'dir1/file1.txt')
+	git(repository, 'add', 'dir1/file1.txt')
+
+	assert client.changed_files() == []
+	assert client.is_dirty() == True
+
+def test_untracked(repository):
+	client = gitclient.GitClient.open(repository)
+	append(repository, 'untracked.txt')
+
+	assert client.is_dirty() == False
+	assert client.is_dirty(untracked=True) == True
@@ -0,0 +1,33 @@
+import os
+
+import gitclient
+from conftest import git
+
+def test_failed_operations_are_errors(repository, tmp_path):
+	clone = str(tmp_path / 'clone')
+	git(str(tmp_path), 'clone', '-q', 'file://%s' %(repository), clone)
+	missing = str(tmp_path / 'missing')
+	os.makedirs(missing)
+
+	fleet = gitclient.GitFleet([clone, repository, missing], max_workers=2)
+	results = dict((item.path, item) for item in fleet.pull())
+
+	assert results[clone].result == 0 and results[clone].error == None
+	assert results[repository].result != 0 and results[repository].error != None
+	assert results[missing].error == 'not a git repository'
+	assert fleet.stats.count == 3
+	assert fleet.stats.errors == 2
+
+def test_failed_commands_are_errors(repository, tmp_path):
+	fleet = gitclient.GitFleet([repository])
+
+	assert [item.error for item in fleet.execute('git rev-parse HEAD')] == [None]
+	assert [item.error for item in fleet.execute('git rev-parse missing')] == ['git returned code 128']
+	assert fleet.stats.errors == 1
+
+def test_counts_are_not_errors(repository):
+	fleet = gitclient.GitFleet([repository])
+	results = list(fleet.run('count_between', 'HEAD~3', 'HEAD'))
+
+	assert results[0].result == 3
+	assert results[0].error == None
@@ -0,0 +1,119 @@
+import os
+import subprocess
+
+import pytest
+
+import gitclient
+import synthetic
+from conftest import git
+
+def cli_log(path, *args):
+	output = git(path, 'log', '--format=%H', *args).decode()
+	return output.split()
+
+def native_log(client, **kwargs):
+	return [item.commit.decode() for item in client.log(native=True, **kwargs)]
+
+def test_native_log_matches_git(repository):
+	client = gitclient.GitClient.open(repository)
+
+	assert native_log(client, n=None) == cli_log(repository)
+	assert native_log(client, n=10, branch='HEAD~3') == cli_log(repository, '-n', '10', 'HEAD~3')
+
+def test_native_log_from_annotated_tag(repository):
+	client = gitclient.GitClient.open(repository)
+	git(repository, 'tag', '-a', '-m', 'nested', 'nested', 'v0.2')
+
+	for tag in ('v0.2', 'nested'):
+		assert native_log(client, n=5, branch=tag) == cli_log(repository, '-n', '5', tag)
+
+	assert client.is_ancestor('v0.1', 'nested') == True
+	assert client.merge_base('nested', 'HEAD') == git(repository, 'rev-parse', 'v0.2^{commit}').strip()
+
+def test_sha256_falls_back_to_git(tmp_path):
+	path = synthetic.create_repository(str(tmp_path / 'sha256'), commits=20, files=4, tags=2, object_format='sha256')
+	client = gitclient.GitClient.open(path)
+
+	assert client.history() == None
+	assert [item.commit.decode() for item in client.log(n=5, native=True)] == cli_log(path, '-n', '5')
+
+def cli_objects(path):
+	result = {}
+	output = git(path, 'cat-file', '--batch-all-objects', '--batch')
+	position = 0
+
+	while position < len(output):
+		end = output.index(b'\n', position)
+		oid, type, size = output[position:end].split(b' ')
+		position = end + 1 + int(size)
+		result[oid] = (type, output[end + 1:position])
+		position += 1
+
+	return result
+
+@pytest.mark.parametrize('loose', [False, True])
+def test_native_objects_match_git(tmp_path, loose):
+	path = synthetic.create_repository(str(tmp_path / 'repo'), commits=60, files=12, merge_every=7, tags=5, loose=loose)
+	objects = gitclient.GitObjectDatabase.open(os.path.join(path, '.git'))
+	expected = cli_objects(path)
+
+	assert len(expected) > 0
+
+	for oid, item in expected.items():
+		assert objects.read(oid) == item
+		assert objects.contains(oid)
+
+def test_native_log_over_packs_and_loose_objects(repository):
+	client = gitclient.GitClient.open(repository)
+
+	for number in range(3):
+		with open(os.path.join(repository, 'loose%d.txt' %(number)), 'w') as f:
+			f.write('loose\n')
+
+		git(repository, 'add', '.')
+		git(repository, 'commit', '-q', '-m', 'loose %d' %(number))
+
+	assert native_log(client, n=None) == cli_log(repository)
+	assert [item.commit for item in client.log(n=None, native=True)] == [item.commit for item in client.log(n=None, stream=True)]
+
+def commit_graph(path, mode):
+	if mode == 'single':
+		git(path, 'commit-graph', 'write', '--reachable')
+	elif mode == 'split':
+		git(path, 'commit-graph', 'write', '--reachable', '--split')
+
+		for number in range(3):
+			git(path, 'commit', '-q', '--allow-empty', '-m', 'layer %d' %(number))
+			git(path, 'commit-graph', 'write', '--reachable', '--split=no-merge')
+
+@pytest.mark.parametrize('mode', ['single', 'split'])
+def test_native_ancestry_matches_git(repository, mode):
+	commit_graph(repository, mode)
+	git(repository, 'tag', '-a', '-m', 'nested', 'nested', 'v0.2')
+	client = gitclient.GitClient.open(repository)
+	# revision expressions are left to git, full object names and refs are answered natively
+	names = ['HEAD', 'master', 'v0.0', 'v0.2', 'v0.4', 'nested']
+	merges = git(repository, 'rev-list', '--merges', '-n', '2', 'HEAD').decode().split()
+	names += git(repository, 'rev-parse', 'HEAD~1', 'HEAD~4', 'HEAD~20', *['%s^2' %(merge) for merge in merges]).decode().split() + merges
+
+	assert client.history().graph != None
+
+	for first in names:
+		for second in names:
+			assert client._ancestry(first, second) != None
+			assert client.is_ancestor(first, second) == (subprocess.call(['git', 'merge-base', '--is-ancestor', first, second], cwd=repository) == 0)
+			assert client.merge_base(first, second) == git(repository, 'merge-base', first, second).strip()
+			assert client.count_between(first, second) == int(git(repository, 'rev-list', '--count', second, '^%s' %(first)))
+
+		assert client.topo_order(first) == git(repository, 'rev-list', '--topo-order', first).split()
+		assert client.topo_order(first, 5) == git(repository, 'rev-list', '--topo-order', '-n', '5', first).split()
+
+def test_ancestry_without_native_history_falls_back(tmp_path):
+	path = synthetic.create_repository(str(tmp_path / 'sha256'), commits=20, files=4, merge_every=5, object_format='sha256')
+	client = gitclient.GitClient.open(path)
+
+	assert client._ancestry('HEAD~3', 'HEAD') == None
+	assert client.is_ancestor('HEAD~3', 'HEAD') == True
+	assert client.merge_base('HEAD~3', 'HEAD') == git(path, 'rev-parse', 'HEAD~3').strip()
+	assert client.count_between('HEAD~3', 'HEAD') == int(git(path, 'rev-list', '--count', 'HEAD', '^HEAD~3'))
+	assert client.topo_order('HEAD', 5) == git(path, 'rev-list', '--topo-order', '-n', '5', 'HEAD').split()
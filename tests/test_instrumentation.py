@@ -0,0 +1,35 @@
+import gitclient
+
+def names(records):
+	return [record.name for record in records]
+
+def test_streamed_commands_are_recorded(repository):
+	client = gitclient.GitClient.open(repository)
+
+	with gitclient.instrumentation.capture() as records:
+		assert len(list(client.log(n=5, stream=True))) == 5
+		assert len(list(client.tags(stream=True))) == 5
+		assert len(list(client.diff('HEAD~1', 'HEAD', stream=True))) > 0
+		assert len(list(client.changed_paths('HEAD~3', 'HEAD'))) > 0
+
+	assert names(records) == ['log', 'for-each-ref', 'diff-tree', 'diff-tree']
+	assert all(record.returncode == 0 and record.output_bytes > 0 for record in records)
+
+def test_pooled_cat_file_is_recorded(repository):
+	client = gitclient.GitClient.open(repository, execution_mode=gitclient.GitExecutionMode.Pooled)
+
+	with gitclient.instrumentation.capture() as records:
+		assert client.cat_file('HEAD') != None
+
+	assert names(records) == ['cat-file']
+	assert records[0].output_bytes > 0
+
+def test_fleet_commands_are_recorded(repository):
+	fleet = gitclient.GitFleet([repository], max_workers=1)
+
+	with gitclient.instrumentation.capture() as records:
+		results = list(fleet.run(['git', 'rev-parse', 'HEAD']))
+
+	assert len(results) == 1
+	assert names(records) == ['rev-parse']
+	assert records[0].path == repository
@@ -0,0 +1,40 @@
+import os
+
+import gitclient
+from conftest import git
+
+messages = [
+	'subject\n\nbody line\n  indented\n\n   \n\tlast  \n\n',
+	'\n\n  leading blanks\n\ttab\there\n\n\n',
+	'single line',
+	'',
+]
+
+def fields(items):
+	return [(item.commit, item.merge, item.author, item.date, item.description) for item in items]
+
+def add_messages(path):
+	for number, message in enumerate(messages):
+		with open(os.path.join(path, 'message'), 'w') as f:
+			f.write(message)
+
+		git(path, 'commit', '-q', '--allow-empty', '--allow-empty-message', '--cleanup=verbatim', '-F', 'message')
+
+def test_streamed_log_matches_log(repository):
+	add_messages(repository)
+	client = gitclient.GitClient.open(repository)
+	expected = client.log(n=None)
+
+	assert fields(client.log(n=None, stream=True)) == fields(expected)
+	assert expected[0].description == None
+	assert expected[1].description == b'    single line'
+	assert expected[2].description == b'      leading blanks\n            tab     here'
+	assert any(item.merge != None for item in expected)
+
+def test_native_log_matches_log(repository):
+	add_messages(repository)
+	git(repository, 'commit', '-q', '--allow-empty', '-m', 'offset', '--date', '2021-03-04T05:06:07-0330')
+	client = gitclient.GitClient.open(repository)
+
+	assert fields(client.log(n=None, native=True)) == fields(client.log(n=None))
+	assert fields(client.log(n=10, native=True, branch='v0.2')) == fields(client.log(n=10, branch='v0.2'))
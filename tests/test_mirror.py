@@ -0,0 +1,52 @@
+import os
+import concurrent.futures
+
+import gitclient
+from conftest import git
+
+def upstreams(tmp_path, repository, count):
+	result = []
+
+	for number in range(count):
+		bare = str(tmp_path / ('upstream%d.git' %(number)))
+		git(str(tmp_path), 'clone', '-q', '--bare', repository, bare)
+		result.append('file://' + bare)
+
+	return result
+
+def test_clone_is_standalone_and_counts_savings(tmp_path, repository):
+	url = upstreams(tmp_path, repository, 1)[0]
+	cache = gitclient.GitMirrorCache(str(tmp_path / 'mirrors'))
+	stats = gitclient.GitTransferStats()
+	client = cache.clone(url, str(tmp_path), directory='clone', stats=stats)
+
+	assert client != None
+	assert not os.path.exists(os.path.join(client.git_dir, 'objects', 'info', 'alternates'))
+	assert git(client.path, 'rev-parse', 'HEAD') == git(repository, 'rev-parse', 'HEAD')
+	assert git(client.path, 'remote', 'get-url', 'origin').strip().decode() == url
+	assert cache.bytes_saved > 0
+	assert cache.misses == 1
+
+def test_mirror_in_use_is_not_evicted(tmp_path, repository):
+	first, second = upstreams(tmp_path, repository, 2)
+	cache = gitclient.GitMirrorCache(str(tmp_path / 'mirrors'), max_bytes=1)
+
+	# a clone holds its mirror from the moment mirror lookup returns until it is done
+	mirror = cache._acquire(first)
+	assert cache.mirror(second) != None
+	assert os.path.isdir(mirror.path)
+	cache._release(mirror.path)
+
+	cache.evict()
+	assert not os.path.isdir(mirror.path)
+
+def test_concurrent_clones_share_one_mirror(tmp_path, repository):
+	url = upstreams(tmp_path, repository, 1)[0]
+	cache = gitclient.GitMirrorCache(str(tmp_path / 'mirrors'), max_bytes=1)
+
+	with concurrent.futures.ThreadPoolExecutor(4) as executor:
+		clients = list(executor.map(lambda number: cache.clone(url, str(tmp_path), directory='clone%d' %(number)), range(4)))
+
+	assert all(client != None for client in clients)
+	assert cache.misses + cache.hits + cache.coalesced >= 4
+	assert cache.failures == 0
@@ -0,0 +1,37 @@
+import subprocess
+
+import pytest
+
+import gitclient
+from conftest import git
+
+@pytest.mark.parametrize('batch_check', [False, True])
+def test_worker_that_dies_mid_query_is_restarted(repository, batch_check):
+	worker = gitclient.GitCatFileProcess(repository, batch_check)
+	head = git(repository, 'rev-parse', 'HEAD').strip()
+
+	try:
+		assert worker.query(b'HEAD').oid == head
+
+		# alive when polled, gone before it answers
+		worker.process = subprocess.Popen(['sh', '-c', 'read line'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+		result = worker.query(b'HEAD')
+
+		assert result.oid == head
+		assert (result.data == None) == batch_check
+		assert worker.process.poll() == None
+	finally:
+		worker.close()
+
+def test_worker_that_exited_is_restarted(repository):
+	worker = gitclient.GitCatFileProcess(repository)
+
+	try:
+		assert worker.query(b'HEAD') != None
+
+		worker.process.kill()
+		worker.process.wait()
+
+		assert worker.query(b'HEAD~1').oid == git(repository, 'rev-parse', 'HEAD~1').strip()
+	finally:
+		worker.close()
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+import gitclient
+from conftest import git
+
+def remotes(repository):
+	return [(item.name, item.url, item.type) for item in gitclient.GitRefs.open(os.path.join(repository, '.git')).remotes()]
+
+def expected(repository):
+	fetch = git(repository, 'remote', 'get-url', 'origin').strip()
+	push = git(repository, 'remote', 'get-url', '--push', 'origin').strip()
+
+	return [(b'origin', fetch, b'(fetch)'), (b'origin', push, b'(push)')]
+
+@pytest.mark.parametrize('variable', ['GIT_CONFIG_SYSTEM', 'GIT_CONFIG_GLOBAL'])
+def test_remotes_follow_the_config_cascade(repository, tmp_path, monkeypatch, variable):
+	path = str(tmp_path / 'gitconfig')
+	git(repository, 'remote', 'add', 'origin', 'gh:example/repo.git')
+	git(repository, 'config', '--file', path, 'url.https://github.com/.insteadOf', 'gh:')
+	git(repository, 'config', '--file', path, 'url.ssh://git@github.com/.pushInsteadOf', 'gh:')
+	monkeypatch.setenv(variable, path)
+	monkeypatch.delenv('GIT_CONFIG_NOSYSTEM')
+
+	assert remotes(repository) == expected(repository)
+	assert remotes(repository)[0][1] == b'https://github.com/example/repo.git'
+
+	monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+
+	assert remotes(repository) == expected(repository)
+
+def test_global_config_replaces_home_config(repository, tmp_path, monkeypatch):
+	git(repository, 'remote', 'add', 'origin', 'gh:example/repo.git')
+	git(repository, 'config', '--global', 'url.https://github.com/.insteadOf', 'gh:')
+	monkeypatch.setenv('GIT_CONFIG_GLOBAL', str(tmp_path / 'missing'))
+
+	assert remotes(repository) == expected(repository)
+	assert remotes(repository)[0][1] == b'gh:example/repo.git'
+
+def test_resolve_checks_object_names(repository):
+	refs = gitclient.GitRefs.open(os.path.join(repository, '.git'))
+	head = git(repository, 'rev-parse', 'HEAD').strip()
+	blob = git(repository, 'rev-parse', 'HEAD:dir0/file0.txt').strip()
+
+	assert refs.resolve(head) == head
+	assert refs.resolve(blob) == blob
+	assert refs.resolve(b'0' * 40) == None
+	assert refs.resolve(b'f' * 64) == None
+	assert gitclient.GitClient.open(repository, native_refs=True).rev_parse('0' * 40) == None
+
+def test_packed_refs_reload_keeps_iterators_valid(repository):
+	git(repository, 'pack-refs', '--all')
+	refs = gitclient.GitRefs.open(os.path.join(repository, '.git'))
+	before = list(refs._packed_lines(b'refs/'))
+	lines = refs._packed_lines(b'refs/')
+
+	assert next(lines) == before[0]
+
+	git(repository, 'branch', 'added')
+	git(repository, 'pack-refs', '--all')
+
+	assert refs.resolve('added') != None
+	assert list(lines) == before[1:]
+	assert len(list(refs._packed_lines(b'refs/'))) == len(before) + 1
@@ -0,0 +1,89 @@
+import os
+import subprocess
+
+import gitclient
+import synthetic
+from conftest import git
+
+def write(path, name, content='content\n'):
+	with open(os.path.join(path, name), 'w') as f:
+		f.write(content)
+
+def entries(items):
+	return [str(item) for item in items]
+
+def test_renames_and_paths_with_spaces(repository):
+	git(repository, 'mv', 'dir1/file1.txt', 'dir1/renamed file.txt')
+	write(repository, 'dir2/file2.txt', 'changed\n')
+	git(repository, 'add', 'dir2/file2.txt')
+	write(repository, 'dir2/file2.txt', 'changed again\n')
+	write(repository, 'untracked file.txt')
+	status = gitclient.GitClient.open(repository).status()
+
+	assert entries(status.staged) == ['dir1/file1.txt -> dir1/renamed file.txt (renamed)', 'dir2/file2.txt (modified)']
+	assert status.staged[0].original_file == b'dir1/file1.txt'
+	assert entries(status.not_staged) == ['dir2/file2.txt (modified)']
+	assert entries(status.untracked) == ['untracked file.txt']
+	assert status.unmerged == []
+	assert status.branch == b'master'
+	assert status.commit == git(repository, 'rev-parse', 'HEAD').strip()
+
+def test_unmerged_entries(repository):
+	git(repository, 'checkout', '-q', '-b', 'other', 'HEAD~1')
+	write(repository, 'dir0/file0.txt', 'other\n')
+	write(repository, 'both added.txt', 'other\n')
+	git(repository, 'add', '.')
+	git(repository, 'commit', '-q', '-m', 'other')
+	git(repository, 'checkout', '-q', 'master')
+	write(repository, 'dir0/file0.txt', 'master\n')
+	write(repository, 'both added.txt', 'master\n')
+	git(repository, 'add', '.')
+	git(repository, 'commit', '-q', '-m', 'master')
+
+	assert subprocess.call(['git', 'merge', '-q', 'other'], cwd=repository, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) != 0
+
+	status = gitclient.GitClient.open(repository).status()
+
+	assert entries(status.unmerged) == ['both added.txt (both added)', 'dir0/file0.txt (both modified)']
+	assert status.staged == []
+	assert status.not_staged == []
+
+def test_submodule_state(tmp_path):
+	path = synthetic.create_repository(str(tmp_path / 'parent'), commits=10, files=4)
+	synthetic.add_submodules(path, 2)
+	module = os.path.join(path, 'modules', 'sub0')
+	git(module, 'commit', '-q', '--allow-empty', '-m', 'moved')
+	write(os.path.join(path, 'modules', 'sub1'), 'untracked.txt')
+	status = gitclient.GitClient.open(path).status()
+
+	assert [(item.file, item.submodule) for item in status.not_staged] == [(b'modules/sub0', b'SC..'), (b'modules/sub1', b'S..U')]
+	assert status.untracked == []
+
+def test_ahead_and_behind(repository, tmp_path):
+	clone = str(tmp_path / 'clone')
+	git(str(tmp_path), 'clone', '-q', 'file://%s' %(repository), clone)
+	git(clone, 'reset', '-q', '--hard', 'HEAD~2')
+	git(clone, 'commit', '-q', '--allow-empty', '-m', 'local')
+	status = gitclient.GitClient.open(clone).status()
+
+	assert status.upstream == b'origin/master'
+	assert (status.ahead, status.behind) == (1, 2)
+
+def test_detached_head(repository):
+	git(repository, 'checkout', '-q', '--detach', 'HEAD~3')
+	commit = git(repository, 'rev-parse', 'HEAD').strip()
+	status = gitclient.GitClient.open(repository).status()
+
+	assert status.commit == commit
+	assert status.branch == commit[:7]
+	assert status.upstream == None
+
+def test_sha256_entries(tmp_path):
+	path = synthetic.create_repository(str(tmp_path / 'sha256'), commits=10, files=4, object_format='sha256')
+	git(path, 'mv', 'dir1/file1.txt', 'dir1/moved.txt')
+	write(path, 'dir2/file2.txt', 'changed\n')
+	status = gitclient.GitClient.open(path).status()
+
+	assert entries(status.staged) == ['dir1/file1.txt -> dir1/moved.txt (renamed)']
+	assert entries(status.not_staged) == ['dir2/file2.txt (modified)']
+	assert len(status.commit) == 64
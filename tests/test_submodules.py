@@ -0,0 +1,71 @@
+import os
+import time
+
+import gitclient
+import synthetic
+from conftest import git
+
+def nested(tmp_path):
+	# top -> modules/middle -> modules/sub0, modules/sub1
+	middle = synthetic.create_repository(str(tmp_path / 'middle'), commits=5, files=3)
+	synthetic.add_submodules(middle, 2)
+	git(str(tmp_path), 'clone', '-q', '--bare', middle, str(tmp_path / 'middle.git'))
+
+	top = synthetic.create_repository(str(tmp_path / 'top'), commits=5, files=3)
+	git(top, '-c', 'protocol.file.allow=always', 'submodule', 'add', '-q', str(tmp_path / 'middle.git'), 'modules/middle')
+	git(top, 'commit', '-q', '-m', 'add middle')
+	git(str(tmp_path), 'clone', '-q', top, str(tmp_path / 'work'))
+
+	return str(tmp_path / 'work')
+
+def test_parents_update_before_children(tmp_path):
+	work = nested(tmp_path)
+	middle = os.path.join(work, 'modules', 'middle')
+	updater = gitclient.GitSubmoduleUpdater(work, max_workers=4, backoff=0.01)
+	results = list(updater.run())
+
+	assert [(os.path.relpath(item.path, work), item.depth) for item in results[:1]] == [('modules/middle', 0)]
+	assert sorted((os.path.relpath(item.path, work), item.depth, item.parent) for item in results[1:]) == [
+		('modules/middle/modules/sub0', 1, middle),
+		('modules/middle/modules/sub1', 1, middle)]
+	assert all(item.error == None and item.attempts == 1 for item in results)
+	assert os.path.exists(os.path.join(middle, 'modules', 'sub1', 'dir0'))
+	assert updater.stats.count == 3 and updater.stats.errors == 0
+
+	# a second run finds everything checked out
+	assert [item.attempts for item in gitclient.GitSubmoduleUpdater(work).run()] == [0, 0, 0]
+
+def test_failed_update_is_retried(tmp_path, monkeypatch):
+	work = nested(tmp_path)
+	upstream = str(tmp_path / 'middle.git')
+	os.rename(upstream, upstream + '.away')
+	sleep = time.sleep
+	delays = []
+
+	def restore(seconds):
+		delays.append(seconds)
+
+		if os.path.exists(upstream + '.away'):
+			os.rename(upstream + '.away', upstream)
+
+		sleep(0)
+
+	monkeypatch.setattr(gitclient.time, 'sleep', restore)
+	results = list(gitclient.GitSubmoduleUpdater(work, retries=2, backoff=0.5).run())
+
+	assert results[0].attempts == 2
+	assert results[0].error == None
+	assert delays[0] == 0.5
+	assert len(results) == 3
+
+def test_exhausted_retries_skip_children(tmp_path, monkeypatch):
+	work = nested(tmp_path)
+	os.rename(str(tmp_path / 'middle.git'), str(tmp_path / 'gone.git'))
+	monkeypatch.setattr(gitclient.time, 'sleep', lambda seconds: None)
+	updater = gitclient.GitSubmoduleUpdater(work, retries=1)
+	results = list(updater.run())
+
+	assert len(results) == 1
+	assert results[0].attempts == 2
+	assert results[0].error != None and results[0].result != 0
+	assert updater.stats.errors == 1
@@ -0,0 +1,47 @@
+import gitclient
+from conftest import git
+
+def names(tags):
+	return [tag.name for tag in tags]
+
+def cli_tags(path, *args):
+	return git(path, 'for-each-ref', '--format=%(refname:strip=2)', *args).split()
+
+def prepare(repository):
+	git(repository, 'tag', 'light', 'HEAD~2')
+	git(repository, 'tag', '-a', '-m', 'nested', 'nested', 'v0.2')
+	git(repository, 'tag', '-a', '-m', 'twice', 'twice', 'nested')
+	git(repository, 'tag', '-a', '-m', 'tree', 'tree', 'HEAD^{tree}')
+
+	return gitclient.GitClient.open(repository)
+
+def test_tags_peel_to_commits(repository):
+	client = prepare(repository)
+	tags = dict((tag.name, tag) for tag in client.tags())
+	v02 = git(repository, 'rev-parse', 'v0.2^{commit}').strip()
+
+	assert sorted(tags) == sorted(cli_tags(repository, 'refs/tags'))
+	assert tags[b'light'].commit == git(repository, 'rev-parse', 'HEAD~2').strip()
+	assert tags[b'light'].annotated == False
+	assert tags[b'v0.2'].commit == v02
+	assert tags[b'nested'].commit == v02
+	assert tags[b'twice'].commit == v02
+	assert tags[b'twice'].object == git(repository, 'rev-parse', 'twice').strip()
+	assert tags[b'tree'].commit == None
+	assert tags[b'nested'].subject == b'nested'
+
+	streamed = dict((tag.name, tag.commit) for tag in client.tags(stream=True))
+
+	assert streamed == dict((name, tag.commit) for name, tag in tags.items())
+
+def test_tag_queries_match_git(repository):
+	client = prepare(repository)
+
+	for stream in (False, True):
+		assert names(client.tags(sort='-creatordate', stream=stream)) == cli_tags(repository, '--sort=-creatordate', 'refs/tags')
+		assert names(client.tags(sort=['refname'], n=3, stream=stream)) == cli_tags(repository, '--sort=refname', '--count=3', 'refs/tags')
+		assert names(client.tags(pattern='v0.*', stream=stream)) == cli_tags(repository, 'refs/tags/v0.*')
+		assert names(client.tags(pattern=[b'v0.1', 'light'], stream=stream)) == cli_tags(repository, 'refs/tags/v0.1', 'refs/tags/light')
+		assert names(client.tags(contains='HEAD~2', stream=stream)) == cli_tags(repository, '--contains', 'HEAD~2', 'refs/tags')
+
+	assert client.tags(contains='missing') == None
@@ -0,0 +1,56 @@
+import os
+
+import gitclient
+from conftest import git
+
+def upstream(tmp_path, repository):
+	bare = str(tmp_path / 'upstream.git')
+	git(str(tmp_path), 'clone', '-q', '--bare', repository, bare)
+	return 'file://' + bare
+
+def commit(path, name):
+	with open(os.path.join(path, name), 'w') as f:
+		f.write(name + '\n')
+
+	git(path, 'add', name)
+	git(path, 'commit', '-q', '-m', name)
+
+def test_clone_over_file_protocol(tmp_path, repository):
+	url = upstream(tmp_path, repository)
+	events = []
+	stats = gitclient.GitTransferStats()
+	client = gitclient.GitClient.clone(str(tmp_path), url, directory='clone', progress=events.append, stats=stats)
+	count = int(git(repository, 'rev-list', '--count', '--objects', '--all').split()[0])
+
+	assert client != None
+	assert stats.returncode == 0
+	assert stats.objects == count
+	assert stats.bytes > 0
+	assert any(event.phase == 'Receiving objects' for event in events)
+
+def test_small_fetch_reports_totals(tmp_path, repository):
+	url = upstream(tmp_path, repository)
+	client = gitclient.GitClient.clone(str(tmp_path), url, directory='clone')
+	writer = gitclient.GitClient.clone(str(tmp_path), url, directory='writer')
+
+	commit(writer.path, 'pushed.txt')
+	push = gitclient.GitTransferStats()
+	assert writer.push('origin', 'master', stats=push) != None
+	assert push.objects == 3
+
+	# a handful of objects is unpacked loose and git prints no receiving progress
+	fetch = gitclient.GitTransferStats()
+	assert client.fetch('origin', stats=fetch) != None
+	assert fetch.returncode == 0
+	assert fetch.objects == 3
+	assert git(client.path, 'rev-parse', 'origin/master') == git(writer.path, 'rev-parse', 'HEAD')
+
+def test_progress_is_parsed_under_any_locale(tmp_path, repository, monkeypatch):
+	monkeypatch.setenv('LANG', 'de_DE.UTF-8')
+	monkeypatch.setenv('LC_ALL', 'de_DE.UTF-8')
+	monkeypatch.setenv('LANGUAGE', 'de')
+	url = upstream(tmp_path, repository)
+	stats = gitclient.GitTransferStats()
+
+	assert gitclient.GitClient.clone(str(tmp_path), url, directory='clone', stats=stats) != None
+	assert stats.objects > 0
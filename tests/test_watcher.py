@@ -0,0 +1,134 @@
+import os
+import time
+import shutil
+
+import pytest
+
+import gitclient
+from conftest import git
+
+pytestmark = pytest.mark.skipif(gitclient.GitStatusWatcher.inotify() == None, reason='inotify is not available')
+
+def entries(status):
+	return [str(item) for item in status.staged] + ['~' + str(item) for item in status.not_staged] + ['?' + str(item) for item in status.untracked] + ['!' + str(item) for item in status.unmerged]
+
+def write(path, name, content='content\n'):
+	target = os.path.join(path, name)
+
+	if not os.path.isdir(os.path.dirname(target)):
+		os.makedirs(os.path.dirname(target))
+
+	with open(target, 'a') as f:
+		f.write(content)
+
+def settle(client, watcher, timeout=5.0):
+	# the watched status must converge on what a plain git status reports
+	deadline = time.time() + timeout
+	expected = gitclient.GitStatus.parse_porcelain_v2(gitclient.command.execute(['git', '--no-optional-locks', 'status', '--porcelain=v2', '-z', '--branch'], cwd=client.path))
+
+	while time.time() < deadline:
+		time.sleep(watcher.delay * 2)
+		status = client.status()
+
+		if entries(status) == entries(expected) and status.commit == expected.commit and status.ahead == expected.ahead:
+			break
+
+	return (status, expected)
+
+@pytest.fixture
+def watched(repository):
+	client = gitclient.GitClient.open(repository)
+	watcher = client.watch(delay=0.02)
+	assert watcher != None
+	yield (client, watcher)
+	client.unwatch()
+
+def check(client, watcher):
+	status, expected = settle(client, watcher)
+	assert entries(status) == entries(expected)
+	assert status.commit == expected.commit
+	assert (status.ahead, status.behind) == (expected.ahead, expected.behind)
+
+def test_incremental_changes(watched):
+	client, watcher = watched
+	notifications = []
+	watcher.subscribe(lambda status, paths: notifications.append(paths))
+	resyncs = watcher.resyncs
+
+	write(client.path, 'dir1/file1.txt')
+	check(client, watcher)
+	write(client.path, 'dir1/untracked.txt')
+	check(client, watcher)
+	os.remove(os.path.join(client.path, 'dir2/file2.txt'))
+	check(client, watcher)
+
+	assert watcher.resyncs == resyncs
+	assert watcher.updates >= 3
+	assert any(paths != None and b'dir1/file1.txt' in paths for paths in notifications)
+
+def test_untracked_directories_match_plain_status(watched):
+	client, watcher = watched
+
+	write(client.path, 'new/deep/file.txt')
+	check(client, watcher)
+	assert '?new/' in entries(client.status())
+	write(client.path, 'new/other.txt')
+	check(client, watcher)
+	shutil.rmtree(os.path.join(client.path, 'new'))
+	check(client, watcher)
+
+def test_ignore_file_changes_resync(watched):
+	client, watcher = watched
+	write(client.path, '.gitignore', 'build/\n')
+	check(client, watcher)
+
+	write(client.path, 'build/output.o')
+	check(client, watcher)
+	assert '?build/' not in entries(client.status())
+
+	os.remove(os.path.join(client.path, '.gitignore'))
+	check(client, watcher)
+	write(client.path, 'build/second.o')
+	check(client, watcher)
+	assert '?build/' in entries(client.status())
+
+def test_exclude_file_changes_resync(watched):
+	client, watcher = watched
+	write(client.path, 'scratch.txt')
+	check(client, watcher)
+
+	write(client.git_dir, 'info/exclude', 'scratch.txt\n')
+	check(client, watcher)
+	assert '?scratch.txt' not in entries(client.status())
+
+def test_ref_updates_resync(watched):
+	client, watcher = watched
+
+	git(client.path, 'update-ref', 'refs/heads/master', 'HEAD~2')
+	check(client, watcher)
+	assert client.status().commit == git(client.path, 'rev-parse', 'HEAD').strip()
+
+def test_new_directories_are_checked_in_one_batch(watched):
+	client, watcher = watched
+	calls = []
+	execute = client._execute
+
+	def counting(full_cmd, input=None, trace=True):
+		calls.append(full_cmd)
+		return execute(full_cmd, input=input, trace=trace)
+
+	client._execute = counting
+
+	for number in range(20):
+		os.makedirs(os.path.join(client.path, 'batch', 'sub%d' %(number)))
+
+	write(client.path, 'batch/sub0/file.txt')
+	check(client, watcher)
+	assert sum(1 for full_cmd in calls if 'check-ignore' in full_cmd) <= 2
+	assert not any('ls-files' in full_cmd for full_cmd in calls)
+
+def test_overflow_resyncs(watched):
+	client, watcher = watched
+	overflow = gitclient.GitStatusWatcher.event.pack(-1, gitclient.GitStatusWatcher.in_q_overflow, 0, 0)
+
+	assert watcher._events(overflow)[2] == True
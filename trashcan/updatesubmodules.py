@@ -15,6 +15,8 @@ logger_handler_console.setLevel(logging.DEBUG)
 logger_formatter = logging.Formatter('%(asctime)s [%(name)s] [%(levelname)s] %(message)s')
 logger_handler_console.setFormatter(logger_formatter)
 logger.addHandler(logger_handler_console)
+logging.getLogger('gitclient').setLevel(logging.DEBUG)
+logging.getLogger('gitclient').addHandler(logger_handler_console)
 
 class ParsedArgs:
 	username = None
@@ -63,10 +65,10 @@ def openAndVerifyRepo():
 def updateCSharedUtility(git):
 	logger.info("updating submodule azure-iot-c-shared-utility")
 	
-	status = git.status()
-	if status == None:
+	dirty = git.is_dirty(untracked=True)
+	if dirty == None:
 		logger.error("[c-shared] failed getting status")
-	elif len(status.staged) != 0 or len(status.staged) != 0 or len(status.staged) != 0:
+	elif dirty:
 		logger.error("[c-shared] repo is not clean. Revert all changes before proceeding")
 	elif git.checkout('master') != 0:
 		logger.error("[c-shared] failed checking out master")
@@ -107,7 +109,7 @@ else:
 			result = FAILURE
 		elif not updateAzureIoTSdkC(git):
 			result = FAILURE
-		elif not mergeUpdatesToMaster(git)
+		elif not mergeUpdatesToMaster(git):
 			result = FAILURE
 		else:
 			result = SUCCESS